@@ -0,0 +1,84 @@
+"""
+Serialisation for the read-only JSON API.
+
+Rows are read with .values(), so a page of results never builds model
+instances. Attributes are fetched for the whole page with one extra query
+and attached by asset id, which is what prefetch_related would do for
+instances.
+"""
+from collections import defaultdict
+
+from .models import Attribute
+
+# API field name -> values() lookup
+API_FIELDS = {
+    "id": "id",
+    "name": "name",
+    "category": "category",
+    "status": "status",
+    "assigned_to": "assigned_to__username",
+    "depreciation": "depreciation",
+    "overdue": "overdue",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+}
+INCLUDE_ATTRIBUTES = "attributes"
+INCLUDE_CHOICES = (INCLUDE_ATTRIBUTES,)
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+MAX_IDS = 500
+
+# Always read, since cursors are built from them
+_KEYSET_LOOKUPS = ("id", "created_at")
+
+
+def value_rows(queryset, fields):
+    """queryset.values() with just what the requested fields need."""
+    lookups = {API_FIELDS[f] for f in fields} | set(_KEYSET_LOOKUPS)
+    return queryset.values(*sorted(lookups))
+
+
+def _attributes_for(records):
+    return (
+        Attribute.objects.filter(asset_id__in=[r["id"] for r in records])
+        .order_by("name", "id")
+        .values_list("asset_id", "name", "value")
+    )
+
+
+def _attach(records, rows):
+    by_asset = defaultdict(list)
+    for asset_id, name, value in rows:
+        by_asset[asset_id].append({"name": name, "value": value})
+    for record in records:
+        record["attributes"] = by_asset.get(record["id"], [])
+    return records
+
+
+def attach_attributes(records):
+    """Add "attributes": [{"name", "value"}] to each record, in one query."""
+    return _attach(records, _attributes_for(records))
+
+
+async def aattach_attributes(records):
+    return _attach(records, [row async for row in _attributes_for(records)])
+
+
+def records_for(rows, fields):
+    """API records holding only the requested fields. fields must contain "id"."""
+    return [{f: row[API_FIELDS[f]] for f in fields} for row in rows]
+
+
+def serialize(rows, fields, include=()):
+    records = records_for(rows, fields)
+    if INCLUDE_ATTRIBUTES in include:
+        attach_attributes(records)
+    return records
+
+
+async def aserialize(rows, fields, include=()):
+    records = records_for(rows, fields)
+    if INCLUDE_ATTRIBUTES in include:
+        await aattach_attributes(records)
+    return records
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class AssetManagmentConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'asset_managment'
+
+    def ready(self):
+        from . import signals  # noqa: F401
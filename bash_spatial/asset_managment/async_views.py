@@ -0,0 +1,208 @@
+"""
+Async versions of the asset read paths, for ASGI deployments.
+
+They reuse the querysets, templates and serialisation of the views in
+views.py, but read through the async ORM and cache APIs, so a slow page
+waits on the database without holding a worker thread. On the list pages
+the cached facet counts are read in a worker thread while the page query
+runs, instead of one after the other. A facet cache miss is not overlapped:
+its GROUP BY runs after the page query (see _page_and_facets).
+
+Sessions, users and roles are still loaded by sync code, via sync_to_async.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.views import redirect_to_login
+from django.core.exceptions import BadRequest, PermissionDenied
+from django.http import Http404, HttpResponse, JsonResponse
+from django.shortcuts import redirect
+from django.template.loader import render_to_string
+
+from . import api
+from .conditional import add_validators, not_modified
+from .detail_cache import aload_asset_detail
+from .facets import cached_facets, get_facets
+from .instrumentation import render_timer
+from .forms import AssetApiQueryForm
+from .models import Asset
+from .pagination import InvalidCursor, KeysetPaginator
+from .permissions import can_access, resolve_role
+from .routers import current_routing, reads_from_replica, routed_chunks
+from .search import parse_asset_id
+from .views import AssetApiListView, AssetDetailView, AssetListView
+
+
+async def _load_user(request):
+    """Evaluate request.user and its role off the event loop."""
+
+    def load():
+        user = request.user
+        resolve_role(user)
+        return user
+
+    return await sync_to_async(load)()
+
+
+async def _page_and_facets(paginator, request):
+    """
+    Run the page query and the facet cache read concurrently. On a cache
+    miss the GROUP BY rebuild runs after the page query: the async ORM runs
+    every query on the request's one sync thread, and rebuilding on a
+    worker thread instead would leave a connection open in that thread.
+    """
+    try:
+        page, facets = await asyncio.gather(
+            paginator.apage(
+                after=request.GET.get('after'),
+                before=request.GET.get('before'),
+            ),
+            sync_to_async(cached_facets, thread_sensitive=False)(),
+        )
+    except InvalidCursor:
+        raise Http404("Invalid page cursor.")
+    if facets is None:
+        # Cache miss: rebuild on the request's own thread and connection
+        facets = await sync_to_async(get_facets)()
+    return page, facets
+
+
+def _setup(view_class, request, **kwargs):
+    view = view_class()
+    view.setup(request, **kwargs)
+    return view
+
+
+async def _stream(chunks):
+    """
+    Serve a sync iterator of chunks that reads the database, one chunk per
+    trip to the sync thread, under the request's replica routing.
+    """
+    iterator = routed_chunks(current_routing(), chunks)
+    done = object()
+    while True:
+        chunk = await sync_to_async(next)(iterator, done)
+        if chunk is done:
+            return
+        yield chunk
+
+
+async def _list_response(view, request):
+    queryset = view.get_queryset()
+    if view.ranked_search():
+        _, _, assets, _ = await sync_to_async(view.paginate_queryset)(queryset, view.paginate_by)
+        page, facets = None, await sync_to_async(get_facets)()
+    else:
+        page, facets = await _page_and_facets(KeysetPaginator(queryset, view.paginate_by), request)
+        assets = page.object_list
+    context = {
+        'assets': assets,
+        'page_obj': page,
+        'is_paginated': page is not None and page.has_other_pages(),
+        'categories': facets.categories,
+        'category_counts': facets.category_counts,
+        'status_counts': facets.status_counts,
+    }
+    if page is not None:
+        context['next_url'] = view.cursor_url('after', page.next_cursor)
+        context['previous_url'] = view.cursor_url('before', page.previous_cursor)
+    with render_timer():
+        html = await sync_to_async(render_to_string)(view.template_name, context, request=request)
+    return HttpResponse(html)
+
+
+@reads_from_replica
+async def asset_list_async(request):
+    """
+    Async AssetListView: same filters, cursors, ?sort=relevance ranking,
+    ?stream=1 streaming, ETag and template
+    """
+    user = await _load_user(request)
+    if not user.is_authenticated:
+        return redirect_to_login(request.get_full_path())
+
+    lookup = parse_asset_id(request.GET.get('search', ''))
+    if lookup and lookup[0] == 'exact':
+        if await Asset.objects.visible_to(user).filter(pk=lookup[1]).aexists():
+            return redirect('asset_detail', pk=lookup[1])
+
+    view = _setup(AssetListView, request)
+    etag, last_modified = await sync_to_async(view.get_validators)()
+    response = not_modified(request, etag, last_modified)
+    if response is None:
+        if request.GET.get('stream'):
+            response = await sync_to_async(view.stream_response)()
+            response.streaming_content = _stream(response.streaming_content)
+        else:
+            response = await _list_response(view, request)
+    return add_validators(response, etag, last_modified)
+
+
+@reads_from_replica
+async def asset_detail_async(request, pk):
+    """
+    Async AssetDetailView, served from the detail cache when possible
+    """
+    user = await _load_user(request)
+    if not user.is_authenticated:
+        return redirect_to_login(request.get_full_path())
+
+    view = _setup(AssetDetailView, request, pk=pk)
+    asset = await aload_asset_detail(view.get_queryset(), pk)
+    if not can_access(user, asset):
+        raise PermissionDenied
+
+    view.object = asset
+    etag, last_modified = view.get_validators()
+    response = not_modified(request, etag, last_modified)
+    if response is None:
+        with render_timer():
+            html = await sync_to_async(render_to_string)(
+                view.template_name, {'asset': asset, 'object': asset}, request=request
+            )
+        response = HttpResponse(html)
+    return add_validators(response, etag, last_modified)
+
+
+@reads_from_replica
+async def api_asset_list_async(request):
+    """
+    Async AssetApiListView. The facet read is skipped since the API has no
+    filter dropdowns.
+    """
+    user = await _load_user(request)
+    if not user.is_authenticated:
+        raise PermissionDenied
+
+    form = AssetApiQueryForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors.get_json_data()}, status=400)
+    options = form.cleaned_data
+    fields, include = options['fields'], options['include']
+    view = _setup(AssetApiListView, request)
+    try:
+        queryset = view.get_queryset()
+    except BadRequest as exc:
+        return JsonResponse({'errors': {'attributes': [str(exc)]}}, status=400)
+
+    if options['ids']:
+        rows = [row async for row in api.value_rows(queryset.filter(pk__in=options['ids']), fields)]
+        found = {row['id'] for row in rows}
+        return JsonResponse({
+            'results': await api.aserialize(rows, fields, include),
+            'not_found': [pk for pk in options['ids'] if pk not in found],
+        })
+
+    paginator = KeysetPaginator(api.value_rows(queryset, fields), options['limit'])
+    try:
+        page = await paginator.apage(
+            after=request.GET.get('after'),
+            before=request.GET.get('before'),
+        )
+    except InvalidCursor:
+        return JsonResponse({'errors': {'cursor': ['Invalid page cursor.']}}, status=400)
+    return JsonResponse({
+        'results': await api.aserialize(page.object_list, fields, include),
+        'next': view.cursor_url('after', page.next_cursor),
+        'previous': view.cursor_url('before', page.previous_cursor),
+    })
@@ -0,0 +1,74 @@
+"""
+Attribute filters for asset querysets, from query parameters such as
+
+    ?attr.ram__gte=16&attr.warranty_expires__lt=2026-01-01&attr.leased=yes
+
+The part after "attr." is the attribute key (see attribute_key()), with an
+optional __<op> suffix. The filter value is typed the same way stored
+values are, and picks the matching typed column, so "16" compares numbers
+and "2026-01-01" compares dates. Each filter becomes an EXISTS subquery on
+the (key, typed value, asset) indexes; nothing is loaded into Python.
+"""
+from django.db.models import Exists, OuterRef
+
+from .attribute_types import (
+    TYPE_BOOL,
+    TYPE_DATE,
+    TYPE_DECIMAL,
+    TYPE_INT,
+    TYPE_TEXT,
+    attribute_key,
+    infer_value,
+)
+from .models import Attribute
+
+PARAM_PREFIX = "attr."
+
+OPERATORS = ("exact", "gt", "gte", "lt", "lte", "contains")
+
+COLUMNS = {
+    TYPE_INT: "number_value",
+    TYPE_DECIMAL: "number_value",
+    TYPE_DATE: "date_value",
+    TYPE_BOOL: "bool_value",
+}
+
+
+class InvalidAttributeFilter(ValueError):
+    pass
+
+
+def parse_attribute_filter(param, raw):
+    """Return (key, column lookup, value) for one attr.* parameter."""
+    name, _, op = param[len(PARAM_PREFIX):].partition("__")
+    key = attribute_key(name)
+    op = op or "exact"
+    if not key:
+        raise InvalidAttributeFilter(f"{param}: missing attribute name.")
+    if op not in OPERATORS:
+        raise InvalidAttributeFilter(f"{param}: unknown operator {op!r}.")
+
+    value_type, typed = infer_value(raw)
+    if op == "contains":
+        return key, "value__icontains", raw
+    if value_type == TYPE_TEXT:
+        return key, "value__iexact" if op == "exact" else f"value__{op}", raw.strip()
+    if value_type == TYPE_BOOL and op != "exact":
+        raise InvalidAttributeFilter(f"{param}: yes/no values only support equality.")
+    return key, f"{COLUMNS[value_type]}__{op}", typed
+
+
+def filter_by_attributes(queryset, params):
+    """
+    Apply every attr.* parameter in params to an Asset queryset. Raises
+    InvalidAttributeFilter for a malformed one.
+    """
+    for param in params:
+        if not param.startswith(PARAM_PREFIX):
+            continue
+        for raw in params.getlist(param):
+            key, lookup, value = parse_attribute_filter(param, raw)
+            queryset = queryset.filter(
+                Exists(Attribute.objects.filter(asset=OuterRef("pk"), key=key, **{lookup: value}))
+            )
+    return queryset
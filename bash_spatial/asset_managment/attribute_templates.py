@@ -0,0 +1,158 @@
+"""
+Apply a category's attribute templates to the assets already in it.
+
+Every asset of the category that lacks a templated attribute (matched on the
+normalised key, so "Serial number" counts for a "Serial Number" template) gets
+it with the template's default value, typed as the template says. Templates
+without a default valid for their type are skipped: a blank value would fail
+the asset form's checks on every asset it was added to.
+
+The missing attribute rows are written by one INSERT ... SELECT, so the
+database works out which assets need what. The rest is still per asset on
+the Python side: which assets lack what is streamed from the database, and
+each changed asset gets a history row, a search index update and a detail
+cache invalidation, so that part grows with the number of assets changed.
+"""
+from functools import reduce
+from operator import or_
+
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .attribute_types import TYPE_TEXT
+from .audit import ACTION_UPDATED, history_entry
+from .detail_cache import invalidate_details
+from .models import Asset, AssetHistory, Attribute, AttributeTemplate
+from .search import get_search_backend
+
+INDEX_BATCH_SIZE = 500
+MISSING_CHUNK_SIZE = 2000
+
+# Expressions for a fresh UUID primary key, in each backend's storage format
+UUID_SQL = {
+    "sqlite": "lower(hex(randomblob(16)))",
+    "postgresql": "gen_random_uuid()",
+}
+
+
+def templates_for(category):
+    return list(AttributeTemplate.objects.for_category(category))
+
+
+def applicable(templates):
+    """The templates with a default value to fill in, valid for their type."""
+    return [t for t in templates if t.default_value.strip() and t.accepts(t.default_value)]
+
+
+def _has(template):
+    return Exists(Attribute.objects.filter(asset=OuterRef("pk"), key=template.key))
+
+
+def _missing(category, templates):
+    """{asset pk: [templates it lacks]} for the category's assets."""
+    flags = {f"has_{n}": _has(t) for n, t in enumerate(templates)}
+    missing = {}
+    rows = Asset.objects.filter(category=category).order_by().annotate(**flags)
+    for pk, *present in rows.values_list("pk", *flags).iterator(chunk_size=MISSING_CHUNK_SIZE):
+        lacking = [t for t, has in zip(templates, present) if not has]
+        if lacking:
+            missing[pk] = lacking
+    return missing
+
+
+def _template_attribute(template, **kwargs):
+    attribute = Attribute(name=template.name, value=template.default_value, **kwargs)
+    attribute.set_typed_value()
+    if template.value_type != TYPE_TEXT:
+        # accepts() has checked the value; an int default of a decimal template
+        # is stored as a decimal
+        attribute.value_type = template.value_type
+    return attribute
+
+
+def _row_values(template):
+    attribute = _template_attribute(template)
+    return [
+        field.get_db_prep_save(getattr(attribute, field.attname), connection)
+        for field in _value_fields()
+    ]
+
+
+def _value_fields():
+    names = ("name", "value", "key", "value_type", "number_value", "date_value", "bool_value")
+    return [Attribute._meta.get_field(name) for name in names]
+
+
+def _insert_select(category, templates):
+    qn = connection.ops.quote_name
+    attributes, assets = Attribute._meta, Asset._meta
+    columns = ", ".join(qn(f.column) for f in _value_fields())
+    placeholders = ", ".join(["%s"] * len(_value_fields()))
+    select = (
+        f"SELECT {UUID_SQL[connection.vendor]}, {placeholders}, a.{qn(assets.pk.column)} "
+        f"FROM {qn(assets.db_table)} a WHERE a.{qn(assets.get_field('category').column)} = %s "
+        f"AND NOT EXISTS (SELECT 1 FROM {qn(attributes.db_table)} x "
+        f"WHERE x.{qn(attributes.get_field('asset').column)} = a.{qn(assets.pk.column)} "
+        f"AND x.{qn(attributes.get_field('key').column)} = %s)"
+    )
+    params = []
+    for template in templates:
+        params.extend(_row_values(template))
+        params.extend([category, template.key])
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {qn(attributes.db_table)} "
+            f"({qn(attributes.pk.column)}, {columns}, {qn(attributes.get_field('asset').column)}) "
+            + " UNION ALL ".join([select] * len(templates)),
+            params,
+        )
+
+
+def _bulk_create(missing):
+    Attribute.objects.bulk_create(
+        _template_attribute(t, asset_id=pk)
+        for pk, lacking in missing.items()
+        for t in lacking
+    )
+
+
+def apply_templates(category):
+    """
+    Give every asset in category the templated attributes it is missing,
+    from the templates that have a usable default. Returns the number of
+    assets changed.
+    """
+    templates = applicable(templates_for(category))
+    if not templates:
+        return 0
+
+    with transaction.atomic():
+        missing = _missing(category, templates)
+        if not missing:
+            return 0
+        # Before the INSERT, while "lacks a template" still picks them out
+        now = timezone.now()
+        Asset.objects.filter(category=category).filter(
+            reduce(or_, [~_has(t) for t in templates])
+        ).update(updated_at=now)
+        if connection.vendor in UUID_SQL:
+            _insert_select(category, templates)
+        else:
+            _bulk_create(missing)
+
+        pks = list(missing)
+        AssetHistory.objects.bulk_create(
+            history_entry(
+                Asset(pk=pk),
+                ACTION_UPDATED,
+                {"attributes": [None, [[t.name, t.default_value] for t in lacking]]},
+                now,
+            )
+            for pk, lacking in missing.items()
+        )
+        search = get_search_backend()
+        for start in range(0, len(pks), INDEX_BATCH_SIZE):
+            search.index_assets(pks[start:start + INDEX_BATCH_SIZE])
+        invalidate_details(pks)
+    return len(pks)
@@ -0,0 +1,86 @@
+"""
+Type inference for attribute values.
+
+Attribute.value keeps the text exactly as entered, for display, search and
+export. Alongside it, each attribute stores a normalised key and, where the
+text parses as one, a typed copy of the value in number_value, date_value
+or bool_value. Those columns are indexed with the key, so a filter such as
+"ram >= 16" is an index range scan instead of a string comparison over
+every row.
+
+Integers and decimals share number_value, so "16" and "15.5" compare with
+each other; value_type still records which one was entered.
+"""
+import re
+from datetime import date
+from decimal import Decimal
+
+TYPE_TEXT = "text"
+TYPE_INT = "int"
+TYPE_DECIMAL = "decimal"
+TYPE_DATE = "date"
+TYPE_BOOL = "bool"
+
+VALUE_TYPE_CHOICES = [
+    (TYPE_TEXT, "Text"),
+    (TYPE_INT, "Integer"),
+    (TYPE_DECIMAL, "Decimal"),
+    (TYPE_DATE, "Date"),
+    (TYPE_BOOL, "Yes/No"),
+]
+
+# Limits of Attribute.number_value
+NUMBER_MAX_DIGITS = 20
+NUMBER_DECIMAL_PLACES = 6
+
+BOOL_VALUES = {"true": True, "yes": True, "false": False, "no": False}
+
+# No leading zeros, so serial numbers like "00123" stay text
+_INT_RE = re.compile(r"^[+-]?(0|[1-9]\d*)$")
+_DECIMAL_RE = re.compile(r"^[+-]?(0|[1-9]\d*)\.(\d+)$")
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+def attribute_key(name):
+    """Normalised name used in filters: "Serial Number" -> "serial_number"."""
+    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+
+
+def _fits_number(integer_digits, decimal_places=0):
+    return (
+        decimal_places <= NUMBER_DECIMAL_PLACES
+        and integer_digits + NUMBER_DECIMAL_PLACES <= NUMBER_MAX_DIGITS
+    )
+
+
+def infer_value(text):
+    """
+    Return (value_type, typed value) for text. The typed value is an int,
+    Decimal, date or bool, or None for text.
+    """
+    text = text.strip()
+    match = _INT_RE.match(text)
+    if match and _fits_number(len(match.group(1))):
+        return TYPE_INT, int(text)
+    match = _DECIMAL_RE.match(text)
+    if match and _fits_number(len(match.group(1)), len(match.group(2))):
+        return TYPE_DECIMAL, Decimal(text)
+    if _DATE_RE.match(text):
+        try:
+            return TYPE_DATE, date.fromisoformat(text)
+        except ValueError:
+            pass
+    if text.lower() in BOOL_VALUES:
+        return TYPE_BOOL, BOOL_VALUES[text.lower()]
+    return TYPE_TEXT, None
+
+
+def typed_columns(text):
+    """The Attribute column values for text, as a dict."""
+    value_type, typed = infer_value(text)
+    return {
+        "value_type": value_type,
+        "number_value": typed if value_type in (TYPE_INT, TYPE_DECIMAL) else None,
+        "date_value": typed if value_type == TYPE_DATE else None,
+        "bool_value": typed if value_type == TYPE_BOOL else None,
+    }
@@ -0,0 +1,186 @@
+"""
+Append-only change history for assets and their attributes.
+
+Single saves and deletes are recorded by the receivers in signals.py with one
+INSERT each. Set-based paths (bulk actions, duplication, import) skip those
+signals and build their history rows here, written with one bulk_create.
+
+Each row stores only what changed, as {field: [old, new]}. updated_at is
+left out since it changes on every save and the row has its own timestamp,
+as are the overdue flag and the typed attribute columns, which only mirror
+other fields.
+The acting user comes from AuditUserMiddleware, or from audit_user() when
+changes are made outside a request.
+"""
+import contextvars
+from contextlib import contextmanager
+
+from django.db import models
+from django.utils import timezone
+
+from .models import Asset, AssetHistory, Attribute
+
+ACTION_CREATED = "created"
+ACTION_UPDATED = "updated"
+ACTION_DELETED = "deleted"
+
+# updated_at changes on every save; the rest are derived from other fields
+IGNORED_FIELDS = (
+    "updated_at",
+    "overdue",
+    "key",
+    "value_type",
+    "number_value",
+    "date_value",
+    "bool_value",
+)
+
+
+class _UserRef:
+    # asgiref compares context variable values when it crosses between sync
+    # and async code. Holding request.user directly would make that compare
+    # evaluate the lazy user, which queries the database from async code.
+    __slots__ = ("user",)
+
+    def __init__(self, user):
+        self.user = user
+
+
+_current_user = contextvars.ContextVar("asset_audit_user", default=None)
+
+
+def get_audit_user():
+    ref = _current_user.get()
+    return ref.user if ref is not None else None
+
+
+@contextmanager
+def audit_user(user):
+    """Attribute every change made inside the block to user."""
+    token = _current_user.set(_UserRef(user))
+    try:
+        yield
+    finally:
+        _current_user.reset(token)
+
+
+def _user_id():
+    user = get_audit_user()
+    if user is None or not user.is_authenticated:
+        return None
+    return user.pk
+
+
+def snapshot(instance):
+    values = instance.field_values()
+    return {k: v for k, v in values.items() if k not in IGNORED_FIELDS}
+
+
+def diff(old, new):
+    """{field: [old, new]} for every field whose value differs."""
+    changes = {}
+    for name in sorted(old.keys() | new.keys()):
+        before, after = old.get(name), new.get(name)
+        if before != after:
+            changes[name] = [before, after]
+    return changes
+
+
+def history_entry(instance, action, changes, created_at=None):
+    """Build an unsaved AssetHistory row for an Asset or Attribute."""
+    if isinstance(instance, Attribute):
+        asset_id, attribute_id = instance.asset_id, instance.pk
+    else:
+        asset_id, attribute_id = instance.pk, None
+    return AssetHistory(
+        asset_id=asset_id,
+        attribute_id=attribute_id,
+        action=action,
+        changes=changes,
+        user_id=_user_id(),
+        created_at=created_at or timezone.now(),
+    )
+
+
+def record_change(instance, action):
+    """
+    Record one save or delete. Updates diff against the values the instance
+    was loaded with and are skipped when nothing changed.
+    """
+    current = snapshot(instance)
+    if action == ACTION_CREATED:
+        changes = diff({}, current)
+    elif action == ACTION_DELETED:
+        changes = diff(current, {})
+    else:
+        loaded = getattr(instance, "_loaded_values", None)
+        if loaded is None:
+            return None
+        changes = diff({k: v for k, v in loaded.items() if k not in IGNORED_FIELDS}, current)
+        if not changes:
+            return None
+    entry = history_entry(instance, action, changes)
+    entry.save()
+    return entry
+
+
+def record_created(assets, attributes=()):
+    """
+    History for assets just written with bulk_create. Their attributes are
+    folded into each asset's row as [[name, value], ...] rather than logged
+    one row apiece, so the log grows with the number of assets only.
+    """
+    by_asset = {}
+    for attribute in attributes:
+        by_asset.setdefault(attribute.asset_id, []).append([attribute.name, attribute.value])
+
+    now = timezone.now()
+    entries = []
+    for asset in assets:
+        changes = diff({}, snapshot(asset))
+        if asset.pk in by_asset:
+            changes["attributes"] = [None, by_asset[asset.pk]]
+        entries.append(history_entry(asset, ACTION_CREATED, changes, now))
+    AssetHistory.objects.bulk_create(entries)
+
+
+def record_bulk_update(queryset, values):
+    """
+    History for an UPDATE of queryset with values, read before the UPDATE
+    runs. Only the updated columns are read, and assets the UPDATE leaves
+    unchanged get no row. Returns the pks of every asset in queryset.
+    """
+    new = {}
+    for name, value in values.items():
+        field = Asset._meta.get_field(name)
+        if field.attname in IGNORED_FIELDS:
+            continue
+        new[field.attname] = value.pk if isinstance(value, models.Model) else value
+
+    now = timezone.now()
+    pks, entries = [], []
+    for pk, *old in queryset.values_list("pk", *new):
+        pks.append(pk)
+        changes = diff(dict(zip(new, old)), new)
+        if changes:
+            entries.append(history_entry(Asset(pk=pk), ACTION_UPDATED, changes, now))
+    AssetHistory.objects.bulk_create(entries)
+    return pks
+
+
+def record_bulk_delete(rows):
+    """
+    History for assets removed without the ORM collector, given their
+    .values() rows. Their attributes go with them and are not logged
+    separately.
+    """
+    now = timezone.now()
+    AssetHistory.objects.bulk_create(
+        history_entry(
+            Asset(pk=row["id"]),
+            ACTION_DELETED,
+            diff({k: v for k, v in row.items() if k not in IGNORED_FIELDS}, {}),
+            now,
+        )
+        for row in rows
+    )
@@ -0,0 +1,43 @@
+"""
+SQLite backend with per-connection tuning, for deployments that stay on
+SQLite under concurrent writes.
+
+Two extra OPTIONS keys are read (the rest go to sqlite3.connect() as usual):
+
+"pragmas"
+    {name: value} run as PRAGMA statements on every new connection, e.g.
+    journal_mode=WAL so readers never wait for the writer, and
+    busy_timeout so a writer waits for the lock instead of failing with
+    "database is locked".
+
+"transaction_mode"
+    "DEFERRED" (SQLite's default), "IMMEDIATE" or "EXCLUSIVE". Atomic
+    blocks start with BEGIN <mode>. IMMEDIATE takes the write lock up front,
+    so two transactions that read and then write queue on busy_timeout
+    rather than one of them failing when it tries to upgrade its lock.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+TRANSACTION_MODES = ("DEFERRED", "IMMEDIATE", "EXCLUSIVE")
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        self.pragmas = params.pop("pragmas", {})
+        self.transaction_mode = params.pop("transaction_mode", "DEFERRED").upper()
+        if self.transaction_mode not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(
+                f"transaction_mode must be one of {', '.join(TRANSACTION_MODES)}."
+            )
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute(f"BEGIN {self.transaction_mode}")
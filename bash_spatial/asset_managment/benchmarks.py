@@ -0,0 +1,250 @@
+"""
+In-process load generators for comparing the asset read paths.
+
+Requests go through Django's test clients, so the full middleware stack and
+the database are exercised but no network or server process is involved.
+run_sync() spreads requests over a thread pool; run_async() runs them as
+concurrent tasks on one event loop, which is how an ASGI server would.
+Both use the test clients' "testserver" host, which is allowed for the
+duration of the run.
+
+run_mixed() is the concurrency benchmark: threads issue a mix of page reads
+and assignment writes for a fixed time, counting requests that failed on a
+locked database separately from other errors.
+
+run_suite() is the scaling benchmark: it seeds the database up to each of
+several sizes and times a fixed set of scenarios (list, search, filters,
+detail, API, duplicate, assign) one request at a time, recording the query
+count and peak Python memory of each.
+"""
+import asyncio
+import math
+import random
+import statistics
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import OperationalError, connection, connections
+from django.test import AsyncClient, Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from .models import Asset
+from .pagination import encode_cursor
+from .seeding import seed_assets
+
+
+def summarize(durations, errors, elapsed):
+    durations = sorted(durations)
+    count = len(durations)
+    return {
+        "requests": count,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(count / elapsed, 1) if elapsed else None,
+        "p50_ms": round(statistics.median(durations) * 1000, 2) if durations else None,
+        "p95_ms": round(durations[math.ceil(count * 0.95) - 1] * 1000, 2) if durations else None,
+    }
+
+
+def _allow_test_host():
+    return override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"])
+
+
+def run_sync(path, user, requests, concurrency):
+    local = threading.local()
+
+    def client():
+        if not hasattr(local, "client"):
+            local.client = Client()
+            local.client.force_login(user)
+        return local.client
+
+    def one(_):
+        started = time.perf_counter()
+        status = client().get(path).status_code
+        return time.perf_counter() - started, status
+
+    def close(_):
+        connections.close_all()
+
+    started = time.perf_counter()
+    with _allow_test_host(), ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(requests)))
+        # Each worker thread opened its own database connection
+        list(pool.map(close, range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return summarize([d for d, _ in results], sum(s >= 400 for _, s in results), elapsed)
+
+
+def run_async(path, user, requests, concurrency):
+    client = AsyncClient()
+    client.force_login(user)
+
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one():
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.get(path)
+                return time.perf_counter() - started, response.status_code
+
+        return await asyncio.gather(*(one() for _ in range(requests)))
+
+    started = time.perf_counter()
+    with _allow_test_host():
+        results = asyncio.run(main())
+    elapsed = time.perf_counter() - started
+    return summarize([d for d, _ in results], sum(s >= 400 for _, s in results), elapsed)
+
+
+SCENARIOS = (
+    "list",
+    "list_deep",
+    "search",
+    "filter",
+    "attribute_filter",
+    "detail",
+    "api",
+    "duplicate",
+    "assign",
+)
+
+
+def scenario_requests(user):
+    """{scenario: (method, path, data)} for the current database contents."""
+    asset = Asset.objects.order_by("created_at", "id").first()
+    assignee = User.objects.exclude(pk=user.pk).order_by("pk").first() or user
+    detail = {"pk": asset.pk}
+    return {
+        "list": ("get", reverse("asset_list"), {}),
+        # The oldest asset's cursor, i.e. the last page
+        "list_deep": ("get", reverse("asset_list"), {"before": encode_cursor(asset.created_at, asset.pk)}),
+        "search": ("get", reverse("asset_list"), {"search": asset.name.split()[0]}),
+        "filter": ("get", reverse("asset_list"), {"category": asset.category, "status": asset.status}),
+        "attribute_filter": ("get", reverse("asset_list"), {"attr.ram__gte": "16", "overdue": "1"}),
+        "detail": ("get", reverse("asset_detail", kwargs=detail), {}),
+        "api": ("get", reverse("api_asset_list"), {"include": "attributes"}),
+        "duplicate": ("post", reverse("asset_duplicate", kwargs=detail), {
+            "name": "Benchmark copy",
+            "category": asset.category,
+            "status": asset.status,
+            "copies": 1,
+            "attributes_set-TOTAL_FORMS": 0,
+            "attributes_set-INITIAL_FORMS": 0,
+        }),
+        "assign": ("post", reverse("asset_assign", kwargs=detail), {"user_id": assignee.pk}),
+    }
+
+
+def measure(client, method, path, data, repeat):
+    """Time repeat requests, then trace one more for queries and memory."""
+    send = getattr(client, method)
+    durations, errors = [], 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        request_started = time.perf_counter()
+        errors += send(path, data).status_code >= 400
+        durations.append(time.perf_counter() - request_started)
+    result = summarize(durations, errors, time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            send(path, data)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    result["queries"] = len(queries)
+    result["peak_memory_kb"] = round(peak / 1024, 1)
+    return result
+
+
+def run_suite(sizes, attrs_per_asset=5, users=10, repeat=20, scenarios=SCENARIOS, seed=0, report=None):
+    """
+    Seed up to each size in turn and measure every scenario there. Returns
+    a list of result dicts; report(result) is called as each one is ready.
+    Writes to the current database, so run it against a throwaway one.
+    """
+    admin = User.objects.create_superuser(username="benchmark-admin", password=None)
+    client = Client()
+    client.force_login(admin)
+    results = []
+    with _allow_test_host():
+        for size in sorted(sizes):
+            missing = size - Asset.objects.count()
+            if missing > 0:
+                seed_assets(missing, attrs_per_asset, users, seed=seed + size)
+            cache.clear()
+            client.force_login(admin)
+            requests = scenario_requests(admin)
+            for name in scenarios:
+                method, path, data = requests[name]
+                client.get(reverse("asset_list"))  # warm the facet cache
+                result = {"size": size, "scenario": name, **measure(client, method, path, data, repeat)}
+                results.append(result)
+                if report is not None:
+                    report(result)
+    return results
+
+
+def run_mixed(user, asset_pks, assignee_pks, threads=8, seconds=10.0, write_ratio=0.2):
+    """
+    Run detail/list reads and assign writes from threads until seconds
+    have passed. Returns throughput and latency for reads and writes.
+    """
+    deadline = time.perf_counter() + seconds
+
+    def worker(n):
+        rng = random.Random(n)
+        client = Client()
+        client.force_login(user)
+        timings = {"read": [], "write": []}
+        errors = locked = 0
+        try:
+            while time.perf_counter() < deadline:
+                pk = rng.choice(asset_pks)
+                kind = "write" if rng.random() < write_ratio else "read"
+                started = time.perf_counter()
+                try:
+                    if kind == "write":
+                        response = client.post(
+                            reverse("asset_assign", kwargs={"pk": pk}),
+                            {"user_id": rng.choice(assignee_pks)},
+                        )
+                    elif rng.random() < 0.5:
+                        response = client.get(reverse("asset_detail", kwargs={"pk": pk}))
+                    else:
+                        response = client.get(reverse("asset_list"))
+                except OperationalError:
+                    locked += 1
+                    continue
+                if response.status_code >= 400:
+                    errors += 1
+                    continue
+                timings[kind].append(time.perf_counter() - started)
+        finally:
+            connections.close_all()
+        return timings, errors, locked
+
+    started = time.perf_counter()
+    with _allow_test_host(), ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(worker, range(threads)))
+    elapsed = time.perf_counter() - started
+
+    reads = [d for timings, _, _ in results for d in timings["read"]]
+    writes = [d for timings, _, _ in results for d in timings["write"]]
+    return {
+        "threads": threads,
+        "seconds": round(elapsed, 3),
+        "reads": summarize(reads, 0, elapsed),
+        "writes": summarize(writes, 0, elapsed),
+        "errors": sum(e for _, e, _ in results),
+        "locked": sum(lock for _, _, lock in results),
+    }
@@ -0,0 +1,98 @@
+"""
+Set-based bulk operations on many assets at once.
+
+Each action is a single UPDATE or DELETE over the queryset it is given,
+inside one transaction. Callers pass a queryset that already carries the
+visible_to() filter, so the access check happens in SQL as well.
+"""
+from django.db import transaction
+from django.db.models import BooleanField, ExpressionWrapper, Q
+from django.utils import timezone
+
+from .audit import record_bulk_delete, record_bulk_update
+from .detail_cache import invalidate_details
+from .facets import invalidate_facets
+from .models import OVERDUE_EXEMPT_STATUS, Asset, Attribute
+from .search import get_search_backend
+
+ACTION_STATUS = "status"
+ACTION_ASSIGN = "assign"
+ACTION_UNASSIGN = "unassign"
+ACTION_DELETE = "delete"
+
+# Assets per DELETE statement, under every backend's parameter limit
+DELETE_BATCH_SIZE = 500
+
+ACTION_CHOICES = [
+    (ACTION_STATUS, "Change status"),
+    (ACTION_ASSIGN, "Assign to user"),
+    (ACTION_UNASSIGN, "Unassign"),
+    (ACTION_DELETE, "Delete"),
+]
+
+
+def _target(queryset):
+    # Strip ordering, joins and slicing down to a plain pk subquery
+    return Asset.objects.filter(pk__in=queryset.order_by().values("pk"))
+
+
+def bulk_update(queryset, **values):
+    """
+    UPDATE every asset in queryset, bumping updated_at, and log what changed
+    for each of them. Returns the count.
+    """
+    values.setdefault("updated_at", timezone.now())
+    if "status" in values:
+        # The UPDATE's expressions see the old status, so the overdue flag
+        # is decided from the new one here
+        if values["status"] == OVERDUE_EXEMPT_STATUS:
+            values["overdue"] = False
+        else:
+            values["overdue"] = ExpressionWrapper(
+                Q(depreciation__isnull=False, depreciation__lt=timezone.localdate()),
+                output_field=BooleanField(),
+            )
+    target = _target(queryset)
+    with transaction.atomic():
+        pks = record_bulk_update(target, values)
+        count = target.update(**values)
+        invalidate_details(pks)
+        if "status" in values or "category" in values:
+            invalidate_facets()
+    return count
+
+
+def bulk_delete(queryset):
+    """
+    DELETE every asset in queryset along with its attributes. This skips the
+    ORM collector, which would load every row to send per-object signals, so
+    the history, search index and caches are updated here instead.
+    """
+    target = _target(queryset)
+    with transaction.atomic():
+        rows = list(target.values(*[f.attname for f in Asset._meta.concrete_fields]))
+        pks = [row["id"] for row in rows]
+        record_bulk_delete(rows)
+        # By the pks read above: the target query may filter on attributes
+        # or the search index, so it must not be run again mid-delete
+        count = 0
+        for start in range(0, len(pks), DELETE_BATCH_SIZE):
+            batch = pks[start:start + DELETE_BATCH_SIZE]
+            Attribute.objects.filter(asset_id__in=batch)._raw_delete(target.db)
+            count += Asset.objects.filter(pk__in=batch)._raw_delete(target.db)
+        get_search_backend().remove_assets(pks)
+        invalidate_facets()
+        invalidate_details(pks)
+    return count
+
+
+def apply_bulk_action(queryset, action, status=None, assignee=None):
+    if action == ACTION_STATUS:
+        return bulk_update(queryset, status=status)
+    if action == ACTION_ASSIGN:
+        return bulk_update(queryset, assigned_to=assignee, status="checked_out")
+    if action == ACTION_UNASSIGN:
+        return bulk_update(queryset, assigned_to=None)
+    if action == ACTION_DELETE:
+        return bulk_delete(queryset)
+    raise ValueError(f"Unknown bulk action {action!r}")
@@ -0,0 +1,50 @@
+"""
+Conditional GET for the asset pages.
+
+Views describe their current state with get_validators(), which must be
+cheap: an aggregate or an already-loaded row, never the page itself. When
+the client's If-None-Match / If-Modified-Since still match, the view answers
+304 without building a context or rendering anything.
+"""
+import hashlib
+from calendar import timegm
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(*parts):
+    return hashlib.sha1("|".join(str(p) for p in parts).encode()).hexdigest()
+
+
+def timestamp(dt):
+    return timegm(dt.utctimetuple()) if dt else None
+
+
+def not_modified(request, etag, last_modified):
+    """A 304 response if the client's copy is current, else None."""
+    return get_conditional_response(
+        request, etag=quote_etag(etag), last_modified=timestamp(last_modified)
+    )
+
+
+def add_validators(response, etag, last_modified):
+    if response.status_code in (200, 304):
+        response.headers.setdefault("ETag", quote_etag(etag))
+        if last_modified is not None:
+            response.headers.setdefault("Last-Modified", http_date(timestamp(last_modified)))
+        # Let browsers keep the page but make them ask before reusing it
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+class ConditionalGetMixin:
+    def get_validators(self):
+        """Return (etag, last_modified datetime or None) for this request."""
+        raise NotImplementedError
+
+    def conditional_get(self, render):
+        """Answer 304 when the client is current, otherwise return render()."""
+        etag, last_modified = self.get_validators()
+        response = not_modified(self.request, etag, last_modified) or render()
+        return add_validators(response, etag, last_modified)
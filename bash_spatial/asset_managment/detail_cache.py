@@ -0,0 +1,151 @@
+"""
+Read-through cache for the asset detail page.
+
+An asset, its assignee's username and its attributes are stored as plain
+values under one key per asset, so a hit rebuilds the page's objects without
+touching the database. Keys carry DETAIL_CACHE_VERSION; bump it whenever the
+stored shape changes and old entries are simply never read again. Misses are
+read from the primary database even on pages served from a read replica, so
+a lagging replica never refills the cache with an asset the last write
+replaced.
+
+Entries are dropped by the Asset and Attribute signals in signals.py, after
+the write commits. Bulk writes that bypass signals must call
+invalidate_details() with the pks they touched. The cache is settings.ASSET_DETAIL_CACHE (an alias in CACHES,
+"default" unless set), so a shared backend such as Redis works unchanged.
+
+Hits, misses and invalidations are counted in the same cache; see stats().
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, router, transaction
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+
+from .models import Asset, Attribute
+
+DETAIL_CACHE_VERSION = 1
+DETAIL_TIMEOUT = 60 * 5
+
+STAT_HITS = "hits"
+STAT_MISSES = "misses"
+STAT_INVALIDATIONS = "invalidations"
+STATS = (STAT_HITS, STAT_MISSES, STAT_INVALIDATIONS)
+
+
+def get_cache():
+    return caches[getattr(settings, "ASSET_DETAIL_CACHE", "default")]
+
+
+def detail_key(pk):
+    return f"asset_managment:detail:v{DETAIL_CACHE_VERSION}:{pk}"
+
+
+def _stat_key(name):
+    return f"asset_managment:detail-stats:{name}"
+
+
+def _count(name, delta=1):
+    cache = get_cache()
+    key = _stat_key(name)
+    # add() is a no-op when the counter exists; incr() is atomic on shared backends
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        # Evicted between add() and incr()
+        cache.set(key, delta, timeout=None)
+
+
+def stats():
+    """{"hits": n, "misses": n, "invalidations": n} since the last reset."""
+    values = get_cache().get_many([_stat_key(name) for name in STATS])
+    return {name: values.get(_stat_key(name), 0) for name in STATS}
+
+
+def reset_stats():
+    get_cache().delete_many([_stat_key(name) for name in STATS])
+
+
+def serialize(asset):
+    values = asset.field_values()
+    assignee = asset.assigned_to
+    return {
+        "asset": values,
+        "assignee": assignee.username if assignee else None,
+        "attributes": [a.field_values() for a in asset.attributes_set.all()],
+    }
+
+
+def _from_values(model, values):
+    return model.from_db(router.db_for_read(model), list(values), list(values.values()))
+
+
+def deserialize(data):
+    """Rebuild the asset with its assignee and prefetched attributes in place."""
+    asset = _from_values(Asset, data["asset"])
+    if data["assignee"] is not None:
+        asset.assigned_to = User(pk=asset.assigned_to_id, username=data["assignee"])
+
+    attributes = [_from_values(Attribute, values) for values in data["attributes"]]
+    for attribute in attributes:
+        attribute.asset = asset
+    queryset = asset.attributes_set.all()
+    queryset._result_cache = attributes
+    queryset._prefetch_done = True
+    asset._prefetched_objects_cache = {"attributes_set": queryset}
+    return asset
+
+
+def load_asset_detail(queryset, pk):
+    """
+    Return the asset from the cache, or from queryset (which should
+    select the assignee and prefetch attributes) on a miss. Raises Http404
+    if the asset does not exist.
+    """
+    cache = get_cache()
+    data = cache.get(detail_key(pk))
+    if data is not None:
+        _count(STAT_HITS)
+        return deserialize(data)
+
+    _count(STAT_MISSES)
+    asset = get_object_or_404(queryset.using(DEFAULT_DB_ALIAS), pk=pk)
+    cache.set(detail_key(pk), serialize(asset), DETAIL_TIMEOUT)
+    return asset
+
+
+async def aload_asset_detail(queryset, pk):
+    """load_asset_detail() through the async cache and ORM APIs."""
+    cache = get_cache()
+    data = await cache.aget(detail_key(pk))
+    if data is not None:
+        await sync_to_async(_count)(STAT_HITS)
+        return deserialize(data)
+
+    await sync_to_async(_count)(STAT_MISSES)
+    try:
+        asset = await queryset.using(DEFAULT_DB_ALIAS).aget(pk=pk)
+    except Asset.DoesNotExist:
+        raise Http404("No asset found.")
+    await cache.aset(detail_key(pk), serialize(asset), DETAIL_TIMEOUT)
+    return asset
+
+
+def _delete_details(pks):
+    get_cache().delete_many([detail_key(pk) for pk in pks])
+    _count(STAT_INVALIDATIONS, len(pks))
+
+
+def invalidate_details(pks):
+    """
+    Drop the entries once the current transaction commits (at once outside
+    one). Dropped any earlier, a concurrent miss could read the old row
+    back in before the write is visible and keep it for DETAIL_TIMEOUT.
+    """
+    pks = list(pks)
+    if not pks:
+        return
+    transaction.on_commit(lambda: _delete_details(pks))
@@ -0,0 +1,113 @@
+"""
+Category and status counts for the asset list filters.
+
+The counts live in the cache as {category: {status: count}}. They are built
+with one GROUP BY on a miss and then kept current by the Asset signals in
+signals.py, so reading them costs O(categories) instead of a table scan.
+Changes are applied when the write commits, so a rolled-back save leaves
+them alone. Bulk writes that bypass signals must call invalidate_facets().
+The timeout bounds any drift from concurrent updates.
+"""
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Count
+
+from .models import Asset
+
+FACET_CACHE_KEY = "asset_managment:facets"
+FACET_TIMEOUT = 60 * 10
+
+
+class CategoryFacets:
+    def __init__(self, counts):
+        self.counts = counts
+
+    @property
+    def categories(self):
+        return sorted(self.counts)
+
+    @property
+    def category_counts(self):
+        """[(category, total)] sorted by category name."""
+        return [(c, sum(self.counts[c].values())) for c in self.categories]
+
+    @property
+    def status_counts(self):
+        """{status: total} across every category."""
+        totals = {}
+        for statuses in self.counts.values():
+            for status, n in statuses.items():
+                totals[status] = totals.get(status, 0) + n
+        return totals
+
+    def count(self, category=None, status=None):
+        total = 0
+        for c, statuses in self.counts.items():
+            if category is not None and c != category:
+                continue
+            for s, n in statuses.items():
+                if status is None or s == status:
+                    total += n
+        return total
+
+
+def build_counts():
+    counts = {}
+    # From the primary: counts cached from a lagging replica would stay wrong
+    # until FACET_TIMEOUT
+    rows = (
+        Asset.objects.using(DEFAULT_DB_ALIAS)
+        .order_by()
+        .values("category", "status")
+        .annotate(n=Count("pk"))
+    )
+    for row in rows:
+        counts.setdefault(row["category"], {})[row["status"]] = row["n"]
+    return counts
+
+
+def get_facets():
+    counts = cache.get(FACET_CACHE_KEY)
+    if counts is None:
+        counts = rebuild_facets()
+    return CategoryFacets(counts)
+
+
+def cached_facets():
+    """The cached facets, or None on a miss. Never touches the database."""
+    counts = cache.get(FACET_CACHE_KEY)
+    return None if counts is None else CategoryFacets(counts)
+
+
+def rebuild_facets():
+    counts = build_counts()
+    cache.set(FACET_CACHE_KEY, counts, FACET_TIMEOUT)
+    return counts
+
+
+def invalidate_facets():
+    transaction.on_commit(lambda: cache.delete(FACET_CACHE_KEY))
+
+
+def adjust_facets(changes):
+    """
+    Apply [((category, status), delta)] to the cached counts once the
+    current transaction commits, so a rollback changes nothing. If nothing
+    is cached there is nothing to adjust; the next read rebuilds from
+    scratch.
+    """
+    transaction.on_commit(lambda: _adjust(changes))
+
+
+def _adjust(changes):
+    counts = cache.get(FACET_CACHE_KEY)
+    if counts is None:
+        return
+    for (category, status), delta in changes:
+        statuses = counts.setdefault(category, {})
+        statuses[status] = statuses.get(status, 0) + delta
+        if statuses[status] <= 0:
+            del statuses[status]
+        if not statuses:
+            del counts[category]
+    cache.set(FACET_CACHE_KEY, counts, FACET_TIMEOUT)
@@ -1,6 +1,19 @@
+import uuid
+
 from django import forms
-from django.forms.models import inlineformset_factory
-from .models import Asset, Attribute
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.forms.models import (
+    BaseInlineFormSet,
+    BaseModelFormSet,
+    inlineformset_factory,
+    modelformset_factory,
+)
+from .api import API_FIELDS, DEFAULT_PAGE_SIZE, INCLUDE_CHOICES, MAX_IDS, MAX_PAGE_SIZE
+from .bulk import ACTION_ASSIGN, ACTION_CHOICES, ACTION_STATUS
+from .duplication import MAX_COPIES
+from .attribute_types import attribute_key
+from .models import Asset, Attribute, AttributeTemplate
 
 
 class AssetForm(forms.ModelForm):
@@ -21,6 +34,15 @@ class AssetForm(forms.ModelForm):
         }
 
 
+class AssetDuplicateForm(AssetForm):
+    copies = forms.IntegerField(
+        min_value=1,
+        max_value=MAX_COPIES,
+        initial=1,
+        help_text='With more than one copy, "{n}" in the name is replaced by the copy number.',
+    )
+
+
 class AttributeForm(forms.ModelForm):
     class Meta:
         model = Attribute
@@ -42,3 +64,211 @@ AssetAttributeFormSet = inlineformset_factory(
     extra=1,
     can_delete=True,
 )
+
+
+class TemplatedAttributeForm(AttributeForm):
+    # Set on pre-filled rows that must be saved (or rejected) even if untouched
+    keep_initial = False
+
+    def has_changed(self):
+        return self.keep_initial or super().has_changed()
+
+
+class BaseTemplatedAttributeFormSet(BaseInlineFormSet):
+    """
+    Attribute formset driven by the asset category's templates. Templated
+    attributes the asset does not have yet are offered as pre-filled extra
+    rows; on submit, names are normalised to the template's spelling, values
+    are checked against the declared type, and required ones must be there.
+    """
+
+    def __init__(self, *args, templates=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.templates = list(templates)
+        present = {attribute_key(a.name) for a in self.get_queryset()}
+        self.missing_templates = [t for t in self.templates if t.key not in present]
+        self.initial_extra = [
+            {"name": t.name, "value": t.default_value} for t in self.missing_templates
+        ]
+        self.extra = max(len(self.missing_templates), 1)
+
+    def _construct_form(self, i, **kwargs):
+        form = super()._construct_form(i, **kwargs)
+        n = i - self.initial_form_count()
+        if 0 <= n < len(self.missing_templates):
+            template = self.missing_templates[n]
+            form.keep_initial = bool(template.required or template.default_value)
+        return form
+
+    def clean(self):
+        super().clean()
+        by_key = {t.key: t for t in self.templates}
+        present = set()
+        for form in self.forms:
+            if self._should_delete_form(form) or not form.cleaned_data.get("name"):
+                continue
+            template = by_key.get(attribute_key(form.cleaned_data["name"]))
+            if template is None:
+                continue
+            present.add(template.key)
+            form.cleaned_data["name"] = form.instance.name = template.name
+            value = form.cleaned_data.get("value")
+            if value is not None and not template.accepts(value):
+                form.add_error(
+                    "value",
+                    f"{template.name} must be a {template.get_value_type_display().lower()} value.",
+                )
+        missing = [t.name for t in self.templates if t.required and t.key not in present]
+        if missing:
+            raise ValidationError(f"Missing required attributes: {', '.join(missing)}.")
+
+
+TemplatedAttributeFormSet = inlineformset_factory(
+    parent_model=Asset,
+    model=Attribute,
+    form=TemplatedAttributeForm,
+    formset=BaseTemplatedAttributeFormSet,
+    extra=1,
+    can_delete=True,
+)
+
+
+def templated_attribute_formset(category, data=None, instance=None):
+    """TemplatedAttributeFormSet for the templates of category."""
+    return TemplatedAttributeFormSet(
+        data, instance=instance, templates=AttributeTemplate.objects.for_category(category)
+    )
+
+
+class AttributeTemplateForm(forms.ModelForm):
+    class Meta:
+        model = AttributeTemplate
+        fields = ["name", "value_type", "required", "default_value", "position"]
+        widgets = {
+            "name": forms.TextInput(attrs={"placeholder": "Serial Number"}),
+        }
+
+    def clean(self):
+        cleaned_data = super().clean()
+        default = cleaned_data.get("default_value")
+        value_type = cleaned_data.get("value_type")
+        if default and value_type:
+            probe = AttributeTemplate(value_type=value_type)
+            if not probe.accepts(default):
+                self.add_error(
+                    "default_value",
+                    f"Must be a {probe.get_value_type_display().lower()} value.",
+                )
+        return cleaned_data
+
+
+class BaseAttributeTemplateFormSet(BaseModelFormSet):
+    def clean(self):
+        super().clean()
+        # The formset holds every template of the category, so a clash with
+        # the (category, key) constraint shows up here
+        seen = set()
+        for form in self.forms:
+            if self._should_delete_form(form) or not form.cleaned_data.get("name"):
+                continue
+            key = attribute_key(form.cleaned_data["name"])
+            if key in seen:
+                raise ValidationError(f'More than one template is named "{form.cleaned_data["name"]}".')
+            seen.add(key)
+
+
+AttributeTemplateFormSet = modelformset_factory(
+    AttributeTemplate,
+    form=AttributeTemplateForm,
+    formset=BaseAttributeTemplateFormSet,
+    extra=1,
+    can_delete=True,
+)
+
+
+class AssetImportUploadForm(forms.Form):
+    file = forms.FileField()
+    format = forms.ChoiceField(
+        choices=[("", "Detect from file name"), ("csv", "CSV"), ("jsonl", "JSON Lines")],
+        required=False,
+    )
+
+
+class AssetIdListField(forms.Field):
+    widget = forms.MultipleHiddenInput
+
+    def to_python(self, value):
+        if not value:
+            return []
+        try:
+            return [uuid.UUID(str(v)) for v in value]
+        except ValueError:
+            raise forms.ValidationError("Invalid asset id.")
+
+
+class AssetBulkActionForm(forms.Form):
+    SCOPE_CHOICES = [
+        ("selected", "Selected assets"),
+        ("all", "Every asset matching the current filters"),
+    ]
+
+    action = forms.ChoiceField(choices=ACTION_CHOICES)
+    scope = forms.ChoiceField(choices=SCOPE_CHOICES, required=False)
+    asset_ids = AssetIdListField(required=False)
+    status = forms.ChoiceField(choices=Asset.STATUS_CHOICES, required=False)
+    assigned_to = forms.CharField(required=False, help_text="Username")
+
+    def clean(self):
+        cleaned = super().clean()
+        action = cleaned.get("action")
+        cleaned["scope"] = cleaned.get("scope") or "selected"
+        if cleaned["scope"] == "selected" and not cleaned.get("asset_ids"):
+            raise forms.ValidationError("Select at least one asset.")
+        if action == ACTION_STATUS and not cleaned.get("status"):
+            self.add_error("status", "Choose the new status.")
+        if action == ACTION_ASSIGN:
+            username = cleaned.get("assigned_to")
+            try:
+                cleaned["assignee"] = User.objects.get(username=username)
+            except User.DoesNotExist:
+                self.add_error("assigned_to", f"Unknown user {username!r}.")
+        return cleaned
+
+
+class CommaSeparatedField(forms.CharField):
+    def to_python(self, value):
+        value = super().to_python(value)
+        return [v.strip() for v in value.split(",") if v.strip()]
+
+
+class AssetApiQueryForm(forms.Form):
+    """Query string options of the JSON API, on top of the list filters."""
+
+    fields = CommaSeparatedField(required=False)
+    include = CommaSeparatedField(required=False)
+    ids = CommaSeparatedField(required=False)
+    limit = forms.IntegerField(min_value=1, max_value=MAX_PAGE_SIZE, required=False)
+
+    def clean_fields(self):
+        fields = self.cleaned_data["fields"] or list(API_FIELDS)
+        unknown = [f for f in fields if f not in API_FIELDS]
+        if unknown:
+            raise forms.ValidationError(f"Unknown fields: {', '.join(unknown)}.")
+        # The id is always returned
+        return ["id"] + [f for f in dict.fromkeys(fields) if f != "id"]
+
+    def clean_include(self):
+        include = self.cleaned_data["include"]
+        unknown = [i for i in include if i not in INCLUDE_CHOICES]
+        if unknown:
+            raise forms.ValidationError(f"Cannot include: {', '.join(unknown)}.")
+        return include
+
+    def clean_ids(self):
+        ids = self.cleaned_data["ids"]
+        if len(ids) > MAX_IDS:
+            raise forms.ValidationError(f"At most {MAX_IDS} ids per request.")
+        return AssetIdListField(required=False).clean(ids)
+
+    def clean_limit(self):
+        return self.cleaned_data["limit"] or DEFAULT_PAGE_SIZE
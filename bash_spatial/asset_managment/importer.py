@@ -0,0 +1,186 @@
+"""
+Bulk asset import from CSV or JSONL.
+
+Rows are read one at a time, validated with the AssetForm rules and written
+in transaction batches with bulk_create, so memory stays flat however big
+the input is. A bad row is reported and skipped; it never aborts its batch.
+
+CSV columns are the AssetForm fields (assigned_to is a username) plus one
+"attr:<name>" column per attribute. JSONL objects use the same keys, with
+attributes given as {"attributes": {"Serial Number": "SN1", ...}}.
+"""
+import csv
+import json
+
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from .audit import record_created
+from .facets import invalidate_facets
+from .forms import AssetForm
+from .models import Asset, Attribute
+from .search import get_search_backend
+
+FORMATS = ("csv", "jsonl")
+ATTRIBUTE_PREFIX = "attr:"
+
+
+class AssetImportForm(AssetForm):
+    """AssetForm without assigned_to, which is resolved per batch instead."""
+
+    class Meta(AssetForm.Meta):
+        fields = [f for f in AssetForm.Meta.fields if f != "assigned_to"]
+
+
+class ImportResult:
+    def __init__(self, max_errors=1000):
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+        self.max_errors = max_errors
+
+    def add_error(self, line, errors):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append((line, errors))
+
+    def __str__(self):
+        return f"{self.created} created, {self.failed} failed"
+
+
+def guess_format(filename):
+    return "jsonl" if filename.lower().endswith((".jsonl", ".ndjson")) else "csv"
+
+
+def read_rows(stream, fmt):
+    """Yield (line number, row dict or error message) from a text stream."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            attributes = {}
+            for key in list(row):
+                if key and key.startswith(ATTRIBUTE_PREFIX):
+                    value = row.pop(key)
+                    if value:
+                        attributes[key[len(ATTRIBUTE_PREFIX):].strip()] = value
+            row["attributes"] = attributes
+            yield reader.line_num, row
+    elif fmt == "jsonl":
+        for line_num, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as exc:
+                yield line_num, f"Invalid JSON: {exc}"
+                continue
+            if not isinstance(row, dict):
+                yield line_num, "Expected a JSON object."
+                continue
+            yield line_num, row
+    else:
+        raise ValueError(f"Unknown import format {fmt!r}")
+
+
+def _type_errors(row):
+    # JSONL values can be any JSON type; the form and the username lookup
+    # expect text
+    return {
+        name: ["Must be a string."]
+        for name in AssetForm.Meta.fields
+        if row.get(name) is not None and not isinstance(row[name], str)
+    }
+
+
+def _with_defaults(row):
+    data = {}
+    for name in AssetImportForm.Meta.fields:
+        value = row.get(name)
+        if value in (None, ""):
+            field = Asset._meta.get_field(name)
+            value = field.get_default() if field.has_default() else ""
+        data[name] = value
+    return data
+
+
+def _attribute_pairs(row):
+    attributes = row.get("attributes") or {}
+    if isinstance(attributes, dict):
+        pairs = attributes.items()
+    elif isinstance(attributes, list) and all(isinstance(a, dict) for a in attributes):
+        pairs = [(a.get("name"), a.get("value")) for a in attributes]
+    else:
+        raise ValueError("Attributes must be an object or a list of objects.")
+    pairs = [(str(name), "" if value is None else str(value)) for name, value in pairs if name]
+    for name, value in pairs:
+        if len(name) > 255 or len(value) > 1023:
+            raise ValueError(f"Attribute {name[:40]!r} is too long.")
+    return pairs
+
+
+def _write_batch(batch, result):
+    usernames = {row.get("assigned_to") for _, row, _ in batch} - {None, ""}
+    users = dict(
+        User.objects.filter(username__in=usernames).values_list("username", "pk")
+    )
+
+    assets = []
+    attributes = []
+    for line, row, asset in batch:
+        username = row.get("assigned_to")
+        if username and username not in users:
+            result.add_error(line, {"assigned_to": [f"Unknown user {username!r}."]})
+            continue
+        try:
+            pairs = _attribute_pairs(row)
+        except ValueError as exc:
+            result.add_error(line, {"attributes": [str(exc)]})
+            continue
+        if username:
+            asset.assigned_to_id = users[username]
+        asset.set_overdue()
+        assets.append(asset)
+        for n, v in pairs:
+            attribute = Attribute(asset=asset, name=n, value=v)
+            attribute.set_typed_value()
+            attributes.append(attribute)
+
+    with transaction.atomic():
+        Asset.objects.bulk_create(assets)
+        Attribute.objects.bulk_create(attributes)
+        record_created(assets, attributes)
+        get_search_backend().index_assets([a.pk for a in assets])
+    result.created += len(assets)
+
+
+def import_assets(stream, fmt="csv", batch_size=1000, result=None, on_batch=None):
+    """
+    Import every row in stream. Returns an ImportResult. on_batch, if given,
+    is called with the result after each batch is written.
+    """
+    result = result or ImportResult()
+    batch = []
+    for line, row in read_rows(stream, fmt):
+        if isinstance(row, str):
+            result.add_error(line, {"__all__": [row]})
+            continue
+        errors = _type_errors(row)
+        if errors:
+            result.add_error(line, errors)
+            continue
+        form = AssetImportForm(data=_with_defaults(row))
+        if not form.is_valid():
+            result.add_error(line, {f: list(e) for f, e in form.errors.items()})
+            continue
+        batch.append((line, row, form.save(commit=False)))
+        if len(batch) >= batch_size:
+            _write_batch(batch, result)
+            batch = []
+            if on_batch:
+                on_batch(result)
+    if batch:
+        _write_batch(batch, result)
+        if on_batch:
+            on_batch(result)
+    invalidate_facets()
+    return result
@@ -0,0 +1,225 @@
+"""
+Per-view query and latency metrics.
+
+RequestMetricsMiddleware opens a RequestMetrics for each request in a
+context variable. Every database connection carries record_query() as its
+outermost execute wrapper (installed on connection_created in signals.py),
+which adds each query's count and time to the current request, including
+queries run from async views through sync_to_async. Template render time is
+taken from TemplateResponse.render(), or from render_timer() where a view
+renders by hand.
+
+Finished requests are folded into a per-process registry keyed by URL name,
+served in the Prometheus text format by metrics_text(). Views listed in
+settings.ASSET_QUERY_BUDGETS ({url name: max queries}) are checked after
+every request; over budget is logged, or raised as QueryBudgetExceeded when
+settings.ASSET_QUERY_BUDGET_ACTION is "raise" (useful in tests).
+"""
+import contextvars
+import copy
+import logging
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+BUDGET_LOG = "log"
+BUDGET_RAISE = "raise"
+
+# Upper bounds, in seconds, of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+UNRESOLVED = "unresolved"
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class RequestMetrics:
+    __slots__ = ("queries", "db_time", "render_time", "started")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+        self.started = perf_counter()
+
+    def elapsed(self):
+        return perf_counter() - self.started
+
+
+_current = contextvars.ContextVar("asset_request_metrics", default=None)
+
+
+def current_metrics():
+    return _current.get()
+
+
+@contextmanager
+def collect_metrics():
+    metrics = RequestMetrics()
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+
+def record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_time += perf_counter() - start
+
+
+def install_query_recorder(connection):
+    # First in the list, so execute_wrapper() blocks entered before the
+    # connection opened still pop their own wrapper on exit
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+@contextmanager
+def render_timer():
+    """Count the time spent in the block as template rendering."""
+    metrics = _current.get()
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        if metrics is not None:
+            metrics.render_time += perf_counter() - start
+
+
+def timed_render(response):
+    """Make response.render() count towards the request's render time."""
+    render = response.render
+
+    def render_and_time():
+        with render_timer():
+            return render()
+
+    response.render = render_and_time
+    return response
+
+
+class ViewStats:
+    __slots__ = ("requests", "queries", "max_queries", "db_time", "render_time", "total_time", "buckets")
+
+    def __init__(self):
+        self.requests = 0
+        self.queries = 0
+        self.max_queries = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+        self.total_time = 0.0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+
+    def add(self, metrics, elapsed):
+        self.requests += 1
+        self.queries += metrics.queries
+        self.max_queries = max(self.max_queries, metrics.queries)
+        self.db_time += metrics.db_time
+        self.render_time += metrics.render_time
+        self.total_time += elapsed
+        for n, bound in enumerate(LATENCY_BUCKETS):
+            if elapsed <= bound:
+                self.buckets[n] += 1
+
+
+_lock = threading.Lock()
+_stats = {}
+
+
+def record_request(view_name, metrics, elapsed):
+    with _lock:
+        _stats.setdefault(view_name, ViewStats()).add(metrics, elapsed)
+
+
+def view_stats():
+    """{url name: ViewStats} for this process, as a snapshot."""
+    with _lock:
+        snapshot = {}
+        for name, stats in _stats.items():
+            snapshot[name] = copy.copy(stats)
+            snapshot[name].buckets = list(stats.buckets)
+        return snapshot
+
+
+def reset_view_stats():
+    with _lock:
+        _stats.clear()
+
+
+def check_budget(view_name, metrics):
+    budget = getattr(settings, "ASSET_QUERY_BUDGETS", {}).get(view_name)
+    if budget is None or metrics.queries <= budget:
+        return
+    message = f"{view_name} ran {metrics.queries} queries, over its budget of {budget}"
+    if getattr(settings, "ASSET_QUERY_BUDGET_ACTION", BUDGET_LOG) == BUDGET_RAISE:
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+def server_timing(metrics, elapsed):
+    """Server-Timing header value for one request."""
+    return (
+        f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.queries} queries", '
+        f"render;dur={metrics.render_time * 1000:.1f}, "
+        f"total;dur={elapsed * 1000:.1f}"
+    )
+
+
+def _sample(name, labels, value):
+    if not labels:
+        return f"{name} {value}"
+    label_text = ",".join(f'{k}="{v}"' for k, v in labels.items())
+    return f"{name}{{{label_text}}} {value}"
+
+
+def _metric(lines, name, kind, help_text, samples):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+    lines.extend(_sample(name, labels, value) for labels, value in samples)
+
+
+def metrics_text(extra_counters=()):
+    """
+    Every view's stats in the Prometheus text exposition format, followed
+    by extra_counters [(name, help, value)].
+    """
+    stats = sorted(view_stats().items())
+    lines = []
+    _metric(lines, "asset_view_requests_total", "counter", "Requests handled.",
+            [({"view": v}, s.requests) for v, s in stats])
+    _metric(lines, "asset_view_queries_total", "counter", "SQL queries run.",
+            [({"view": v}, s.queries) for v, s in stats])
+    _metric(lines, "asset_view_max_queries", "gauge", "Most SQL queries run by one request.",
+            [({"view": v}, s.max_queries) for v, s in stats])
+    _metric(lines, "asset_view_db_seconds_total", "counter", "Time spent in SQL queries.",
+            [({"view": v}, f"{s.db_time:.6f}") for v, s in stats])
+    _metric(lines, "asset_view_render_seconds_total", "counter", "Time spent rendering templates.",
+            [({"view": v}, f"{s.render_time:.6f}") for v, s in stats])
+
+    name = "asset_view_duration_seconds"
+    lines.append(f"# HELP {name} Request latency.")
+    lines.append(f"# TYPE {name} histogram")
+    for view, s in stats:
+        for bound, count in zip(LATENCY_BUCKETS, s.buckets):
+            lines.append(_sample(f"{name}_bucket", {"view": view, "le": bound}, count))
+        lines.append(_sample(f"{name}_bucket", {"view": view, "le": "+Inf"}, s.requests))
+        lines.append(_sample(f"{name}_sum", {"view": view}, f"{s.total_time:.6f}"))
+        lines.append(_sample(f"{name}_count", {"view": view}, s.requests))
+
+    for counter, help_text, value in extra_counters:
+        _metric(lines, counter, "counter", help_text, [({}, value)])
+    return "\n".join(lines) + "\n"
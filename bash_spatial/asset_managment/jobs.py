@@ -0,0 +1,258 @@
+"""
+Database-backed queue for work too slow to run inside a request.
+
+enqueue() adds an AssetJob row and run_asset_worker claims due jobs one at a
+time and runs the handler for the job's kind (see tasks.py). No broker is
+needed, and any number of workers can share the table:
+
+* Backends with SKIP LOCKED (PostgreSQL): SELECT ... FOR UPDATE SKIP LOCKED
+  picks the oldest due job no other worker is claiming, and it is marked
+  running in the same transaction.
+* SQLite: the oldest due jobs are read, then claimed with an UPDATE that
+  repeats the "still claimable" condition, which only one worker can win.
+  The others move on to the next candidate.
+
+Handlers report progress with report_progress(), which doubles as the
+job's heartbeat. A running job whose heartbeat is older than JOB_LEASE has
+lost its worker and can be claimed again, as another attempt. Failed
+attempts are retried after RETRY_DELAY, doubling each time, until
+max_attempts; a handler raises JobError for failures a retry cannot fix.
+
+Jobs clear the detail and facet caches they make stale, so workers need a
+cache shared with the web server; run_asset_worker refuses to start on a
+per-process one (see local_cache_aliases()).
+"""
+import logging
+import os
+import socket
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.files.storage import FileSystemStorage
+from django.db import close_old_connections, connections, router, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .audit import audit_user
+from .models import AssetJob
+
+logger = logging.getLogger(__name__)
+
+JOB_IMPORT = "import"
+JOB_EXPORT = "export"
+JOB_BULK_ACTION = "bulk_action"
+JOB_SWEEP_OVERDUE = "sweep_overdue"
+JOB_REBUILD_FACETS = "rebuild_facets"
+JOB_KINDS = (JOB_IMPORT, JOB_EXPORT, JOB_BULK_ACTION, JOB_SWEEP_OVERDUE, JOB_REBUILD_FACETS)
+
+JOB_LEASE = timedelta(minutes=10)
+RETRY_DELAY = timedelta(seconds=30)
+# Candidates read per claim on backends without SKIP LOCKED
+CLAIM_CANDIDATES = 10
+
+
+class JobError(Exception):
+    """A failure that retrying will not fix; the job fails at once."""
+
+
+class JobNotFinished(Exception):
+    pass
+
+
+class JobFailed(Exception):
+    pass
+
+
+def local_cache_aliases():
+    """
+    The caches this app uses (facets and detail pages) that live in one
+    process's memory. A worker's invalidations in them never reach the web
+    server, which would keep serving what the job changed.
+    """
+    aliases = {"default", getattr(settings, "ASSET_DETAIL_CACHE", "default")}
+    return sorted(alias for alias in aliases if isinstance(caches[alias], LocMemCache))
+
+
+def job_storage():
+    """Where uploads waiting to be imported and finished exports are kept."""
+    return FileSystemStorage(location=getattr(settings, "ASSET_JOB_FILES_DIR", None))
+
+
+def enqueue(kind, payload=None, user=None, max_attempts=3, run_after=None):
+    """Queue a job of kind with a JSON payload. Returns the AssetJob."""
+    if kind not in JOB_KINDS:
+        raise ValueError(f"Unknown job kind {kind!r}.")
+    job = AssetJob.objects.create(
+        kind=kind,
+        payload=payload or {},
+        created_by=user if user is not None and user.is_authenticated else None,
+        max_attempts=max_attempts,
+        run_after=run_after or timezone.now(),
+    )
+    logger.info("Queued %s", job)
+    return job
+
+
+def status_data(job):
+    """The job's state as JSON-ready values."""
+    return {
+        "id": str(job.pk),
+        "kind": job.kind,
+        "status": job.status,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "progress": {
+            "done": job.progress_done,
+            "total": job.progress_total,
+            "percent": job.percent,
+        },
+        "error": job.error.strip().splitlines()[-1] if job.error else None,
+        "result": job.result if job.status == AssetJob.STATUS_SUCCEEDED else None,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+
+def job_status(job_id):
+    return status_data(AssetJob.objects.get(pk=job_id))
+
+
+def job_result(job_id):
+    """
+    The job's return value. Raises JobNotFinished while it is queued or
+    running and JobFailed if it gave up.
+    """
+    job = AssetJob.objects.get(pk=job_id)
+    if job.status == AssetJob.STATUS_FAILED:
+        raise JobFailed(job.error)
+    if job.status != AssetJob.STATUS_SUCCEEDED:
+        raise JobNotFinished(f"Job {job.pk} is {job.status}.")
+    return job.result
+
+
+def _claimable(now, kinds=None):
+    queryset = AssetJob.objects.filter(
+        Q(status=AssetJob.STATUS_PENDING, run_after__lte=now)
+        | Q(status=AssetJob.STATUS_RUNNING, heartbeat_at__lt=now - JOB_LEASE)
+    )
+    if kinds:
+        queryset = queryset.filter(kind__in=kinds)
+    return queryset
+
+
+def claim_job(worker, kinds=None):
+    """Mark the oldest due job as running for worker and return it, or None."""
+    now = timezone.now()
+    candidates = _claimable(now, kinds).order_by("run_after", "created_at")
+    claim = {
+        "status": AssetJob.STATUS_RUNNING,
+        "worker": worker,
+        "attempts": F("attempts") + 1,
+        "started_at": now,
+        "heartbeat_at": now,
+    }
+    connection = connections[router.db_for_write(AssetJob)]
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic(using=connection.alias):
+            pk = candidates.select_for_update(skip_locked=True).values_list("pk", flat=True).first()
+            if pk is None:
+                return None
+            AssetJob.objects.filter(pk=pk).update(**claim)
+    else:
+        for pk in candidates.values_list("pk", flat=True)[:CLAIM_CANDIDATES]:
+            # Loses to any worker that claimed it since the read
+            if _claimable(now, kinds).filter(pk=pk).update(**claim):
+                break
+        else:
+            return None
+    return AssetJob.objects.get(pk=pk)
+
+
+def _current(job):
+    # The job's row as long as this attempt still owns it
+    return AssetJob.objects.filter(pk=job.pk, status=AssetJob.STATUS_RUNNING, attempts=job.attempts)
+
+
+def report_progress(job, done, total=None):
+    """Record how far the job has got; also keeps its lease."""
+    job.progress_done = done
+    if total is not None:
+        job.progress_total = total
+    _current(job).update(
+        progress_done=job.progress_done,
+        progress_total=job.progress_total,
+        heartbeat_at=timezone.now(),
+    )
+
+
+def _finish(job, result):
+    job.status = AssetJob.STATUS_SUCCEEDED
+    job.result = result
+    job.error = ""
+    job.finished_at = timezone.now()
+    _current(job).update(status=job.status, result=result, error="", finished_at=job.finished_at)
+
+
+def _fail(job, exc):
+    now = timezone.now()
+    job.error = "".join(traceback.format_exception(type(exc), exc, exc.__traceback__))
+    if isinstance(exc, JobError) or job.attempts >= job.max_attempts:
+        job.status = AssetJob.STATUS_FAILED
+        job.finished_at = now
+        changes = {"finished_at": now}
+    else:
+        job.status = AssetJob.STATUS_PENDING
+        job.run_after = now + RETRY_DELAY * 2 ** (job.attempts - 1)
+        changes = {"run_after": job.run_after}
+    _current(job).update(status=job.status, error=job.error, **changes)
+
+
+def run_job(job):
+    """Run a claimed job, then mark it succeeded, failed or due for a retry."""
+    from .tasks import HANDLERS  # tasks imports this module
+
+    logger.info("Running %s, attempt %s of %s", job, job.attempts, job.max_attempts)
+    try:
+        if job.attempts > job.max_attempts:
+            raise JobError("Gave up after losing the worker on the last attempt.")
+        handler = HANDLERS.get(job.kind)
+        if handler is None:
+            raise JobError(f"No handler for job kind {job.kind!r}.")
+        with audit_user(job.created_by):
+            result = handler(job)
+    except Exception as exc:
+        logger.warning("%s failed: %s", job, exc)
+        _fail(job, exc)
+    else:
+        _finish(job, result)
+    return job
+
+
+def default_worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def run_worker(worker=None, kinds=None, poll_interval=1.0, max_jobs=None, burst=False):
+    """
+    Claim and run jobs until max_jobs have run, or with burst until none
+    are due. Returns the number of jobs run.
+    """
+    worker = worker or default_worker_name()
+    count = 0
+    while max_jobs is None or count < max_jobs:
+        job = claim_job(worker, kinds)
+        if job is None:
+            if burst:
+                break
+            # Idle: drop connections past CONN_MAX_AGE, as a request would
+            close_old_connections()
+            time.sleep(poll_interval)
+            continue
+        run_job(job)
+        count += 1
+    return count
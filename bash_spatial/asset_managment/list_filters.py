@@ -0,0 +1,52 @@
+"""
+The asset list's filters as a plain function of a user and the query
+parameters, shared by the list and API views, the background export and
+bulk jobs, and the EXPLAIN tooling.
+"""
+from .attribute_filters import filter_by_attributes
+from .models import Asset
+from .search import filter_by_asset_id, get_search_backend, parse_asset_id
+
+
+def filter_assets(user, params):
+    """
+    The assets user may see, narrowed by the list parameters in params (a
+    QueryDict): search, category, status, overdue and attr.* filters.
+    Raises InvalidAttributeFilter for a malformed attr.* parameter.
+    """
+    queryset = (
+        Asset.objects.visible_to(user)
+        .select_related("assigned_to")
+        .order_by("-created_at", "-id")
+    )
+
+    # Search functionality (Epic 1, Story 4)
+    search_query = params.get("search", "")
+    if search_query:
+        lookup = parse_asset_id(search_query)
+        if lookup and lookup[0] == "exact":
+            queryset = filter_by_asset_id(queryset, lookup)
+        else:
+            matches = get_search_backend().filter(queryset, search_query)
+            if lookup:
+                # A short hex string may be a model number or serial as
+                # well as the start of an id, so it matches either way
+                matches = filter_by_asset_id(queryset, lookup) | matches
+            queryset = matches
+
+    # Category filter
+    category = params.get("category", "")
+    if category:
+        queryset = queryset.filter(category=category)
+
+    # Status filter
+    status = params.get("status", "")
+    if status:
+        queryset = queryset.filter(status=status)
+
+    # Overdue filter, answered from the flag the daily sweep maintains
+    if params.get("overdue"):
+        queryset = queryset.overdue()
+
+    # Typed attribute filters, e.g. ?attr.ram__gte=16
+    return filter_by_attributes(queryset, params)
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from asset_managment.attribute_templates import apply_templates
+from asset_managment.models import AttributeTemplate
+
+
+class Command(BaseCommand):
+    help = "Add templated attributes that existing assets are missing, with the template defaults."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--category",
+            action="append",
+            help="Only this category (repeatable). Defaults to every category with templates.",
+        )
+
+    def handle(self, *args, **options):
+        categories = options["category"] or (
+            AttributeTemplate.objects.order_by("category").values_list("category", flat=True).distinct()
+        )
+        for category in categories:
+            changed = apply_templates(category)
+            self.stdout.write(f"{category}: added attributes to {changed} assets.")
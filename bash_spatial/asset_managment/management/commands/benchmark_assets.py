@@ -0,0 +1,89 @@
+import json
+import platform
+import subprocess
+from datetime import datetime, timezone
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_databases, teardown_databases
+
+from asset_managment.benchmarks import SCENARIOS, run_suite
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the asset views at several data sizes in a throwaway test database "
+        "and save p50/p95 latency, query counts and peak memory as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+        parser.add_argument("--attrs-per-asset", type=int, default=5)
+        parser.add_argument("--users", type=int, default=10)
+        parser.add_argument("--repeat", type=int, default=20, help="Timed requests per scenario.")
+        parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+        parser.add_argument("--output", help="Write the results to this JSON file.")
+        parser.add_argument("--compare", help="A previous --output file to compare p50 latency with.")
+
+    def handle(self, *args, **options):
+        if min(options["sizes"]) < 1 or options["repeat"] < 1:
+            raise CommandError("--sizes and --repeat must be at least 1.")
+        baseline = {}
+        if options["compare"]:
+            with open(options["compare"]) as f:
+                baseline = {(r["size"], r["scenario"]): r for r in json.load(f)["results"]}
+
+        self.stdout.write(
+            f"{'size':>8} {'scenario':16} {'p50 ms':>8} {'p95 ms':>8} {'queries':>8} {'peak KB':>9}"
+        )
+
+        def report(result):
+            line = (
+                f"{result['size']:>8} {result['scenario']:16} {result['p50_ms']:>8} "
+                f"{result['p95_ms']:>8} {result['queries']:>8} {result['peak_memory_kb']:>9}"
+            )
+            before = baseline.get((result["size"], result["scenario"]))
+            if before and before["p50_ms"]:
+                line += f"  {(result['p50_ms'] / before['p50_ms'] - 1) * 100:+.0f}% p50"
+            self.stdout.write(line)
+
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            vendor = connection.vendor
+            results = run_suite(
+                options["sizes"],
+                attrs_per_asset=options["attrs_per_asset"],
+                users=options["users"],
+                repeat=options["repeat"],
+                scenarios=options["scenarios"],
+                report=report,
+            )
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+        if options["output"]:
+            document = {
+                "meta": {
+                    "commit": git_commit(),
+                    "created_at": datetime.now(timezone.utc).isoformat(),
+                    "python": platform.python_version(),
+                    "django": django.get_version(),
+                    "database": vendor,
+                    "attrs_per_asset": options["attrs_per_asset"],
+                    "repeat": options["repeat"],
+                },
+                "results": results,
+            }
+            with open(options["output"], "w") as f:
+                json.dump(document, f, indent=2)
+            self.stdout.write(f"Wrote {options['output']}.")
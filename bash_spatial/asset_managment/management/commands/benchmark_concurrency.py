@@ -0,0 +1,96 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from asset_managment.benchmarks import run_mixed
+from asset_managment.models import Asset
+from asset_managment.seeding import seed_assets
+
+# Environment for each SQLite profile compared
+PROFILES = {
+    "default": {"ASSET_DB_SQLITE_TUNED": "0", "ASSET_DB_CONN_MAX_AGE": "0"},
+    "tuned": {"ASSET_DB_SQLITE_TUNED": "1", "ASSET_DB_CONN_MAX_AGE": "60"},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare mixed read/write throughput of the default and tuned SQLite "
+        "profiles, each on a fresh database file in its own process."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--seconds", type=float, default=10.0)
+        parser.add_argument("--write-ratio", type=float, default=0.2)
+        parser.add_argument("--assets", type=int, default=2000)
+        parser.add_argument("--profiles", nargs="+", choices=PROFILES, default=list(PROFILES))
+        parser.add_argument("--output", help="Write the results to this JSON file.")
+        # Internal: run one profile against the configured database
+        parser.add_argument("--worker", action="store_true", help="(internal)")
+
+    def handle(self, *args, **options):
+        if options["threads"] < 1 or options["seconds"] <= 0:
+            raise CommandError("--threads and --seconds must be positive.")
+        if not 0 <= options["write_ratio"] <= 1:
+            raise CommandError("--write-ratio must be between 0 and 1.")
+        if options["worker"]:
+            self.stdout.write(json.dumps(self.run_worker(options)))
+            return
+
+        results = {}
+        with tempfile.TemporaryDirectory() as directory:
+            for profile in options["profiles"]:
+                env = {
+                    **os.environ,
+                    **PROFILES[profile],
+                    "ASSET_DB_ENGINE": "sqlite",
+                    "ASSET_DB_NAME": str(Path(directory) / f"{profile}.sqlite3"),
+                }
+                command = [
+                    sys.executable, sys.argv[0], "benchmark_concurrency", "--worker",
+                    "--threads", str(options["threads"]),
+                    "--seconds", str(options["seconds"]),
+                    "--write-ratio", str(options["write_ratio"]),
+                    "--assets", str(options["assets"]),
+                ]
+                completed = subprocess.run(command, env=env, capture_output=True, text=True)
+                if completed.returncode:
+                    raise CommandError(f"{profile} run failed:\n{completed.stderr}")
+                results[profile] = json.loads(completed.stdout.strip().splitlines()[-1])
+
+        self.stdout.write(
+            f"{'profile':8} {'reads/s':>8} {'writes/s':>9} {'read p95':>9} {'write p95':>10} "
+            f"{'locked':>7} {'errors':>7}"
+        )
+        for profile, result in results.items():
+            reads, writes = result["reads"], result["writes"]
+            self.stdout.write(
+                f"{profile:8} {reads['requests_per_second']!s:>8} {writes['requests_per_second']!s:>9} "
+                f"{reads['p95_ms']!s:>9} {writes['p95_ms']!s:>10} {result['locked']:>7} {result['errors']:>7}"
+            )
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(results, f, indent=2)
+
+    def run_worker(self, options):
+        call_command("migrate", verbosity=0)
+        seed_assets(options["assets"], attrs_per_asset=3, users=5, seed=0)
+        admin = User.objects.create_superuser(username="benchmark-admin", password=None)
+        asset_pks = list(Asset.objects.values_list("pk", flat=True))
+        assignee_pks = list(User.objects.values_list("pk", flat=True))
+        return run_mixed(
+            admin,
+            asset_pks,
+            assignee_pks,
+            threads=options["threads"],
+            seconds=options["seconds"],
+            write_ratio=options["write_ratio"],
+        )
@@ -0,0 +1,50 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from asset_managment.benchmarks import run_async, run_sync
+from asset_managment.models import Asset
+
+PATHS = ("list", "detail", "api")
+
+
+class Command(BaseCommand):
+    help = "Compare the sync and async asset read paths under concurrent in-process load."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--username", required=True, help="User to make the requests as.")
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=20)
+        parser.add_argument("--paths", nargs="+", choices=PATHS, default=list(PATHS))
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options["username"])
+        except User.DoesNotExist:
+            raise CommandError(f"No user {options['username']!r}.")
+        if options["requests"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--requests and --concurrency must be at least 1.")
+
+        asset = Asset.objects.visible_to(user).first()
+        urls = {
+            "list": (reverse("asset_list"), reverse("asset_list_async")),
+            "api": (reverse("api_asset_list"), reverse("api_asset_list_async")),
+        }
+        if asset is not None:
+            urls["detail"] = (
+                reverse("asset_detail", kwargs={"pk": asset.pk}),
+                reverse("asset_detail_async", kwargs={"pk": asset.pk}),
+            )
+
+        self.stdout.write(f"{'path':8} {'mode':6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}")
+        for name in options["paths"]:
+            if name not in urls:
+                self.stderr.write(f"Skipping {name}: {user} cannot see any asset.")
+                continue
+            sync_url, async_url = urls[name]
+            for mode, run, url in (("sync", run_sync, sync_url), ("async", run_async, async_url)):
+                result = run(url, user, options["requests"], options["concurrency"])
+                self.stdout.write(
+                    f"{name:8} {mode:6} {result['requests_per_second']:>8} "
+                    f"{result['p50_ms']:>8} {result['p95_ms']:>8} {result['errors']:>7}"
+                )
@@ -0,0 +1,49 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from asset_managment.models import Asset
+from asset_managment.query_plans import explain_list_queries, full_scans
+
+
+class Command(BaseCommand):
+    help = "Record EXPLAIN plans for every asset list filter combination."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", help="Write the plans to this JSON file.")
+        parser.add_argument(
+            "--strict",
+            action="store_true",
+            help="Fail if any plan falls back to a full scan or unindexed sort.",
+        )
+
+    def handle(self, *args, **options):
+        # Unsaved stand-ins are enough: the plan only depends on the role.
+        users = {
+            "admin": User(pk=0, username="explain-admin", is_superuser=True),
+            "member": User(pk=0, username="explain-member"),
+        }
+        plans = explain_list_queries(
+            users, cursor_from=Asset.objects.order_by("created_at").first()
+        )
+
+        problems = {}
+        for name, plan in plans.items():
+            scans = full_scans(plan)
+            if scans:
+                problems[name] = scans
+            self.stdout.write(f"== {name}")
+            self.stdout.write(plan)
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(
+                    {"vendor": connection.vendor, "plans": plans, "full_scans": problems},
+                    f,
+                    indent=2,
+                )
+
+        if problems and options["strict"]:
+            raise CommandError(f"Full scans in: {', '.join(sorted(problems))}")
@@ -0,0 +1,34 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from asset_managment.importer import FORMATS, guess_format, import_assets
+
+
+class Command(BaseCommand):
+    help = "Bulk import assets and their attributes from a CSV or JSONL file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import, or - for stdin.")
+        parser.add_argument("--format", choices=FORMATS, help="Defaults to the file extension.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or guess_format(path)
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        if path == "-":
+            result = import_assets(sys.stdin, fmt, options["batch_size"])
+        else:
+            try:
+                with open(path, newline="", encoding="utf-8") as stream:
+                    result = import_assets(stream, fmt, options["batch_size"])
+            except OSError as exc:
+                raise CommandError(exc)
+
+        for line, errors in result.errors:
+            for field, messages in errors.items():
+                self.stderr.write(f"line {line}: {field}: {' '.join(messages)}")
+        self.stdout.write(f"Import finished: {result}.")
@@ -0,0 +1,84 @@
+from datetime import timedelta
+from itertools import groupby
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from asset_managment.models import AssetHistory
+
+
+def merge_changes(entries):
+    """Fold consecutive update diffs into one, dropping fields that ended up unchanged."""
+    merged = {}
+    for entry in entries:
+        for field, (old, new) in entry.changes.items():
+            merged[field] = [merged[field][0] if field in merged else old, new]
+    return {field: values for field, values in merged.items() if values[0] != values[1]}
+
+
+class Command(BaseCommand):
+    help = "Delete, or with --compact merge, asset history older than a cutoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--older-than-days", type=int, required=True)
+        parser.add_argument(
+            "--compact",
+            action="store_true",
+            help="Merge each asset's old updates into one row instead of deleting them.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Assets whose history is compacted per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        if options["older_than_days"] < 0:
+            raise CommandError("--older-than-days cannot be negative.")
+        cutoff = timezone.now() - timedelta(days=options["older_than_days"])
+        old = AssetHistory.objects.filter(created_at__lt=cutoff)
+
+        if not options["compact"]:
+            count, _ = old.delete()
+            self.stdout.write(f"Deleted {count} history entries.")
+            return
+
+        # One batch of assets at a time, each read in full before it is
+        # written, so memory is bounded by the batch and no read cursor is
+        # open while rows change
+        updates = old.filter(action="updated")
+        batch_size = options["batch_size"]
+        kept = removed = 0
+        last = None
+        while True:
+            assets = updates.order_by("asset_id")
+            if last is not None:
+                assets = assets.filter(asset_id__gt=last)
+            asset_ids = list(assets.values_list("asset_id", flat=True).distinct()[:batch_size])
+            if not asset_ids:
+                break
+            last = asset_ids[-1]
+            entries = updates.filter(asset_id__in=asset_ids).order_by(
+                "asset_id", "attribute_id", "created_at", "id"
+            )
+            batch_kept, batch_removed = [], []
+            for _, group in groupby(entries, key=lambda e: (e.asset_id, e.attribute_id)):
+                self.compact(list(group), batch_kept, batch_removed)
+            with transaction.atomic():
+                AssetHistory.objects.bulk_update(batch_kept, ["changes"], batch_size=batch_size)
+                for i in range(0, len(batch_removed), batch_size):
+                    AssetHistory.objects.filter(pk__in=batch_removed[i:i + batch_size]).delete()
+            kept += len(batch_kept)
+            removed += len(batch_removed)
+        self.stdout.write(f"Compacted {kept} histories, removing {removed} entries.")
+
+    def compact(self, group, kept, removed):
+        """Keep the newest entry of group, holding the merged diff."""
+        if len(group) < 2:
+            return
+        *older, last = group
+        last.changes = merge_changes(group)
+        kept.append(last)
+        removed.extend(e.pk for e in older)
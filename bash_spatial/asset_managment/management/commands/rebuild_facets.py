@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from asset_managment.facets import rebuild_facets
+from asset_managment.jobs import JOB_REBUILD_FACETS, enqueue, local_cache_aliases
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount the cached asset category/status facets from the database. The "
+        "server only sees the result through a shared cache (ASSET_CACHE_DIR, Redis, "
+        "Memcached); with the default local memory cache this process's copy is "
+        "the only one rebuilt."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--background",
+            action="store_true",
+            help="Queue the rebuild for run_asset_worker instead of running it here.",
+        )
+
+    def handle(self, *args, **options):
+        if options["background"]:
+            job = enqueue(JOB_REBUILD_FACETS)
+            self.stdout.write(f"Queued job {job.pk}.")
+            return
+        if "default" in local_cache_aliases():
+            raise CommandError(
+                "The default cache is local memory, so a rebuild here would not reach "
+                "the running server. Configure a shared cache (set ASSET_CACHE_DIR, or "
+                "Redis/Memcached in CACHES)."
+            )
+        counts = rebuild_facets()
+        self.stdout.write(f"Rebuilt facets for {len(counts)} categories.")
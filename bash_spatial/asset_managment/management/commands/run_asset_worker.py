@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from asset_managment.jobs import JOB_KINDS, default_worker_name, local_cache_aliases, run_worker
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued background jobs (imports, exports, bulk actions, the overdue "
+        "sweep, facet rebuilds). Start as many workers as needed; each claims one "
+        "job at a time."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--kind",
+            action="append",
+            choices=JOB_KINDS,
+            help="Only run jobs of this kind (repeatable).",
+        )
+        parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds to wait when idle.")
+        parser.add_argument("--max-jobs", type=int, help="Exit after running this many jobs.")
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit once no jobs are due instead of waiting for more.",
+        )
+        parser.add_argument("--name", help="Worker name recorded on claimed jobs (default host:pid).")
+
+    def handle(self, *args, **options):
+        if options["max_jobs"] is not None and options["max_jobs"] < 1:
+            raise CommandError("--max-jobs must be at least 1.")
+        local = local_cache_aliases()
+        if local:
+            raise CommandError(
+                f"Cache {', '.join(local)} is local memory, so this worker's cache "
+                "invalidations would never reach the web server. Configure a shared "
+                "cache (set ASSET_CACHE_DIR, or Redis/Memcached in CACHES)."
+            )
+        name = options["name"] or default_worker_name()
+        self.stdout.write(f"Worker {name} waiting for jobs.")
+        count = run_worker(
+            worker=name,
+            kinds=options["kind"],
+            poll_interval=options["poll_interval"],
+            max_jobs=options["max_jobs"],
+            burst=options["burst"],
+        )
+        self.stdout.write(f"Ran {count} job{'s' if count != 1 else ''}.")
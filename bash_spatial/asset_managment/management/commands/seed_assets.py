@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from asset_managment.seeding import SEED_PASSWORD, seed_assets
+
+
+class Command(BaseCommand):
+    help = "Fill the database with synthetic users, assets and attributes using bulk inserts."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--assets", type=int, required=True)
+        parser.add_argument("--attrs-per-asset", type=int, default=5)
+        parser.add_argument("--users", type=int, default=10)
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--seed", type=int, help="Random seed, for repeatable data.")
+
+    def handle(self, *args, **options):
+        if options["assets"] < 0 or options["attrs_per_asset"] < 0 or options["users"] < 0:
+            raise CommandError("--assets, --attrs-per-asset and --users cannot be negative.")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        created = seed_assets(
+            options["assets"],
+            attrs_per_asset=options["attrs_per_asset"],
+            users=options["users"],
+            batch_size=options["batch_size"],
+            seed=options["seed"],
+        )
+        self.stdout.write(
+            f"Created {created} assets and {options['users']} users "
+            f"(password {SEED_PASSWORD!r})."
+        )
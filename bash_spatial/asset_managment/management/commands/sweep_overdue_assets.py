@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from asset_managment.jobs import JOB_SWEEP_OVERDUE, enqueue
+from asset_managment.overdue import sweep_overdue
+
+
+class Command(BaseCommand):
+    help = "Flag assets that passed their depreciation date (run daily) and print a digest."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would change without writing anything.",
+        )
+        parser.add_argument(
+            "--background",
+            action="store_true",
+            help="Queue the sweep for run_asset_worker instead of running it here.",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        if options["background"]:
+            if options["dry_run"]:
+                raise CommandError("--dry-run cannot be queued.")
+            job = enqueue(JOB_SWEEP_OVERDUE, {"batch_size": options["batch_size"]})
+            self.stdout.write(f"Queued job {job.pk}.")
+            return
+        digest = sweep_overdue(batch_size=options["batch_size"], dry_run=options["dry_run"])
+        self.stdout.write(str(digest))
@@ -0,0 +1,52 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the SQLite primary database over each SQLite read replica, to try "
+        "replica routing locally. With --interval, repeat forever, so the replicas "
+        "lag the primary by up to that many seconds."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help="Seconds between copies; copy once and exit when omitted.",
+        )
+
+    def handle(self, *args, **options):
+        aliases = list(getattr(settings, "ASSET_READ_REPLICAS", ()))
+        if not aliases:
+            raise CommandError("No replicas configured; set ASSET_DB_REPLICAS.")
+        for alias in [DEFAULT_DB_ALIAS, *aliases]:
+            if connections[alias].vendor != "sqlite":
+                raise CommandError(f"{alias} is not an SQLite database.")
+
+        while True:
+            started = time.monotonic()
+            for alias in aliases:
+                self.copy(connections[DEFAULT_DB_ALIAS].settings_dict["NAME"],
+                          connections[alias].settings_dict["NAME"])
+            self.stdout.write(
+                f"Copied the primary to {len(aliases)} replica(s) in "
+                f"{time.monotonic() - started:.2f}s."
+            )
+            if options["interval"] is None:
+                return
+            time.sleep(options["interval"])
+
+    def copy(self, source, target):
+        # The backup API copies a consistent snapshot while the primary
+        # keeps taking writes
+        src, dst = sqlite3.connect(source), sqlite3.connect(target)
+        try:
+            src.backup(dst)
+        finally:
+            src.close()
+            dst.close()
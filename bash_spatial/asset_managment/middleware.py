@@ -0,0 +1,132 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from django.conf import settings
+
+from .audit import audit_user
+from .instrumentation import (
+    UNRESOLVED,
+    check_budget,
+    collect_metrics,
+    record_request,
+    server_timing,
+    timed_render,
+)
+from .routers import (
+    REPLICA_METHODS,
+    current_routing,
+    is_pinned,
+    pin_to_primary,
+    routed_chunks,
+    routing,
+    use_replica,
+    wants_replica,
+)
+
+
+class AuditUserMiddleware:
+    """
+    Make request.user the author of any asset history written while the
+    request is handled. Must come after AuthenticationMiddleware. Works in
+    both sync and async middleware chains.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with audit_user(request.user):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with audit_user(request.user):
+            return await self.get_response(request)
+
+
+class RequestMetricsMiddleware:
+    """
+    Record query count, database time, template render time and latency
+    for every request under its URL name, and check the view's query
+    budget. Adds a Server-Timing header when settings.ASSET_SERVER_TIMING
+    is true. Goes first in MIDDLEWARE so the session and user queries of
+    the other middleware are counted too.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with collect_metrics() as metrics:
+            response = self.get_response(request)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        with collect_metrics() as metrics:
+            response = await self.get_response(request)
+        return self.finish(request, response, metrics)
+
+    def process_template_response(self, request, response):
+        return timed_render(response)
+
+    def finish(self, request, response, metrics):
+        elapsed = metrics.elapsed()
+        match = getattr(request, "resolver_match", None)
+        view_name = match.view_name if match else UNRESOLVED
+        record_request(view_name, metrics, elapsed)
+        if getattr(settings, "ASSET_SERVER_TIMING", False):
+            response.headers["Server-Timing"] = server_timing(metrics, elapsed)
+        check_budget(view_name, metrics)
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Send the reads of views marked replica_reads to a replica, unless the
+    client wrote recently, and pin clients that write to the primary.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with routing(pinned=is_pinned(request)) as state:
+            response = self.get_response(request)
+        return self.finish(state, response)
+
+    async def __acall__(self, request):
+        with routing(pinned=is_pinned(request)) as state:
+            response = await self.get_response(request)
+        return self.finish(state, response)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = current_routing()
+        if state is not None and request.method in REPLICA_METHODS and wants_replica(view_func):
+            use_replica(state)
+        return None
+
+    def finish(self, state, response):
+        if state.wrote:
+            pin_to_primary(response)
+        if response.streaming and not response.is_async and state.replica is not None:
+            response.streaming_content = routed_chunks(state, response.streaming_content)
+        return response
@@ -0,0 +1,46 @@
+from django.db import migrations
+
+SEARCH_TABLE = "asset_managment_assetsearch"
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    Asset = apps.get_model("asset_managment", "Asset")
+    Attribute = apps.get_model("asset_managment", "Attribute")
+
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+        "asset_id, name, category, attributes, tokenize = 'unicode61')"
+    )
+
+    attributes = {}
+    for asset_id, name, value in Attribute.objects.values_list("asset_id", "name", "value"):
+        attributes.setdefault(asset_id, []).append(f"{name} {value}")
+    rows = [
+        (pk.hex, name, category, "\n".join(attributes.get(pk, [])))
+        for pk, name, category in Asset.objects.values_list("pk", "name", "category")
+    ]
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {SEARCH_TABLE} (asset_id, name, category, attributes) "
+            "VALUES (%s, %s, %s, %s)",
+            rows,
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("asset_managment", "0002_asset_list_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.5 on 2026-10-17 00:32
+
+from django.conf import settings
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('asset_managment', '0003_asset_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssetHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('asset_id', models.UUIDField()),
+                ('attribute_id', models.UUIDField(blank=True, null=True)),
+                ('action', models.CharField(choices=[('created', 'Created'), ('updated', 'Updated'), ('deleted', 'Deleted')], max_length=7)),
+                ('changes', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='asset_history', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['asset_id', 'created_at'], name='history_asset_created_idx'), models.Index(fields=['user', 'created_at'], name='history_user_created_idx'), models.Index(fields=['created_at'], name='history_created_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 4.2.5 on 2026-10-17 00:53
+
+from django.db import migrations, models
+
+from asset_managment.attribute_types import attribute_key, typed_columns
+
+BATCH_SIZE = 2000
+
+
+def infer_attribute_types(apps, schema_editor):
+    Attribute = apps.get_model("asset_managment", "Attribute")
+    fields = ["key", "value_type", "number_value", "date_value", "bool_value"]
+    batch = []
+    for attribute in Attribute.objects.only("name", "value").iterator(chunk_size=BATCH_SIZE):
+        attribute.key = attribute_key(attribute.name)
+        for field, typed in typed_columns(attribute.value).items():
+            setattr(attribute, field, typed)
+        batch.append(attribute)
+        if len(batch) == BATCH_SIZE:
+            Attribute.objects.bulk_update(batch, fields)
+            batch = []
+    if batch:
+        Attribute.objects.bulk_update(batch, fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asset_managment', '0004_asset_history'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attribute',
+            name='bool_value',
+            field=models.BooleanField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='attribute',
+            name='date_value',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='attribute',
+            name='key',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='attribute',
+            name='number_value',
+            field=models.DecimalField(blank=True, decimal_places=6, editable=False, max_digits=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='attribute',
+            name='value_type',
+            field=models.CharField(choices=[('text', 'Text'), ('int', 'Integer'), ('decimal', 'Decimal'), ('date', 'Date'), ('bool', 'Yes/No')], default='text', editable=False, max_length=7),
+        ),
+        # Fill the new columns before indexing them
+        migrations.RunPython(infer_attribute_types, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='attribute',
+            index=models.Index(fields=['key', 'value', 'asset'], name='attr_key_text_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attribute',
+            index=models.Index(fields=['key', 'number_value', 'asset'], name='attr_key_number_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attribute',
+            index=models.Index(fields=['key', 'date_value', 'asset'], name='attr_key_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attribute',
+            index=models.Index(fields=['key', 'bool_value', 'asset'], name='attr_key_bool_idx'),
+        ),
+    ]
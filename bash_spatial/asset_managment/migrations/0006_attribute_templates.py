@@ -0,0 +1,34 @@
+# Generated by Django 4.2.5 on 2026-10-17 00:59
+
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asset_managment', '0005_typed_attribute_values'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttributeTemplate',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('category', models.CharField(max_length=100)),
+                ('name', models.CharField(max_length=255)),
+                ('key', models.CharField(editable=False, max_length=255)),
+                ('value_type', models.CharField(choices=[('text', 'Text'), ('int', 'Integer'), ('decimal', 'Decimal'), ('date', 'Date'), ('bool', 'Yes/No')], default='text', max_length=7)),
+                ('required', models.BooleanField(default=False)),
+                ('default_value', models.CharField(blank=True, max_length=1023)),
+                ('position', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['category', 'position', 'name'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='attributetemplate',
+            constraint=models.UniqueConstraint(fields=('category', 'key'), name='attr_template_unique_key'),
+        ),
+    ]
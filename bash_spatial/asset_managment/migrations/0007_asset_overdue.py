@@ -0,0 +1,35 @@
+# Generated by Django 4.2.5 on 2026-10-17 01:06
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def flag_overdue_assets(apps, schema_editor):
+    Asset = apps.get_model("asset_managment", "Asset")
+    Asset.objects.filter(depreciation__lt=timezone.localdate()).exclude(
+        status="out_for_repairs"
+    ).update(overdue=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asset_managment', '0006_attribute_templates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='asset',
+            name='overdue',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.RunPython(flag_overdue_assets, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='asset',
+            index=models.Index(fields=['overdue', 'created_at', 'id'], name='asset_overdue_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='asset',
+            index=models.Index(fields=['depreciation'], name='asset_depreciation_idx'),
+        ),
+    ]
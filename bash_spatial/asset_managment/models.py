@@ -1,11 +1,55 @@
 import uuid
-from time import timezone
-from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, router, transaction
+from django.db.models import Q
 from django.conf import settings
-from django.contrib.auth.models import Group
+from django.utils import timezone
+from .attribute_types import (
+    NUMBER_DECIMAL_PLACES,
+    NUMBER_MAX_DIGITS,
+    TYPE_DECIMAL,
+    TYPE_INT,
+    TYPE_TEXT,
+    VALUE_TYPE_CHOICES,
+    attribute_key,
+    infer_value,
+    typed_columns,
+)
+from .permissions import can_access, can_manage, visibility_filter
 
 
-class Attribute(models.Model):
+class TrackedModel(models.Model):
+    """
+    Remembers the field values an instance was loaded with, so post_save
+    receivers can tell what changed without reading the row again. Saves run
+    in a transaction, so whatever those receivers write commits or rolls
+    back with the save itself.
+    """
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = instance.field_values()
+        return instance
+
+    def field_values(self):
+        return {
+            f.attname: self.__dict__[f.attname]
+            for f in self._meta.concrete_fields
+            if f.attname in self.__dict__
+        }
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get("using") or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+        self._loaded_values = self.field_values()
+
+
+class Attribute(TrackedModel):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=255)
     value = models.CharField(max_length=1023)
@@ -15,11 +59,126 @@ class Attribute(models.Model):
         related_name="attributes_set",
     )
 
+    # Derived from name and value by set_typed_value(); see attribute_types.py
+    key = models.CharField(max_length=255, blank=True, editable=False)
+    value_type = models.CharField(
+        max_length=7, choices=VALUE_TYPE_CHOICES, default=TYPE_TEXT, editable=False
+    )
+    number_value = models.DecimalField(
+        max_digits=NUMBER_MAX_DIGITS,
+        decimal_places=NUMBER_DECIMAL_PLACES,
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    date_value = models.DateField(null=True, blank=True, editable=False)
+    bool_value = models.BooleanField(null=True, blank=True, editable=False)
+
+    class Meta:
+        # Key first, then the typed value, then the asset, so an attribute
+        # filter is answered from the index alone
+        indexes = [
+            models.Index(fields=["key", "value", "asset"], name="attr_key_text_idx"),
+            models.Index(fields=["key", "number_value", "asset"], name="attr_key_number_idx"),
+            models.Index(fields=["key", "date_value", "asset"], name="attr_key_date_idx"),
+            models.Index(fields=["key", "bool_value", "asset"], name="attr_key_bool_idx"),
+        ]
+
     def __str__(self):
         return f"{self.name}: {self.value}"
 
+    def set_typed_value(self):
+        """Fill key and the typed columns from name and value."""
+        self.key = attribute_key(self.name)
+        for field, typed in typed_columns(self.value).items():
+            setattr(self, field, typed)
+
+    def save(self, *args, **kwargs):
+        # bulk_create() skips this, so bulk writers call set_typed_value() themselves
+        self.set_typed_value()
+        super().save(*args, **kwargs)
+
+
+class AttributeTemplateQuerySet(models.QuerySet):
+    def for_category(self, category):
+        return self.filter(category=category).order_by("position", "name")
+
+
+class AttributeTemplate(models.Model):
+    """
+    An attribute every asset in a category is expected to have. Templates
+    pre-fill the attribute formset, check the values entered there, and can
+    be applied to a category's existing assets in one INSERT (see
+    attribute_templates.py).
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    category = models.CharField(max_length=100)
+    name = models.CharField(max_length=255)
+    key = models.CharField(max_length=255, editable=False)
+    value_type = models.CharField(max_length=7, choices=VALUE_TYPE_CHOICES, default=TYPE_TEXT)
+    required = models.BooleanField(default=False)
+    default_value = models.CharField(max_length=1023, blank=True)
+    position = models.PositiveIntegerField(default=0)
+
+    objects = AttributeTemplateQuerySet.as_manager()
 
-class Asset(models.Model):
+    class Meta:
+        ordering = ["category", "position", "name"]
+        constraints = [
+            models.UniqueConstraint(fields=["category", "key"], name="attr_template_unique_key"),
+        ]
+
+    def __str__(self):
+        return f"{self.category}: {self.name}"
+
+    def save(self, *args, **kwargs):
+        self.key = attribute_key(self.name)
+        super().save(*args, **kwargs)
+
+    def accepts(self, text):
+        """Whether text is a valid value for this template's type."""
+        if self.value_type == TYPE_TEXT:
+            return True
+        value_type, _ = infer_value(text)
+        if self.value_type == TYPE_DECIMAL:
+            return value_type in (TYPE_INT, TYPE_DECIMAL)
+        return value_type == self.value_type
+
+
+# Assets out for repairs are not counted as overdue
+OVERDUE_EXEMPT_STATUS = "out_for_repairs"
+
+
+def overdue_condition(today=None):
+    """Q for assets past their depreciation date as of today."""
+    today = today or timezone.localdate()
+    # The isnull test keeps the result FALSE rather than NULL for undated assets
+    return Q(depreciation__isnull=False, depreciation__lt=today) & ~Q(status=OVERDUE_EXEMPT_STATUS)
+
+
+class AssetQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """Assets the user may see, as a single queryset filter."""
+        return visibility_filter(self, user)
+
+    def overdue(self):
+        """Assets flagged overdue by the last sweep or save (indexed)."""
+        return self.filter(overdue=True)
+
+    def with_overdue(self, today=None):
+        """
+        Annotate is_overdue_now, computed from depreciation and status as of
+        today rather than read from the stored flag.
+        """
+        return self.annotate(
+            is_overdue_now=models.ExpressionWrapper(
+                overdue_condition(today), output_field=models.BooleanField()
+            )
+        )
+
+
+class Asset(TrackedModel):
     STATUS_CHOICES = [
         ("out_for_repairs", "Out for Repairs"),
         ("operational", "Operational"),
@@ -36,6 +195,9 @@ class Asset(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     depreciation = models.DateField(null=True, blank=True)
+    # Derived from depreciation and status by set_overdue(); the daily
+    # sweep_overdue_assets command flips it as dates pass
+    overdue = models.BooleanField(default=False, editable=False)
     attributes = []
 
     assigned_to = models.ForeignKey(
@@ -46,6 +208,28 @@ class Asset(models.Model):
         related_name="assets",
     )
 
+    objects = AssetQuerySet.as_manager()
+
+    class Meta:
+        # Each index ends in (created_at, id) so the list view's filters can
+        # be answered in keyset order straight from the index.
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="asset_created_idx"),
+            models.Index(fields=["status", "created_at", "id"], name="asset_status_created_idx"),
+            models.Index(fields=["category", "created_at", "id"], name="asset_category_created_idx"),
+            models.Index(
+                fields=["category", "status", "created_at", "id"],
+                name="asset_cat_status_created_idx",
+            ),
+            models.Index(
+                fields=["assigned_to", "created_at", "id"],
+                name="asset_assignee_created_idx",
+            ),
+            models.Index(fields=["updated_at"], name="asset_updated_idx"),
+            models.Index(fields=["overdue", "created_at", "id"], name="asset_overdue_created_idx"),
+            models.Index(fields=["depreciation"], name="asset_depreciation_idx"),
+        ]
+
     def addAttribute(self, name, value):
         self.attributes.append(Attribute(name=name, value=value))
 
@@ -55,22 +239,154 @@ class Asset(models.Model):
 
     @property
     def is_overdue(self):
-        if self.depreciation and self.status != "out_for_repairs":
-            return self.depreciation < timezone.now().date()
+        if self.depreciation and self.status != OVERDUE_EXEMPT_STATUS:
+            return self.depreciation < timezone.localdate()
         return False
+
+    def set_overdue(self):
+        """Fill the stored overdue flag from depreciation and status."""
+        self.overdue = self.is_overdue
+
+    def save(self, *args, **kwargs):
+        # bulk_create() skips this, so bulk writers call set_overdue() themselves
+        self.set_overdue()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"status", "depreciation"} & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, "overdue"}
+        super().save(*args, **kwargs)
     
     def has_access(self, user):
-        if user.is_superuser:
-            return True
-        
-        if self.assigned_to == user:
-            return True
-        
-        try:
-            manager_group = Group.objects.get(name='manager')
-            if manager_group in user.groups.all():
-                return True
-        except Group.DoesNotExist:
-            pass 
+        return can_access(user, self)
 
-        return False
+
+class AssetHistoryQuerySet(models.QuerySet):
+    def _between(self, since, until):
+        queryset = self
+        if since is not None:
+            queryset = queryset.filter(created_at__gte=since)
+        if until is not None:
+            queryset = queryset.filter(created_at__lt=until)
+        return queryset.order_by("-created_at", "-id")
+
+    def for_asset(self, asset_id, since=None, until=None):
+        return self.filter(asset_id=asset_id)._between(since, until)
+
+    def by_user(self, user, since=None, until=None):
+        return self.filter(user=user)._between(since, until)
+
+
+class AssetHistory(models.Model):
+    """
+    Append-only change log for assets and their attributes. Each row holds
+    only the fields that changed, as {field: [old, new]}. asset_id is a plain
+    column rather than a foreign key so history outlives deleted assets.
+    """
+
+    ACTION_CHOICES = [
+        ("created", "Created"),
+        ("updated", "Updated"),
+        ("deleted", "Deleted"),
+    ]
+
+    asset_id = models.UUIDField()
+    attribute_id = models.UUIDField(null=True, blank=True)
+    action = models.CharField(max_length=7, choices=ACTION_CHOICES)
+    changes = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="asset_history",
+        db_index=False,
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+
+    objects = AssetHistoryQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["asset_id", "created_at"], name="history_asset_created_idx"),
+            models.Index(fields=["user", "created_at"], name="history_user_created_idx"),
+            models.Index(fields=["created_at"], name="history_created_idx"),
+        ]
+
+    def __str__(self):
+        target = "attribute" if self.attribute_id else "asset"
+        return f"{self.action} {target} {self.asset_id} at {self.created_at:%Y-%m-%d %H:%M}"
+
+
+class AssetJobQuerySet(models.QuerySet):
+    def for_user(self, user):
+        """Jobs the user may see: managers see every job, others their own."""
+        if can_manage(user):
+            return self
+        return self.filter(created_by=user)
+
+
+class AssetJob(models.Model):
+    """
+    A unit of background work for run_asset_worker, queued in this table so
+    no broker is needed. payload holds the job's arguments and result its
+    return value, both as JSON. See jobs.py.
+    """
+
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_SUCCEEDED = "succeeded"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_SUCCEEDED, "Succeeded"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    kind = models.CharField(max_length=50)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    result = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    progress_done = models.PositiveIntegerField(default=0)
+    progress_total = models.PositiveIntegerField(null=True, blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="asset_jobs",
+        db_index=False,
+    )
+    worker = models.CharField(max_length=100, blank=True)
+    # Not claimable before this; pushed back between retries
+    run_after = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    objects = AssetJobQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "run_after"], name="asset_job_claim_idx"),
+            models.Index(fields=["created_by", "created_at"], name="asset_job_user_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} job {self.pk} ({self.status})"
+
+    @property
+    def finished(self):
+        return self.status in (self.STATUS_SUCCEEDED, self.STATUS_FAILED)
+
+    @property
+    def percent(self):
+        if self.status == self.STATUS_SUCCEEDED:
+            return 100
+        if not self.progress_total:
+            return None
+        return min(100, self.progress_done * 100 // self.progress_total)
@@ -0,0 +1,100 @@
+"""
+The daily sweep of the stored Asset.overdue flag.
+
+Saves and the bulk writers keep the flag in step with depreciation and
+status, but nothing writes to an asset on the day its depreciation date
+passes. sweep_overdue() finds the assets whose flag is out of date (newly
+overdue ones through the depreciation index, no longer overdue ones through
+the overdue index) and fixes them in batches, each its own short
+transaction, returning an OverdueDigest of what changed.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.utils import timezone
+
+from .detail_cache import invalidate_details
+from .models import Asset, overdue_condition
+
+DIGEST_SAMPLE_SIZE = 50
+
+
+class OverdueDigest:
+    def __init__(self, today):
+        self.today = today
+        self.flagged = 0
+        self.cleared = 0
+        self.by_category = Counter()
+        self.sample = []
+        self.total = 0
+
+    def add_flagged(self, rows):
+        self.flagged += len(rows)
+        for row in rows:
+            self.by_category[row["category"]] += 1
+            if len(self.sample) < DIGEST_SAMPLE_SIZE:
+                self.sample.append(row)
+
+    def lines(self):
+        yield f"Overdue sweep for {self.today}: {self.flagged} newly overdue, {self.cleared} cleared, {self.total} overdue in total."
+        for category, count in sorted(self.by_category.items()):
+            yield f"  {category}: {count} newly overdue"
+        for row in self.sample:
+            assignee = row["assigned_to__username"] or "unassigned"
+            yield f"  - {row['name']} ({row['category']}), due {row['depreciation']}, {assignee}"
+        if self.flagged > len(self.sample):
+            yield f"  ... and {self.flagged - len(self.sample)} more"
+
+    def __str__(self):
+        return "\n".join(self.lines())
+
+
+def _batches(queryset, fields, batch_size):
+    """Yield lists of .values() rows until queryset is empty."""
+    while True:
+        rows = list(queryset.order_by().values("pk", *fields)[:batch_size])
+        if not rows:
+            return
+        yield rows
+
+
+def sweep_overdue(today=None, batch_size=1000, dry_run=False, on_batch=None):
+    """
+    Bring every asset's overdue flag up to date as of today. Changed assets
+    get a new updated_at, so cached pages and ETags move on with them.
+    on_batch, if given, is called with the digest after each batch.
+    """
+    today = today or timezone.localdate()
+    digest = OverdueDigest(today)
+    condition = overdue_condition(today)
+    newly = Asset.objects.filter(overdue=False).filter(condition)
+    stale = Asset.objects.filter(overdue=True).exclude(condition)
+
+    if dry_run:
+        rows = newly.order_by("depreciation").values(
+            "pk", "name", "category", "depreciation", "assigned_to__username"
+        )
+        digest.add_flagged(list(rows))
+        digest.cleared = stale.count()
+        digest.total = Asset.objects.overdue().count() + digest.flagged - digest.cleared
+        return digest
+
+    fields = ("name", "category", "depreciation", "assigned_to__username")
+    for rows in _batches(newly, fields, batch_size):
+        pks = [row["pk"] for row in rows]
+        with transaction.atomic():
+            newly.filter(pk__in=pks).update(overdue=True, updated_at=timezone.now())
+            invalidate_details(pks)
+        digest.add_flagged(rows)
+        if on_batch:
+            on_batch(digest)
+    for rows in _batches(stale, (), batch_size):
+        pks = [row["pk"] for row in rows]
+        with transaction.atomic():
+            stale.filter(pk__in=pks).update(overdue=False, updated_at=timezone.now())
+            invalidate_details(pks)
+        digest.cleared += len(rows)
+        if on_batch:
+            on_batch(digest)
+    digest.total = Asset.objects.overdue().count()
+    return digest
@@ -0,0 +1,127 @@
+import base64
+import binascii
+import uuid
+from datetime import datetime
+
+from django.db.models import Q
+
+# Newest first, with the primary key as a tie-breaker so that rows created in
+# the same microsecond still have a total order.
+KEYSET_FIELDS = ("created_at", "id")
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(created_at, pk):
+    """Pack a (created_at, id) position into an opaque, URL-safe token."""
+    raw = f"{created_at.isoformat()}|{uuid.UUID(str(pk)).hex}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        created_at, pk = raw.split("|")
+        return datetime.fromisoformat(created_at), uuid.UUID(pk)
+    except (binascii.Error, UnicodeError, ValueError) as exc:
+        raise InvalidCursor(token) from exc
+
+
+def cursor_for(row):
+    """Cursor for an Asset or a values() row holding created_at and id."""
+    if isinstance(row, dict):
+        return encode_cursor(row["created_at"], row["id"])
+    return encode_cursor(row.created_at, row.pk)
+
+
+def after_cursor(queryset, token):
+    """Rows strictly after the cursor in newest-first order."""
+    created_at, pk = decode_cursor(token)
+    return queryset.filter(
+        Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+    )
+
+
+def before_cursor(queryset, token):
+    """Rows strictly before the cursor in newest-first order."""
+    created_at, pk = decode_cursor(token)
+    return queryset.filter(
+        Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+    )
+
+
+class KeysetPage:
+    def __init__(self, object_list, has_next, has_previous):
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if self._has_next and self.object_list:
+            return cursor_for(self.object_list[-1])
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self._has_previous and self.object_list:
+            return cursor_for(self.object_list[0])
+        return None
+
+
+class KeysetPaginator:
+    """
+    Cursor pagination over (created_at, id). Each page is a single indexed
+    range query with LIMIT per_page + 1, so page N costs the same as page 1
+    and rows inserted while a user is paging never shift the window.
+    """
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset
+        self.per_page = per_page
+
+    def _window(self, after, before):
+        """The LIMIT per_page + 1 query for the requested page."""
+        if before:
+            return before_cursor(self.queryset, before).order_by(*KEYSET_FIELDS)[: self.per_page + 1]
+        queryset = self.queryset
+        if after:
+            queryset = after_cursor(queryset, after)
+        return queryset.order_by(*(f"-{f}" for f in KEYSET_FIELDS))[: self.per_page + 1]
+
+    def _page(self, rows, after, before):
+        if before:
+            has_previous = len(rows) > self.per_page
+            rows = rows[: self.per_page]
+            rows.reverse()
+            return KeysetPage(rows, has_next=True, has_previous=has_previous)
+        has_next = len(rows) > self.per_page
+        return KeysetPage(
+            rows[: self.per_page], has_next=has_next, has_previous=bool(after)
+        )
+
+    def page(self, after=None, before=None):
+        return self._page(list(self._window(after, before)), after, before)
+
+    async def apage(self, after=None, before=None):
+        """page() through the async ORM."""
+        window = self._window(after, before)
+        return self._page([row async for row in window], after, before)
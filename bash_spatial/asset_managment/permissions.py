@@ -0,0 +1,131 @@
+from functools import wraps
+
+from django.contrib.auth.mixins import UserPassesTestMixin
+from django.core.exceptions import PermissionDenied
+from django.shortcuts import get_object_or_404
+
+MANAGER_GROUP = "manager"
+
+ROLE_ANONYMOUS = "anonymous"
+ROLE_MEMBER = "member"
+ROLE_MANAGER = "manager"
+ROLE_ADMIN = "admin"
+
+# Roles that may see and edit every asset in the inventory
+UNRESTRICTED_ROLES = (ROLE_ADMIN, ROLE_MANAGER)
+
+_ROLE_CACHE_ATTR = "_asset_role"
+
+
+def resolve_role(user):
+    """
+    Work out the user's asset role. The result is cached on the user object,
+    and since request.user is the same object for the whole request, the
+    manager-group lookup runs at most once per request.
+    """
+    cached = getattr(user, _ROLE_CACHE_ATTR, None)
+    if cached is not None:
+        return cached
+
+    if not user.is_authenticated:
+        role = ROLE_ANONYMOUS
+    elif user.is_superuser:
+        role = ROLE_ADMIN
+    elif user.groups.filter(name=MANAGER_GROUP).exists():
+        role = ROLE_MANAGER
+    else:
+        role = ROLE_MEMBER
+
+    setattr(user, _ROLE_CACHE_ATTR, role)
+    return role
+
+
+def can_manage(user):
+    """Superusers and managers can create assets and see the whole inventory."""
+    return resolve_role(user) in UNRESTRICTED_ROLES
+
+
+def visibility_filter(queryset, user):
+    """Narrow an Asset queryset down to the rows the user is allowed to see."""
+    role = resolve_role(user)
+    if role in UNRESTRICTED_ROLES:
+        return queryset
+    if role == ROLE_ANONYMOUS:
+        return queryset.none()
+    return queryset.filter(assigned_to=user)
+
+
+def can_access(user, asset):
+    """Per-object form of visibility_filter, evaluated without a query."""
+    role = resolve_role(user)
+    if role in UNRESTRICTED_ROLES:
+        return True
+    if role == ROLE_ANONYMOUS:
+        return False
+    return asset.assigned_to_id == user.pk
+
+
+def _get_asset(queryset, pk):
+    return get_object_or_404(queryset, pk=pk)
+
+
+def resolve_asset(request, queryset, pk, load=_get_asset):
+    """
+    Look the asset up and decide access once per request. Both are kept on
+    the request, so test_func, get_object() and the view body share one
+    query. load(queryset, pk) fetches the asset and raises Http404 if it
+    does not exist.
+    """
+    resolved = request.__dict__.setdefault("_resolved_assets", {})
+    key = str(pk)
+    if key not in resolved:
+        asset = load(queryset, pk)
+        resolved[key] = (asset, can_access(request.user, asset))
+    return resolved[key]
+
+
+class AssetAccessMixin(UserPassesTestMixin):
+    """
+    Shared test_func for the single-asset views. Missing assets still 404
+    from get_object(); assets the user cannot see are a 403.
+
+    The asset and the access decision come from resolve_asset(), so the row
+    is fetched once per request however often get_object() is called.
+    """
+
+    load_asset = staticmethod(_get_asset)
+
+    def get_asset_access(self):
+        return resolve_asset(
+            self.request,
+            self.get_queryset(),
+            self.kwargs[self.pk_url_kwarg],
+            load=self.load_asset,
+        )
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        return self.get_asset_access()[0]
+
+    def test_func(self):
+        return self.get_asset_access()[1]
+
+
+def asset_access_required(queryset):
+    """
+    Function-view counterpart of AssetAccessMixin. The wrapped view is called
+    with the resolved asset in place of its pk.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, pk, *args, **kwargs):
+            asset, allowed = resolve_asset(request, queryset.all(), pk)
+            if not allowed:
+                raise PermissionDenied
+            return view(request, asset, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,61 @@
+"""
+EXPLAIN plans for the queries AssetListView generates. Used by the
+explain_asset_queries command and by the index regression tests.
+"""
+import re
+
+from django.http import QueryDict
+
+from .list_filters import filter_assets
+from .pagination import after_cursor, encode_cursor
+from .views import AssetListView
+
+# name -> (role, GET parameters). "member" runs through the visible_to
+# filter, "admin" sees the whole inventory.
+LIST_QUERY_COMBINATIONS = {
+    "all": ("admin", {}),
+    "status": ("admin", {"status": "operational"}),
+    "category": ("admin", {"category": "General"}),
+    "category_status": ("admin", {"category": "General", "status": "operational"}),
+    "overdue": ("admin", {"overdue": "1"}),
+    "member": ("member", {}),
+    "member_status": ("member", {"status": "operational"}),
+}
+
+# Plan fragments that mean the database is reading every row or sorting the
+# whole result instead of walking an index.
+FULL_SCAN_PATTERNS = [
+    re.compile(r"SCAN (TABLE )?asset_managment_asset(?! USING)"),  # SQLite
+    re.compile(r"USE TEMP B-TREE FOR ORDER BY"),  # SQLite
+    re.compile(r"Seq Scan on asset_managment_asset"),  # PostgreSQL
+]
+
+
+def list_page_queryset(user, params, after=None):
+    """The exact page query the list view runs for this user and filter set."""
+    query = QueryDict(mutable=True)
+    query.update(params)
+    queryset = filter_assets(user, query)
+    if after:
+        queryset = after_cursor(queryset, after)
+    return queryset.order_by("-created_at", "-id")[: AssetListView.paginate_by + 1]
+
+
+def explain_list_queries(users, cursor_from=None):
+    """
+    Return {combination: plan} for the first page of every combination, and
+    for a deep page as well when cursor_from (an Asset) is given.
+    """
+    plans = {}
+    for name, (role, params) in LIST_QUERY_COMBINATIONS.items():
+        user = users[role]
+        plans[name] = list_page_queryset(user, params).explain()
+        if cursor_from is not None:
+            cursor = encode_cursor(cursor_from.created_at, cursor_from.pk)
+            plans[f"{name}:after"] = list_page_queryset(user, params, after=cursor).explain()
+    return plans
+
+
+def full_scans(plan):
+    """Plan fragments that indicate a full table scan or unindexed sort."""
+    return [p.pattern for p in FULL_SCAN_PATTERNS if p.search(plan)]
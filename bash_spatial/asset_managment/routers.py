@@ -0,0 +1,140 @@
+"""
+Read replica routing.
+
+Views marked with replica_reads = True (class-based) or @reads_from_replica
+(functions) read this app's models from one of settings.ASSET_READ_REPLICAS,
+picked at random per request. That is the list, detail, export and API
+pages, and only for GET and HEAD, so a POST handled by a list subclass (bulk
+actions) still reads what it is about to change from the primary. Every
+write, and every other read, goes to the primary ("default"). Users, groups
+and sessions are always read from the primary, so a fresh login or password
+change is never lost to a lagging replica.
+
+ReplicaRoutingMiddleware (middleware.py) keeps read-your-writes: a request that writes to
+this app's models sets a cookie pinning that client to the primary for
+settings.ASSET_REPLICA_STICKY_SECONDS, which should be longer than the
+replicas lag. Clients that drop cookies are not pinned.
+
+With no replicas configured every read goes to the primary, as before.
+"""
+import contextvars
+import random
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+PRIMARY = DEFAULT_DB_ALIAS
+STICKY_COOKIE = "asset_primary_until"
+REPLICATED_APPS = ("asset_managment",)
+REPLICA_METHODS = ("GET", "HEAD")
+
+
+class RoutingState:
+    __slots__ = ("replica", "pinned", "wrote")
+
+    def __init__(self, pinned=False):
+        self.replica = None  # alias serving this request's reads, if any
+        self.pinned = pinned
+        self.wrote = False
+
+
+_state = contextvars.ContextVar("asset_db_routing", default=None)
+
+
+def current_routing():
+    return _state.get()
+
+
+def replica_aliases():
+    return list(getattr(settings, "ASSET_READ_REPLICAS", ()))
+
+
+def sticky_seconds():
+    return getattr(settings, "ASSET_REPLICA_STICKY_SECONDS", 10)
+
+
+def reads_from_replica(view):
+    """Mark a function view as safe to serve from a replica."""
+    view.replica_reads = True
+    return view
+
+
+def wants_replica(view_func):
+    view = getattr(view_func, "view_class", view_func)
+    return getattr(view, "replica_reads", False)
+
+
+@contextmanager
+def routing(pinned=False):
+    """Route the block's queries as one request's."""
+    state = RoutingState(pinned)
+    token = _state.set(state)
+    try:
+        yield state
+    finally:
+        _state.reset(token)
+
+
+def use_replica(state):
+    aliases = replica_aliases()
+    if aliases and not state.pinned:
+        state.replica = random.choice(aliases)
+
+
+def is_pinned(request):
+    try:
+        return float(request.COOKIES.get(STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def pin_to_primary(response):
+    seconds = sticky_seconds()
+    response.set_cookie(
+        STICKY_COOKIE, f"{time.time() + seconds:.0f}",
+        max_age=seconds, httponly=True, samesite="Lax",
+    )
+
+
+def routed_chunks(state, content):
+    # Streamed bodies are read after the middleware returns, so put the
+    # request's routing back around each chunk
+    iterator = iter(content)
+    while True:
+        token = _state.set(state)
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            _state.reset(token)
+        yield chunk
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or state.replica is None or model._meta.app_label not in REPLICATED_APPS:
+            return PRIMARY
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None and model._meta.app_label in REPLICATED_APPS:
+            state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {PRIMARY, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema from the primary
+        if db in replica_aliases():
+            return False
+        return None
+
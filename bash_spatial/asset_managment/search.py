@@ -0,0 +1,207 @@
+"""
+Full-text search over asset name, category, id and attribute name/value
+pairs. SQLite uses an FTS5 index kept in sync by signals (see signals.py);
+other databases fall back to DatabaseSearchBackend unless
+settings.ASSET_SEARCH_BACKEND points at something better.
+"""
+import re
+import uuid
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Exists, OuterRef, Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from .models import Asset, Attribute
+
+SEARCH_TABLE = "asset_managment_assetsearch"
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Hex digits with optional dashes, as pasted from an asset id. At least one
+# digit is required so that words like "cafe" or "added" stay free text.
+_ID_SHAPED_RE = re.compile(r"^\{?[0-9a-f][0-9a-f-]{3,35}\}?$", re.IGNORECASE)
+_HAS_DIGIT_RE = re.compile(r"\d")
+
+
+def search_tokens(query):
+    return _TOKEN_RE.findall(query)
+
+
+def parse_asset_id(query):
+    """
+    Classify a search string as an asset id.
+
+    Returns ("exact", UUID) for a complete id, ("prefix", (low, high)) for a
+    partial one, where low/high bound a primary-key range scan, or None when
+    the query is only free text. A prefix could also be a model number or
+    serial, so callers search it as text too.
+    """
+    query = query.strip()
+    if not _ID_SHAPED_RE.match(query) or not _HAS_DIGIT_RE.search(query):
+        return None
+    digits = query.strip("{}").replace("-", "").lower()
+    if len(digits) == 32:
+        return "exact", uuid.UUID(digits)
+    return "prefix", (
+        uuid.UUID(digits.ljust(32, "0")),
+        uuid.UUID(digits.ljust(32, "f")),
+    )
+
+
+def filter_by_asset_id(queryset, lookup):
+    kind, value = lookup
+    if kind == "exact":
+        return queryset.filter(pk=value)
+    low, high = value
+    return queryset.filter(pk__gte=low, pk__lte=high)
+
+
+class SearchBackend:
+    def filter(self, queryset, query):
+        """Restrict an Asset queryset to rows matching query."""
+        raise NotImplementedError
+
+    def ranked_ids(self, query, limit=50, queryset=None):
+        """
+        Best matching asset ids, most relevant first, drawn from queryset
+        (every asset when None).
+        """
+        raise NotImplementedError
+
+    def index_assets(self, pks):
+        """(Re)index the given assets after they or their attributes change."""
+
+    def remove_assets(self, pks):
+        """Drop deleted assets from the index."""
+
+    def rebuild(self):
+        """Rebuild the whole index from the asset tables."""
+
+
+class DatabaseSearchBackend(SearchBackend):
+    """Portable substring search. Needs no index, but scans the table."""
+
+    def _condition(self, query):
+        attribute_match = Attribute.objects.filter(asset=OuterRef("pk")).filter(
+            Q(name__icontains=query) | Q(value__icontains=query)
+        )
+        return (
+            Q(name__icontains=query)
+            | Q(category__icontains=query)
+            | Q(Exists(attribute_match))
+        )
+
+    def filter(self, queryset, query):
+        return queryset.filter(self._condition(query))
+
+    def ranked_ids(self, query, limit=50, queryset=None):
+        queryset = Asset.objects.all() if queryset is None else queryset
+        return list(
+            queryset.filter(self._condition(query))
+            .order_by("-updated_at")
+            .values_list("pk", flat=True)[:limit]
+        )
+
+
+class SQLiteFTSBackend(SearchBackend):
+    """
+    FTS5 index with one row per asset. Every query token is a prefix match,
+    and results are ranked by bm25 with name weighted highest.
+    """
+
+    # bm25 weights in column order: asset_id, name, category, attributes
+    RANK = f"bm25({SEARCH_TABLE}, 1.0, 10.0, 2.0, 5.0)"
+    batch_size = 2000
+
+    def match_expression(self, query):
+        tokens = search_tokens(query)
+        if not tokens:
+            return None
+        return " ".join('"%s"*' % t.replace('"', '""') for t in tokens)
+
+    def filter(self, queryset, query):
+        expression = self.match_expression(query)
+        if expression is None:
+            return queryset.none()
+        return queryset.filter(
+            pk__in=RawSQL(
+                f"SELECT asset_id FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s",
+                [expression],
+            )
+        )
+
+    def ranked_ids(self, query, limit=50, queryset=None):
+        expression = self.match_expression(query)
+        if expression is None:
+            return []
+        sql = f"SELECT asset_id FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s"
+        params = [expression]
+        if queryset is not None:
+            # Rank only the rows the caller's filters and permissions allow
+            subquery, subquery_params = queryset.order_by().values("pk").query.sql_with_params()
+            sql += f" AND asset_id IN ({subquery})"
+            params.extend(subquery_params)
+        with connection.cursor() as cursor:
+            cursor.execute(f"{sql} ORDER BY {self.RANK} LIMIT %s", [*params, limit])
+            return [Asset._meta.pk.to_python(row[0]) for row in cursor.fetchall()]
+
+    def _documents(self, assets):
+        pks = [pk for pk, _, _ in assets]
+        attributes = defaultdict(list)
+        for asset_id, name, value in Attribute.objects.filter(asset_id__in=pks).values_list(
+            "asset_id", "name", "value"
+        ):
+            attributes[asset_id].append(f"{name} {value}")
+        return [
+            (pk.hex, name, category, "\n".join(attributes[pk]))
+            for pk, name, category in assets
+        ]
+
+    def _insert(self, cursor, documents):
+        cursor.executemany(
+            f"INSERT INTO {SEARCH_TABLE} (asset_id, name, category, attributes) "
+            f"VALUES (%s, %s, %s, %s)",
+            documents,
+        )
+
+    def index_assets(self, pks):
+        pks = list(pks)
+        assets = list(Asset.objects.filter(pk__in=pks).values_list("pk", "name", "category"))
+        with connection.cursor() as cursor:
+            self._delete(cursor, pks)
+            self._insert(cursor, self._documents(assets))
+
+    def remove_assets(self, pks):
+        with connection.cursor() as cursor:
+            self._delete(cursor, pks)
+
+    def _delete(self, cursor, pks):
+        cursor.executemany(
+            f"DELETE FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s",
+            [('asset_id : "%s"' % Asset._meta.pk.to_python(pk).hex,) for pk in pks],
+        )
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+            batch = []
+            rows = Asset.objects.order_by().values_list("pk", "name", "category")
+            for row in rows.iterator(chunk_size=self.batch_size):
+                batch.append(row)
+                if len(batch) == self.batch_size:
+                    self._insert(cursor, self._documents(batch))
+                    batch = []
+            if batch:
+                self._insert(cursor, self._documents(batch))
+
+
+def get_search_backend():
+    path = getattr(settings, "ASSET_SEARCH_BACKEND", None)
+    if path:
+        return import_string(path)()
+    if connection.vendor == "sqlite":
+        return SQLiteFTSBackend()
+    return DatabaseSearchBackend()
@@ -0,0 +1,97 @@
+"""
+Synthetic inventory for benchmarks and local testing.
+
+seed_assets() writes users, assets and attributes with bulk_create in
+batches, one transaction per batch, so seeding a million assets keeps memory
+flat. The data mimics a real inventory closely enough for the list filters,
+search and attribute filters to have something to select: a spread of
+categories and statuses, some assets past their depreciation date, about a
+third assigned, and attributes mixing text, numbers, dates and yes/no values.
+Pass seed for repeatable data.
+
+Bulk inserts skip the model signals, so each batch is added to the search
+index as it is written and the facet counts are rebuilt once at the end. No
+history is written for seeded assets.
+"""
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from .facets import rebuild_facets
+from .models import Asset, Attribute
+from .search import get_search_backend
+
+CATEGORIES = ("Laptop", "Monitor", "Phone", "Furniture", "Vehicle", "Software", "Server", "General")
+STATUSES = [choice for choice, _ in Asset.STATUS_CHOICES]
+SEED_PASSWORD = "seed-password"
+
+# (name, value factory) for the first attributes of every asset; any more
+# per asset are generic "Attribute n" text values
+ATTRIBUTES = (
+    ("Serial Number", lambda rng: f"SN{rng.randrange(10 ** 8):08d}"),
+    ("RAM", lambda rng: str(rng.choice((4, 8, 16, 32, 64)))),
+    ("Warranty Expires", lambda rng: (timezone.localdate() + timedelta(days=rng.randrange(-730, 1095))).isoformat()),
+    ("Leased", lambda rng: rng.choice(("yes", "no"))),
+    ("Cost", lambda rng: f"{rng.randrange(50, 5000)}.{rng.randrange(100):02d}"),
+)
+
+
+def seed_users(count, prefix="seed-user"):
+    """Create count users (all with SEED_PASSWORD) and return their pks."""
+    password = make_password(SEED_PASSWORD)  # hashed once, not per user
+    start = User.objects.filter(username__startswith=prefix).count()
+    users = User.objects.bulk_create(
+        User(username=f"{prefix}-{n}", password=password) for n in range(start, start + count)
+    )
+    return [user.pk for user in users]
+
+
+def _attributes(rng, asset, count):
+    for n in range(count):
+        if n < len(ATTRIBUTES):
+            name, factory = ATTRIBUTES[n]
+            value = factory(rng)
+        else:
+            name, value = f"Attribute {n + 1}", f"value {rng.randrange(1000)}"
+        attribute = Attribute(asset=asset, name=name, value=value)
+        attribute.set_typed_value()
+        yield attribute
+
+
+def seed_assets(assets, attrs_per_asset=5, users=10, batch_size=1000, seed=None):
+    """
+    Create users plus assets with attrs_per_asset attributes each. Returns
+    the number of assets created.
+    """
+    rng = random.Random(seed)
+    user_pks = seed_users(users) if users else []
+    today = timezone.localdate()
+    created = 0
+    search = get_search_backend()
+    while created < assets:
+        size = min(batch_size, assets - created)
+        batch = []
+        for n in range(created, created + size):
+            asset = Asset(
+                name=f"{rng.choice(CATEGORIES)} {n + 1:07d}",
+                category=rng.choice(CATEGORIES),
+                status=rng.choice(STATUSES),
+                depreciation=today + timedelta(days=rng.randrange(-365, 1825)) if rng.random() < 0.6 else None,
+                assigned_to_id=rng.choice(user_pks) if user_pks and rng.random() < 0.35 else None,
+            )
+            asset.set_overdue()
+            batch.append(asset)
+        with transaction.atomic():
+            Asset.objects.bulk_create(batch)
+            Attribute.objects.bulk_create(
+                [a for asset in batch for a in _attributes(rng, asset, attrs_per_asset)],
+                batch_size=batch_size,
+            )
+            search.index_assets([asset.pk for asset in batch])
+        created += size
+    rebuild_facets()
+    return created
@@ -0,0 +1,94 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .audit import ACTION_CREATED, ACTION_DELETED, ACTION_UPDATED, record_change
+from .detail_cache import invalidate_details
+from .facets import adjust_facets, invalidate_facets
+from .instrumentation import install_query_recorder
+from .models import Asset, Attribute
+from .search import get_search_backend
+
+
+@receiver(post_save, sender=Asset)
+def index_saved_asset(sender, instance, **kwargs):
+    get_search_backend().index_assets([instance.pk])
+
+
+@receiver(post_delete, sender=Asset)
+def unindex_deleted_asset(sender, instance, **kwargs):
+    get_search_backend().remove_assets([instance.pk])
+
+
+@receiver(post_save, sender=Asset)
+def count_saved_asset(sender, instance, created, **kwargs):
+    current = (instance.category, instance.status)
+    if created:
+        adjust_facets([(current, 1)])
+    else:
+        loaded = getattr(instance, "_loaded_values", {})
+        previous = (loaded.get("category"), loaded.get("status"))
+        if None in previous:
+            # Saved without being loaded first, so the old facet is unknown
+            invalidate_facets()
+        elif previous != current:
+            adjust_facets([(previous, -1), (current, 1)])
+
+
+@receiver(post_delete, sender=Asset)
+def count_deleted_asset(sender, instance, **kwargs):
+    loaded = getattr(instance, "_loaded_values", {})
+    previous = (
+        loaded.get("category", instance.category),
+        loaded.get("status", instance.status),
+    )
+    adjust_facets([(previous, -1)])
+
+
+@receiver(post_save, sender=Attribute)
+@receiver(post_delete, sender=Attribute)
+def reindex_attribute_owner(sender, instance, **kwargs):
+    get_search_backend().index_assets([instance.asset_id])
+
+
+@receiver(post_save, sender=Asset)
+@receiver(post_save, sender=Attribute)
+def record_saved_change(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    record_change(instance, ACTION_CREATED if created else ACTION_UPDATED)
+
+
+@receiver(post_delete, sender=Asset)
+@receiver(post_delete, sender=Attribute)
+def record_deleted_change(sender, instance, **kwargs):
+    record_change(instance, ACTION_DELETED)
+
+
+@receiver(post_save, sender=Asset)
+@receiver(post_delete, sender=Asset)
+def invalidate_asset_detail(sender, instance, **kwargs):
+    invalidate_details([instance.pk])
+
+
+@receiver(post_save, sender=Attribute)
+@receiver(post_delete, sender=Attribute)
+def invalidate_attribute_owner_detail(sender, instance, **kwargs):
+    invalidate_details([instance.asset_id])
+
+
+@receiver(post_save, sender=Attribute)
+@receiver(post_delete, sender=Attribute)
+def touch_attribute_owner(sender, instance, origin=None, **kwargs):
+    # Attributes are part of the asset's page, so editing one must move the
+    # asset's updated_at for conditional GETs. Skipped when the asset itself
+    # is being deleted.
+    if isinstance(origin, Asset):
+        return
+    Asset.objects.filter(pk=instance.asset_id).update(updated_at=timezone.now())
+
+
+@receiver(connection_created)
+def count_request_queries(sender, connection, **kwargs):
+    install_query_recorder(connection)
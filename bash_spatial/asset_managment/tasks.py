@@ -0,0 +1,134 @@
+"""
+Handlers for the background jobs in jobs.py, one per job kind. Each takes
+the claimed AssetJob, reads its arguments from job.payload and returns a
+JSON-ready result. Imports, exports and bulk actions run with the access
+of the user who queued them; files passed between a request and its job
+(uploads to import, finished exports) live in jobs.job_storage().
+"""
+import io
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.files import File
+from django.http import QueryDict
+
+from . import exporter
+from .attribute_filters import InvalidAttributeFilter
+from .bulk import apply_bulk_action
+from .facets import rebuild_facets
+from .importer import ImportResult, import_assets
+from .jobs import (
+    JOB_BULK_ACTION,
+    JOB_EXPORT,
+    JOB_IMPORT,
+    JOB_REBUILD_FACETS,
+    JOB_SWEEP_OVERDUE,
+    JobError,
+    job_storage,
+    report_progress,
+)
+from .list_filters import filter_assets
+from .overdue import sweep_overdue
+
+# Export chunks written between progress reports
+EXPORT_PROGRESS_EVERY = 1000
+
+
+def _owner(job):
+    if job.created_by is None:
+        raise JobError("The user who queued this job no longer exists.")
+    return job.created_by
+
+
+def list_queryset(user, query):
+    """The asset list's queryset for user, filtered by the query string."""
+    try:
+        return filter_assets(user, QueryDict(query))
+    except InvalidAttributeFilter as exc:
+        raise JobError(str(exc))
+
+
+def run_import(job):
+    payload = job.payload
+    storage = job_storage()
+    result = ImportResult()
+    with storage.open(payload["file"], "rb") as upload:
+        stream = io.TextIOWrapper(upload, encoding="utf-8", newline="")
+        try:
+            import_assets(
+                stream,
+                payload["format"],
+                payload.get("batch_size", 1000),
+                result,
+                on_batch=lambda r: report_progress(job, r.created + r.failed),
+            )
+        except UnicodeDecodeError:
+            raise JobError("The file must be UTF-8 encoded.")
+    storage.delete(payload["file"])
+    return {"created": result.created, "failed": result.failed, "errors": result.errors}
+
+
+def run_export(job):
+    fmt = job.payload["format"]
+    if fmt not in exporter.STREAMS:
+        raise JobError(f"Unknown export format {fmt!r}.")
+    content_type, extension = exporter.FORMATS[fmt]
+    queryset = list_queryset(_owner(job), job.payload.get("query", ""))
+    total = queryset.count()
+    report_progress(job, 0, total)
+
+    with tempfile.TemporaryFile() as tmp:
+        for n, chunk in enumerate(exporter.STREAMS[fmt](queryset), 1):
+            tmp.write(chunk.encode())
+            if n % EXPORT_PROGRESS_EVERY == 0:
+                report_progress(job, min(n, total))
+        tmp.seek(0)
+        name = job_storage().save(f"exports/{job.pk}.{extension}", File(tmp))
+    return {
+        "file": name,
+        "filename": f"assets.{extension}",
+        "content_type": content_type,
+        "rows": total,
+    }
+
+
+def run_bulk_action(job):
+    payload = job.payload
+    queryset = list_queryset(_owner(job), payload.get("query", ""))
+    if payload.get("asset_ids") is not None:
+        queryset = queryset.filter(pk__in=payload["asset_ids"])
+    assignee = None
+    if payload.get("assignee") is not None:
+        assignee = User.objects.filter(pk=payload["assignee"]).first()
+        if assignee is None:
+            raise JobError("The assignee no longer exists.")
+    affected = apply_bulk_action(
+        queryset, payload["action"], status=payload.get("status"), assignee=assignee
+    )
+    return {"action": payload["action"], "affected": affected}
+
+
+def run_sweep_overdue(job):
+    digest = sweep_overdue(
+        batch_size=job.payload.get("batch_size", 1000),
+        on_batch=lambda d: report_progress(job, d.flagged + d.cleared),
+    )
+    return {
+        "flagged": digest.flagged,
+        "cleared": digest.cleared,
+        "total": digest.total,
+        "digest": str(digest),
+    }
+
+
+def run_rebuild_facets(job):
+    return {"categories": len(rebuild_facets())}
+
+
+HANDLERS = {
+    JOB_IMPORT: run_import,
+    JOB_EXPORT: run_export,
+    JOB_BULK_ACTION: run_bulk_action,
+    JOB_SWEEP_OVERDUE: run_sweep_overdue,
+    JOB_REBUILD_FACETS: run_rebuild_facets,
+}
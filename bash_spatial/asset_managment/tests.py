@@ -1,8 +1,13 @@
 from django.test import TestCase, Client
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import User
 from django.urls import reverse
 from asset_managment.models import Asset, Attribute
+import os
+import tempfile
 import uuid
+from io import StringIO
 
 # ========== BRAXTON'S BACKEND UNIT TESTS ==========
 
@@ -516,3 +521,2027 @@ class AttributeCRUDTests(TestCase):
         self.assertFalse(Attribute.objects.filter(pk=attribute.pk).exists())
 
 
+
+from django.contrib.auth.models import Group
+
+class AssetVisibilityTests(TestCase):
+    """
+    Tests for the set-based access rules behind Asset.objects.visible_to
+    """
+
+    def setUp(self):
+        self.client = Client()
+        self.member = User.objects.create_user(username='member', password='p')
+        self.manager = User.objects.create_user(username='boss', password='p')
+        self.manager.groups.add(Group.objects.create(name='manager'))
+
+        self.mine = Asset.objects.create(name='Mine', assigned_to=self.member)
+        self.other = Asset.objects.create(name='Other')
+
+    def test_member_only_sees_assigned_assets(self):
+        visible = Asset.objects.visible_to(self.member)
+        self.assertEqual(list(visible), [self.mine])
+
+    def test_manager_sees_everything(self):
+        self.assertEqual(Asset.objects.visible_to(self.manager).count(), 2)
+
+    def test_has_access_matches_visible_to(self):
+        for user in (self.member, self.manager):
+            user = User.objects.get(pk=user.pk)
+            visible = set(Asset.objects.visible_to(user))
+            for asset in Asset.objects.all():
+                self.assertEqual(asset.has_access(user), asset in visible)
+
+    def test_detail_forbidden_for_unassigned_member(self):
+        self.client.login(username='member', password='p')
+        response = self.client.get(reverse('asset_detail', kwargs={'pk': self.other.pk}))
+        self.assertEqual(response.status_code, 403)
+
+    def test_list_query_count_is_constant(self):
+        self.client.login(username='boss', password='p')
+        self.client.get(reverse('asset_list'))  # warm the facet cache
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(reverse('asset_list'))
+
+        Asset.objects.bulk_create(
+            [Asset(name=f'Bulk {i}', assigned_to=self.member) for i in range(20)]
+        )
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(reverse('asset_list'))
+
+        self.assertEqual(len(response.context['assets']), 22)
+        self.assertEqual(len(small), len(large))
+
+from datetime import timedelta
+from django.utils import timezone
+from asset_managment.pagination import encode_cursor
+
+class AssetListPaginationTests(TestCase):
+    """
+    Tests for keyset pagination and streaming on the asset list
+    """
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_superuser(username='admin', password='p')
+        self.client.login(username='admin', password='p')
+
+        Asset.objects.bulk_create([Asset(name=f'Asset {i:03d}') for i in range(120)])
+        # Spread creation times out so the order is deterministic
+        base = timezone.now()
+        for i, asset in enumerate(Asset.objects.order_by('name')):
+            Asset.objects.filter(pk=asset.pk).update(created_at=base + timedelta(seconds=i))
+
+    def test_pages_cover_every_asset_once(self):
+        seen = []
+        url = reverse('asset_list')
+        while url:
+            response = self.client.get(url)
+            seen.extend(a.name for a in response.context['assets'])
+            next_url = response.context['next_url']
+            url = reverse('asset_list') + next_url if next_url else None
+        self.assertEqual(len(seen), 120)
+        self.assertEqual(seen, sorted(seen, reverse=True))
+
+    def test_concurrent_insert_does_not_shift_page(self):
+        first = self.client.get(reverse('asset_list'))
+        next_url = reverse('asset_list') + first.context['next_url']
+        before = [a.pk for a in self.client.get(next_url).context['assets']]
+
+        Asset.objects.create(name='Brand New')
+        after = [a.pk for a in self.client.get(next_url).context['assets']]
+        self.assertEqual(before, after)
+
+    def test_previous_page_round_trip(self):
+        first = self.client.get(reverse('asset_list'))
+        second = self.client.get(reverse('asset_list') + first.context['next_url'])
+        back = self.client.get(reverse('asset_list') + second.context['previous_url'])
+        self.assertEqual(
+            [a.pk for a in back.context['assets']],
+            [a.pk for a in first.context['assets']],
+        )
+
+    def test_invalid_cursor_404(self):
+        response = self.client.get(reverse('asset_list'), {'after': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_deep_page_uses_same_queries_as_first(self):
+        last = Asset.objects.order_by('created_at').first()
+        cursor = encode_cursor(last.created_at + timedelta(seconds=10), last.pk)
+        self.client.get(reverse('asset_list'))  # warm the facet cache
+        with CaptureQueriesContext(connection) as first:
+            self.client.get(reverse('asset_list'))
+        with CaptureQueriesContext(connection) as deep:
+            self.client.get(reverse('asset_list'), {'after': cursor})
+        self.assertEqual(len(first), len(deep))
+
+    def test_stream_mode_returns_every_row(self):
+        response = self.client.get(reverse('asset_list'), {'stream': '1'})
+        self.assertTrue(response.streaming)
+        body = b''.join(response.streaming_content).decode()
+        self.assertEqual(body.count('title="View Details"'), 120)
+        self.assertIn('</html>', body)
+
+from asset_managment.query_plans import LIST_QUERY_COMBINATIONS, explain_list_queries, full_scans
+
+class AssetListQueryPlanTests(TestCase):
+    """
+    Index regression tests: every list filter combination must be answered
+    from an index, both on the first page and deep in the keyset.
+    """
+
+    def setUp(self):
+        self.users = {
+            'admin': User.objects.create_superuser(username='admin', password='p'),
+            'member': User.objects.create_user(username='member', password='p'),
+        }
+        Asset.objects.bulk_create([
+            Asset(
+                name=f'Asset {i}',
+                category=['General', 'Electronics'][i % 2],
+                status=['operational', 'checked_out', 'depricated'][i % 3],
+                assigned_to=self.users['member'] if i % 4 == 0 else None,
+            )
+            for i in range(500)
+        ])
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute('ANALYZE')
+
+    def test_every_combination_uses_an_index(self):
+        plans = explain_list_queries(
+            self.users, cursor_from=Asset.objects.order_by('created_at').first()
+        )
+        self.assertEqual(len(plans), 2 * len(LIST_QUERY_COMBINATIONS))
+        for name, plan in plans.items():
+            with self.subTest(combination=name):
+                self.assertEqual(full_scans(plan), [], plan)
+
+from django.test import override_settings
+from asset_managment.search import SQLiteFTSBackend, get_search_backend
+
+class AssetSearchTests(TestCase):
+    """
+    Tests for the full-text search index and its signal-driven sync
+    """
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_superuser(username='admin', password='p')
+        self.client.login(username='admin', password='p')
+
+        self.laptop = Asset.objects.create(name='Dell Latitude Laptop', category='Electronics')
+        self.chair = Asset.objects.create(name='Office Chair', category='Furniture')
+        Attribute.objects.create(asset=self.chair, name='Serial Number', value='SN48213')
+
+    def search(self, query):
+        response = self.client.get(reverse('asset_list'), {'search': query})
+        return {a.pk for a in response.context['assets']}
+
+    def test_prefix_match_on_name(self):
+        self.assertEqual(self.search('Lati'), {self.laptop.pk})
+
+    def test_matches_attribute_values(self):
+        self.assertEqual(self.search('SN482'), {self.chair.pk})
+
+    def test_multiple_terms_must_all_match(self):
+        self.assertEqual(self.search('office furn'), {self.chair.pk})
+        self.assertEqual(self.search('office electronics'), set())
+
+    def test_index_follows_attribute_and_asset_changes(self):
+        attribute = Attribute.objects.create(asset=self.laptop, name='Color', value='Graphite')
+        self.assertEqual(self.search('graphite'), {self.laptop.pk})
+
+        attribute.delete()
+        self.assertEqual(self.search('graphite'), set())
+
+        self.laptop.name = 'Renamed'
+        self.laptop.save()
+        self.assertEqual(self.search('latitude'), set())
+
+        self.chair.delete()
+        self.assertEqual(self.search('office'), set())
+
+    def test_ranked_ids_prefers_name_matches(self):
+        if not isinstance(get_search_backend(), SQLiteFTSBackend):
+            self.skipTest('FTS5 ranking is SQLite only')
+        Attribute.objects.create(asset=self.chair, name='Notes', value='Replaces old laptop stand')
+        self.assertEqual(get_search_backend().ranked_ids('laptop')[0], self.laptop.pk)
+
+    def test_relevance_sort_orders_list_by_rank(self):
+        if not isinstance(get_search_backend(), SQLiteFTSBackend):
+            self.skipTest('FTS5 ranking is SQLite only')
+        Attribute.objects.create(asset=self.chair, name='Notes', value='Replaces old laptop stand')
+        url = reverse('asset_list')
+        newest = self.client.get(url, {'search': 'laptop'})
+        self.assertEqual([a.pk for a in newest.context['assets']], [self.chair.pk, self.laptop.pk])
+        ranked = self.client.get(url, {'search': 'laptop', 'sort': 'relevance'})
+        self.assertEqual([a.pk for a in ranked.context['assets']], [self.laptop.pk, self.chair.pk])
+        self.assertNotIn('next_url', ranked.context)
+
+        filtered = self.client.get(url, {'search': 'laptop', 'sort': 'relevance', 'category': 'Furniture'})
+        self.assertEqual([a.pk for a in filtered.context['assets']], [self.chair.pk])
+
+    def test_rebuild_picks_up_bulk_inserts(self):
+        Asset.objects.bulk_create([Asset(name='Bulk Projector')])
+        self.assertEqual(self.search('projector'), set())
+        get_search_backend().rebuild()
+        self.assertEqual(len(self.search('projector')), 1)
+
+    @override_settings(ASSET_SEARCH_BACKEND='asset_managment.search.DatabaseSearchBackend')
+    def test_database_backend_matches_attributes(self):
+        self.assertEqual(self.search('SN482'), {self.chair.pk})
+
+from asset_managment.search import parse_asset_id
+
+class AssetIdLookupTests(TestCase):
+    """
+    Tests for the exact/prefix asset id path in the list search box
+    """
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_superuser(username='admin', password='p')
+        self.client.login(username='admin', password='p')
+        self.asset = Asset.objects.create(name='Projector')
+        Asset.objects.bulk_create([Asset(name=f'Filler {i}') for i in range(30)])
+
+    def test_parse_asset_id(self):
+        self.assertEqual(parse_asset_id(str(self.asset.pk)), ('exact', self.asset.pk))
+        self.assertEqual(parse_asset_id(self.asset.pk.hex.upper()), ('exact', self.asset.pk))
+        self.assertEqual(parse_asset_id('3fa8')[0], 'prefix')
+        self.assertIsNone(parse_asset_id('cafe'))
+        self.assertIsNone(parse_asset_id('Dell Laptop'))
+        self.assertIsNone(parse_asset_id('12'))
+
+    def test_full_id_redirects_to_detail(self):
+        response = self.client.get(reverse('asset_list'), {'search': str(self.asset.pk)})
+        self.assertRedirects(
+            response,
+            reverse('asset_detail', kwargs={'pk': self.asset.pk}),
+            fetch_redirect_response=False,
+        )
+
+    def test_unknown_full_id_shows_no_results(self):
+        response = self.client.get(reverse('asset_list'), {'search': str(uuid.uuid4())})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['assets']), 0)
+
+    def test_full_id_not_visible_does_not_redirect(self):
+        User.objects.create_user(username='member', password='p')
+        self.client.login(username='member', password='p')
+        response = self.client.get(reverse('asset_list'), {'search': str(self.asset.pk)})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['assets']), 0)
+
+    def test_prefix_matches_asset(self):
+        prefix = str(self.asset.pk)[:8]
+        # The prefix must contain a digit to be treated as an id
+        if parse_asset_id(prefix) is None:
+            self.skipTest('random id prefix happens to be all letters')
+        response = self.client.get(reverse('asset_list'), {'search': prefix})
+        pks = [a.pk for a in response.context['assets']]
+        self.assertIn(self.asset.pk, pks)
+        self.assertTrue(all(str(pk).startswith(prefix) for pk in pks))
+
+    def test_numeric_model_number_still_searches_text(self):
+        laptop = Asset.objects.create(name='Dell Latitude 5520')
+        self.assertIsNotNone(parse_asset_id('5520'))
+        response = self.client.get(reverse('asset_list'), {'search': '5520'})
+        self.assertIn(laptop.pk, [a.pk for a in response.context['assets']])
+
+    def test_numeric_serial_still_searches_attributes(self):
+        Attribute.objects.create(asset=self.asset, name='serial', value='48213377')
+        self.assertIsNotNone(parse_asset_id('48213377'))
+        response = self.client.get(reverse('asset_list'), {'search': '48213377'})
+        self.assertIn(self.asset.pk, [a.pk for a in response.context['assets']])
+
+    def test_prefix_uses_primary_key_range(self):
+        from asset_managment.search import filter_by_asset_id
+        plan = filter_by_asset_id(Asset.objects.all(), parse_asset_id('3fa85f64')).explain()
+        self.assertEqual(full_scans(plan), [], plan)
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import transaction
+from asset_managment.facets import build_counts, get_facets
+
+class AssetFacetTests(TestCase):
+    """
+    Tests for the cached category/status facet counts
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_superuser(username='admin', password='p')
+        self.client.login(username='admin', password='p')
+        self.laptop = Asset.objects.create(name='Laptop', category='Electronics')
+        Asset.objects.create(name='Phone', category='Electronics', status='checked_out')
+        Asset.objects.create(name='Desk', category='Furniture')
+
+    def test_counts(self):
+        facets = get_facets()
+        self.assertEqual(facets.category_counts, [('Electronics', 2), ('Furniture', 1)])
+        self.assertEqual(facets.status_counts, {'operational': 2, 'checked_out': 1})
+
+    def test_cached_read_runs_no_queries(self):
+        get_facets()
+        with self.assertNumQueries(0):
+            get_facets()
+
+    def test_signals_keep_counts_current(self):
+        get_facets()
+        with self.captureOnCommitCallbacks(execute=True):
+            laptop = Asset.objects.get(pk=self.laptop.pk)
+            laptop.category = 'Computers'
+            laptop.status = 'out_for_repairs'
+            laptop.save()
+            Asset.objects.create(name='Chair', category='Furniture')
+            Asset.objects.get(name='Desk').delete()
+
+        with self.assertNumQueries(0):
+            facets = get_facets()
+        self.assertEqual(facets.counts, build_counts())
+
+    def test_rolled_back_save_leaves_counts(self):
+        before = get_facets().counts
+        with self.captureOnCommitCallbacks() as callbacks:
+            with self.assertRaises(ValueError), transaction.atomic():
+                Asset.objects.create(name='Chair', category='Furniture')
+                raise ValueError
+        self.assertEqual(callbacks, [])
+        self.assertEqual(get_facets().counts, before)
+
+    def test_rebuild_command(self):
+        location = tempfile.TemporaryDirectory()
+        self.addCleanup(location.cleanup)
+        with override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': location.name,
+        }}):
+            get_facets()
+            Asset.objects.bulk_create([Asset(name='Bulk', category='Vehicles')])
+            self.assertNotIn('Vehicles', get_facets().categories)
+            call_command('rebuild_facets', stdout=StringIO())
+            self.assertIn('Vehicles', get_facets().categories)
+
+    def test_rebuild_command_refuses_local_memory_cache(self):
+        with self.assertRaisesMessage(CommandError, 'local memory'):
+            call_command('rebuild_facets', stdout=StringIO())
+        # Queuing it is still allowed; the worker checks for itself
+        call_command('rebuild_facets', '--background', stdout=StringIO())
+
+    def test_dropdown_shows_counts(self):
+        response = self.client.get(reverse('asset_list'))
+        self.assertContains(response, 'Electronics (2)')
+        self.assertContains(response, 'Checked Out (1)')
+
+class AssetQueryCountTests(TestCase):
+    """
+    N+1 regression tests: list, detail and edit pages must run the same,
+    small number of queries however large the inventory is.
+    """
+
+    SIZES = (10, 1000, 10000)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_superuser(username='admin', password='p')
+        self.client.login(username='admin', password='p')
+
+    def seed(self, total):
+        owner = User.objects.create_user(username=f'owner{total}')
+        existing = Asset.objects.count()
+        Asset.objects.bulk_create(
+            [Asset(name=f'Asset {i}', assigned_to=owner) for i in range(total - existing)],
+            batch_size=2000,
+        )
+        asset = Asset.objects.first()
+        Attribute.objects.bulk_create(
+            [Attribute(asset=asset, name=f'Attr {i}', value=str(i)) for i in range(total // 100 + 2)]
+        )
+        self.client.get(reverse('asset_list'))  # warm the facet cache
+        return asset
+
+    def test_list_queries(self):
+        for size in self.SIZES:
+            self.seed(size)
+            with self.subTest(assets=size), self.assertNumQueries(4):
+                # session, user, ETag aggregate, one page of assets joined to their assignee
+                self.client.get(reverse('asset_list'))
+
+    def test_detail_queries(self):
+        for size in self.SIZES:
+            asset = self.seed(size)
+            cache.clear()
+            with self.subTest(assets=size), self.assertNumQueries(4):
+                # session, user, asset joined to assignee, prefetched attributes
+                response = self.client.get(reverse('asset_detail', kwargs={'pk': asset.pk}))
+            self.assertContains(response, 'Attr 1')
+            with self.subTest(assets=size, cached=True), self.assertNumQueries(2):
+                # session, user; the asset comes from the detail cache
+                response = self.client.get(reverse('asset_detail', kwargs={'pk': asset.pk}))
+            self.assertContains(response, 'Attr 1')
+
+    def test_update_form_queries(self):
+        for size in self.SIZES:
+            asset = self.seed(size)
+            with self.subTest(assets=size), self.assertNumQueries(6):
+                # session, user, asset, attribute templates, attribute formset, assignee choices
+                self.client.get(reverse('asset_update', kwargs={'pk': asset.pk}))
+
+class AssetLookupOnceTests(TestCase):
+    """
+    Each single-asset request should load the asset row exactly once,
+    including the permission check.
+    """
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='member', password='p')
+        self.client.login(username='member', password='p')
+        self.asset = Asset.objects.create(name='Scanner', assigned_to=self.user)
+        self.other = Asset.objects.create(name='Not Mine')
+
+    def asset_lookups(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        lookups = [
+            q['sql'] for q in queries.captured_queries
+            if q['sql'].startswith('SELECT') and 'FROM "asset_managment_asset"' in q['sql']
+        ]
+        return response, len(lookups)
+
+    def test_single_lookup_per_view(self):
+        for name in ('asset_detail', 'asset_update', 'asset_delete', 'asset_duplicate'):
+            with self.subTest(view=name):
+                response, lookups = self.asset_lookups(reverse(name, kwargs={'pk': self.asset.pk}))
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(lookups, 1)
+
+    def test_function_views_check_access(self):
+        for name in ('asset_duplicate', 'asset_assign'):
+            with self.subTest(view=name):
+                response = self.client.get(reverse(name, kwargs={'pk': self.other.pk}))
+                self.assertEqual(response.status_code, 403)
+
+    def test_assign_post_uses_resolved_asset(self):
+        response = self.client.post(
+            reverse('asset_assign', kwargs={'pk': self.asset.pk}), {'user_id': self.user.pk}
+        )
+        self.assertRedirects(
+            response,
+            reverse('asset_detail', kwargs={'pk': self.asset.pk}),
+            fetch_redirect_response=False,
+        )
+        self.asset.refresh_from_db()
+        self.assertEqual(self.asset.status, 'checked_out')
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from asset_managment.importer import import_assets
+
+class AssetImportTests(TestCase):
+    """
+    Tests for the bulk CSV/JSONL import pipeline
+    """
+
+    def setUp(self):
+        self.client = Client()
+        self.admin = User.objects.create_superuser(username='admin', password='p')
+        self.owner = User.objects.create_user(username='sam', password='p')
+
+    def test_csv_import_with_attributes(self):
+        data = StringIO(
+            'name,category,status,assigned_to,attr:Serial Number,attr:RAM\n'
+            'Laptop A,Electronics,operational,sam,SN1,16\n'
+            'Laptop B,Electronics,checked_out,,SN2,\n'
+        )
+        result = import_assets(data, 'csv', batch_size=1)
+        self.assertEqual((result.created, result.failed), (2, 0))
+        laptop = Asset.objects.get(name='Laptop A')
+        self.assertEqual(laptop.assigned_to, self.owner)
+        self.assertEqual(
+            dict(laptop.attributes_set.values_list('name', 'value')),
+            {'Serial Number': 'SN1', 'RAM': '16'},
+        )
+        self.assertEqual(Asset.objects.get(name='Laptop B').attributes_set.count(), 1)
+
+    def test_bad_rows_are_reported_not_fatal(self):
+        data = StringIO(
+            '{"name": "Good", "attributes": {"Color": "Red"}}\n'
+            '{"name": "", "category": "X"}\n'
+            'not json\n'
+            '{"name": "Bad status", "status": "lost"}\n'
+            '{"name": "Ghost owner", "assigned_to": "nobody"}\n'
+            '{"name": "Also good", "depreciation": "2030-01-01"}\n'
+        )
+        result = import_assets(data, 'jsonl', batch_size=10)
+        self.assertEqual((result.created, result.failed), (2, 4))
+        self.assertEqual([line for line, _ in result.errors], [2, 3, 4, 5])
+        self.assertIn('status', result.errors[2][1])
+        self.assertEqual(Asset.objects.get(name='Good').category, 'General')
+
+    def test_non_string_fields_are_reported_not_fatal(self):
+        data = StringIO(
+            '{"name": "bad", "assigned_to": ["x"]}\n'
+            '{"name": {"first": "Desk"}}\n'
+            '{"name": "Good"}\n'
+        )
+        result = import_assets(data, 'jsonl', batch_size=10)
+        self.assertEqual((result.created, result.failed), (1, 2))
+        self.assertEqual(result.errors[0], (1, {'assigned_to': ['Must be a string.']}))
+        self.assertEqual(result.errors[1], (2, {'name': ['Must be a string.']}))
+
+    def test_batches_use_bulk_inserts(self):
+        rows = ''.join(f'{{"name": "Bulk {i}", "attributes": {{"n": "{i}"}}}}\n' for i in range(200))
+        with CaptureQueriesContext(connection) as queries:
+            import_assets(StringIO(rows), 'jsonl', batch_size=100)
+        inserts = [q for q in queries.captured_queries if q['sql'].startswith('INSERT INTO "asset_managment_')]
+        # One asset, one attribute and one history insert per batch
+        self.assertEqual(len(inserts), 6)
+        self.assertEqual(Attribute.objects.count(), 200)
+
+    def test_imported_assets_are_searchable(self):
+        import_assets(StringIO('name,attr:Serial\nPlotter,XK-99\n'), 'csv')
+        self.client.login(username='admin', password='p')
+        response = self.client.get(reverse('asset_list'), {'search': 'XK'})
+        self.assertEqual([a.name for a in response.context['assets']], ['Plotter'])
+
+    def test_upload_endpoint(self):
+        self.client.login(username='admin', password='p')
+        upload = SimpleUploadedFile('assets.csv', b'name,category\nDrill,Tools\nSaw,Tools\n')
+        response = self.client.post(reverse('asset_import'), {'file': upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['result'].created, 2)
+        self.assertEqual(Asset.objects.filter(category='Tools').count(), 2)
+
+    def test_upload_requires_manager(self):
+        self.client.login(username='sam', password='p')
+        response = self.client.get(reverse('asset_import'))
+        self.assertEqual(response.status_code, 403)
+
+    def test_import_command(self):
+        out = StringIO()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'assets.jsonl')
+            with open(path, 'w') as f:
+                f.write('{"name": "From file"}\n')
+            call_command('import_assets', path, stdout=out)
+        self.assertIn('1 created', out.getvalue())
+        self.assertTrue(Asset.objects.filter(name='From file').exists())
+
+import csv as csv_module
+import json
+from asset_managment import exporter
+from asset_managment.models import AttributeTemplate
+
+class AssetExportTests(TestCase):
+    """
+    Tests for the streaming export of the filtered asset list
+    """
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_superuser(username='admin', password='p')
+        self.client.login(username='admin', password='p')
+        self.laptop = Asset.objects.create(name='Laptop', category='Electronics', assigned_to=self.user)
+        Attribute.objects.create(asset=self.laptop, name='Serial', value='SN1')
+        Attribute.objects.create(asset=self.laptop, name='RAM', value='16')
+        self.desk = Asset.objects.create(name='Desk', category='Furniture')
+        Attribute.objects.create(asset=self.desk, name='Color', value='Oak & Pine')
+
+    def export(self, **params):
+        response = self.client.get(reverse('asset_export'), params)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_csv_pivots_attributes(self):
+        response, body = self.export(format='csv')
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv_module.DictReader(StringIO(body)))
+        self.assertEqual(len(rows), 2)
+        laptop = next(r for r in rows if r['name'] == 'Laptop')
+        self.assertEqual((laptop['Serial'], laptop['RAM'], laptop['Color']), ('SN1', '16', ''))
+        self.assertEqual(laptop['assigned_to'], 'admin')
+
+    def test_header_comes_from_first_chunk_and_templates(self):
+        AttributeTemplate.objects.create(category='Furniture', name='Warranty')
+        body = ''.join(exporter.stream_csv(Asset.objects.order_by('-created_at'), chunk_size=1))
+        header, desk, laptop = list(csv_module.reader(StringIO(body)))
+        # Only the desk is in the first chunk
+        self.assertEqual(header[-3:], ['Color', 'Warranty', 'other_attributes'])
+        self.assertEqual(desk[-3:], ['Oak & Pine', '', ''])
+        self.assertEqual(laptop[-3:], ['', '', 'RAM=16; Serial=SN1'])
+
+    def test_export_uses_list_filters(self):
+        _, body = self.export(format='jsonl', category='Furniture')
+        records = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([r['name'] for r in records], ['Desk'])
+        self.assertEqual(records[0]['attributes'], {'Color': 'Oak & Pine'})
+
+    def test_export_respects_visibility(self):
+        User.objects.create_user(username='member', password='p')
+        self.client.login(username='member', password='p')
+        _, body = self.export(format='jsonl')
+        self.assertEqual(body, '')
+
+    def test_excel_is_escaped_xml(self):
+        from xml.etree import ElementTree
+        _, body = self.export(format='excel')
+        root = ElementTree.fromstring(body.split('\n', 2)[2])
+        cells = [c.text for c in root.iter('{urn:schemas-microsoft-com:office:spreadsheet}Data')]
+        self.assertIn('Oak & Pine', cells)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        with CaptureQueriesContext(connection) as small:
+            self.export(format='csv')
+        Asset.objects.bulk_create([Asset(name=f'Bulk {i}') for i in range(100)])
+        with CaptureQueriesContext(connection) as large:
+            self.export(format='csv')
+        self.assertEqual(len(small), len(large))
+
+    def test_unknown_format_404(self):
+        response = self.client.get(reverse('asset_export'), {'format': 'pdf'})
+        self.assertEqual(response.status_code, 404)
+
+class AssetBulkActionTests(TestCase):
+    """
+    Tests for set-based bulk status/assign/delete operations
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.member = User.objects.create_user(username='member', password='p')
+        self.admin = User.objects.create_superuser(username='admin', password='p')
+        self.mine = [Asset.objects.create(name=f'Mine {i}', assigned_to=self.member) for i in range(3)]
+        self.other = Asset.objects.create(name='Other', category='Furniture')
+        Attribute.objects.create(asset=self.mine[0], name='Serial', value='SN1')
+
+    def bulk(self, data, query=''):
+        return self.client.post(
+            reverse('asset_bulk') + query, data, HTTP_ACCEPT='application/json'
+        )
+
+    def test_status_change_on_selection(self):
+        self.client.login(username='admin', password='p')
+        ids = [str(a.pk) for a in self.mine[:2]]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.bulk({'action': 'status', 'status': 'out_for_repairs', 'asset_ids': ids})
+        writes = [q['sql'] for q in queries.captured_queries if q['sql'].startswith(('UPDATE', 'DELETE', 'INSERT'))]
+        # One UPDATE for the assets and one INSERT for their history rows
+        self.assertEqual(len(writes), 2)
+        self.assertEqual(response.json(), {'action': 'status', 'affected': 2})
+        self.assertEqual(Asset.objects.filter(status='out_for_repairs').count(), 2)
+
+    def test_whole_filter_result(self):
+        self.client.login(username='admin', password='p')
+        response = self.bulk({'action': 'unassign', 'scope': 'all'}, '?category=General')
+        self.assertEqual(response.json()['affected'], 3)
+        self.assertFalse(Asset.objects.filter(assigned_to__isnull=False).exists())
+
+    def test_access_is_enforced_in_sql(self):
+        self.client.login(username='member', password='p')
+        ids = [str(self.other.pk), str(self.mine[0].pk)]
+        response = self.bulk({'action': 'status', 'status': 'depricated', 'asset_ids': ids})
+        self.assertEqual(response.json()['affected'], 1)
+        self.other.refresh_from_db()
+        self.assertEqual(self.other.status, 'operational')
+
+    def test_assign_bumps_updated_at(self):
+        self.client.login(username='admin', password='p')
+        before = self.other.updated_at
+        response = self.bulk({'action': 'assign', 'assigned_to': 'member', 'asset_ids': [str(self.other.pk)]})
+        self.assertEqual(response.json()['affected'], 1)
+        self.other.refresh_from_db()
+        self.assertEqual((self.other.assigned_to, self.other.status), (self.member, 'checked_out'))
+        self.assertGreater(self.other.updated_at, before)
+
+    def test_delete_removes_attributes_and_search_rows(self):
+        self.client.login(username='admin', password='p')
+        response = self.bulk({'action': 'delete', 'scope': 'all'}, '?search=Mine')
+        self.assertEqual(response.json()['affected'], 3)
+        self.assertEqual(list(Asset.objects.all()), [self.other])
+        self.assertFalse(Attribute.objects.exists())
+        listing = self.client.get(reverse('asset_list'), {'search': 'Mine'})
+        self.assertEqual(len(listing.context['assets']), 0)
+
+    def test_delete_through_attribute_filter(self):
+        self.client.login(username='admin', password='p')
+        Attribute.objects.create(asset=self.mine[1], name='RAM', value='16')
+        Attribute.objects.create(asset=self.other, name='RAM', value='8')
+        response = self.bulk({'action': 'delete', 'scope': 'all'}, '?attr.ram__gte=16')
+        self.assertEqual(response.json()['affected'], 1)
+        self.assertFalse(Asset.objects.filter(pk=self.mine[1].pk).exists())
+        self.assertEqual(Attribute.objects.filter(asset=self.other).count(), 1)
+        self.assertEqual(
+            AssetHistory.objects.filter(action='deleted').values_list('asset_id', flat=True).get(),
+            self.mine[1].pk,
+        )
+
+    def test_invalid_requests(self):
+        self.client.login(username='admin', password='p')
+        self.assertEqual(self.bulk({'action': 'status', 'asset_ids': [str(self.other.pk)]}).status_code, 400)
+        self.assertEqual(self.bulk({'action': 'delete'}).status_code, 400)
+        self.assertEqual(self.bulk({'action': 'assign', 'assigned_to': 'ghost', 'scope': 'all'}).status_code, 400)
+
+    def test_html_form_redirects_back_with_message(self):
+        self.client.login(username='admin', password='p')
+        response = self.client.post(
+            reverse('asset_bulk') + '?status=operational',
+            {'action': 'status', 'status': 'checked_out', 'scope': 'all'},
+            follow=True,
+        )
+        self.assertRedirects(response, reverse('asset_list') + '?status=operational')
+        self.assertContains(response, '4 assets updated.')
+
+import math
+from asset_managment.duplication import copy_name, duplicate_asset
+
+class AssetDuplicationTests(TestCase):
+    """
+    Tests for set-based asset duplication (Epic 1, Story 6)
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_superuser(username='admin', password='p')
+        self.client.login(username='admin', password='p')
+        self.original = Asset.objects.create(name='Laptop', category='Electronics', assigned_to=self.user)
+        Attribute.objects.create(asset=self.original, name='RAM', value='16')
+        Attribute.objects.create(asset=self.original, name='CPU', value='i7')
+
+    def test_copy_name(self):
+        self.assertEqual(copy_name('Laptop #{n}', 3, 5), 'Laptop #3')
+        self.assertEqual(copy_name('Laptop', 2, 5), 'Laptop #2')
+        self.assertEqual(copy_name('Laptop (Copy)', 1, 1), 'Laptop (Copy)')
+
+    def test_copies_attributes_and_leaves_unassigned(self):
+        copies = duplicate_asset(self.original, copies=3, name='Laptop #{n}')
+        self.assertEqual([c.name for c in copies], ['Laptop #1', 'Laptop #2', 'Laptop #3'])
+        for copy in copies:
+            copy = Asset.objects.get(pk=copy.pk)
+            self.assertIsNone(copy.assigned_to)
+            self.assertEqual(copy.category, 'Electronics')
+            self.assertEqual(
+                sorted(copy.attributes_set.values_list('name', 'value')),
+                [('CPU', 'i7'), ('RAM', '16')],
+            )
+
+    def test_query_count_is_constant(self):
+        with CaptureQueriesContext(connection) as small:
+            duplicate_asset(self.original, copies=1)
+        Attribute.objects.bulk_create(
+            [Attribute(asset=self.original, name=f'Extra {i}', value=str(i)) for i in range(9)]
+        )
+        # 20 copies x 12 attributes runs the same statements, except that the
+        # attribute INSERT is split into the backend's bulk_create batches
+        rows = 20 * 12
+        batch = connection.ops.bulk_batch_size(Attribute._meta.concrete_fields, [None] * rows)
+        with CaptureQueriesContext(connection) as large:
+            duplicate_asset(self.original, copies=20, extra_attributes=[('Batch', 'B7')])
+        self.assertEqual(len(large), len(small) + math.ceil(rows / batch) - 1)
+        self.assertEqual(Attribute.objects.filter(name='Batch').count(), 20)
+
+    def test_duplicate_view_many_copies(self):
+        response = self.client.post(
+            reverse('asset_duplicate', kwargs={'pk': self.original.pk}),
+            {
+                'name': 'Dock #{n}',
+                'category': 'Electronics',
+                'status': 'operational',
+                'copies': 4,
+                'attributes_set-TOTAL_FORMS': '1',
+                'attributes_set-INITIAL_FORMS': '0',
+                'attributes_set-0-name': 'Color',
+                'attributes_set-0-value': 'Black',
+            },
+        )
+        self.assertRedirects(response, reverse('asset_list'), fetch_redirect_response=False)
+        docks = Asset.objects.filter(name__startswith='Dock #')
+        self.assertEqual(docks.count(), 4)
+        self.assertEqual(Attribute.objects.filter(asset__in=docks).count(), 12)
+
+    def test_duplicate_view_single_copy_redirects_to_it(self):
+        response = self.client.post(
+            reverse('asset_duplicate', kwargs={'pk': self.original.pk}),
+            {
+                'name': 'Laptop (Copy)',
+                'category': 'Electronics',
+                'status': 'operational',
+                'copies': 1,
+                'attributes_set-TOTAL_FORMS': '0',
+                'attributes_set-INITIAL_FORMS': '0',
+            },
+        )
+        copy = Asset.objects.get(name='Laptop (Copy)')
+        self.assertRedirects(response, reverse('asset_detail', kwargs={'pk': copy.pk}), fetch_redirect_response=False)
+        self.assertEqual(copy.attributes_set.count(), 2)
+
+
+from asset_managment.audit import audit_user
+from asset_managment.bulk import apply_bulk_action
+from asset_managment.models import AssetHistory
+
+class AssetHistoryTests(TestCase):
+    """
+    Tests for the append-only asset change history
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_superuser(username='admin', password='p')
+        with audit_user(self.user):
+            self.asset = Asset.objects.create(name='Laptop', category='Electronics')
+
+    def test_create_is_logged_with_user(self):
+        entry = AssetHistory.objects.for_asset(self.asset.pk).get()
+        self.assertEqual(entry.action, 'created')
+        self.assertEqual(entry.user, self.user)
+        self.assertEqual(entry.changes['name'], [None, 'Laptop'])
+        self.assertNotIn('updated_at', entry.changes)
+
+    def test_update_stores_only_changed_fields(self):
+        asset = Asset.objects.get(pk=self.asset.pk)
+        asset.status = 'out_for_repairs'
+        with CaptureQueriesContext(connection) as queries:
+            asset.save()
+        history = [q for q in queries.captured_queries if 'asset_managment_assethistory' in q['sql']]
+        self.assertEqual(len(history), 1)
+        entry = AssetHistory.objects.for_asset(asset.pk).first()
+        self.assertEqual(entry.changes, {'status': ['operational', 'out_for_repairs']})
+        self.assertIsNone(entry.user)
+
+        asset.save()
+        self.assertEqual(AssetHistory.objects.for_asset(asset.pk).count(), 2)
+
+    def test_edit_view_records_request_user(self):
+        self.client.login(username='admin', password='p')
+        self.client.post(reverse('asset_update', kwargs={'pk': self.asset.pk}), {
+            'name': 'Laptop Pro', 'category': 'Electronics', 'status': 'operational',
+            'attributes_set-TOTAL_FORMS': '1', 'attributes_set-INITIAL_FORMS': '0',
+            'attributes_set-0-name': 'RAM', 'attributes_set-0-value': '32',
+        })
+        entries = list(AssetHistory.objects.by_user(self.user).filter(action='updated'))
+        self.assertEqual(entries[0].changes['name'], ['Laptop', 'Laptop Pro'])
+        attribute = AssetHistory.objects.get(attribute_id__isnull=False)
+        self.assertEqual(attribute.asset_id, self.asset.pk)
+        self.assertEqual(attribute.user, self.user)
+
+    def test_history_survives_delete(self):
+        pk = self.asset.pk
+        self.asset.delete()
+        actions = list(AssetHistory.objects.for_asset(pk).values_list('action', flat=True))
+        self.assertEqual(actions, ['deleted', 'created'])
+
+    def test_bulk_actions_log_one_row_per_changed_asset(self):
+        other = Asset.objects.create(name='Chair', status='out_for_repairs')
+        apply_bulk_action(Asset.objects.all(), 'status', status='out_for_repairs')
+        updates = AssetHistory.objects.filter(action='updated')
+        self.assertEqual([e.asset_id for e in updates], [self.asset.pk])
+        apply_bulk_action(Asset.objects.all(), 'delete')
+        self.assertEqual(AssetHistory.objects.filter(action='deleted').count(), 2)
+        self.assertEqual(AssetHistory.objects.for_asset(other.pk).count(), 2)
+
+    def test_duplicates_fold_attributes_into_created_row(self):
+        Attribute.objects.create(asset=self.asset, name='RAM', value='16')
+        copies = duplicate_asset(self.asset, copies=2)
+        entry = AssetHistory.objects.for_asset(copies[1].pk).get()
+        self.assertEqual(entry.changes['attributes'], [None, [['RAM', '16']]])
+
+    def test_history_page(self):
+        self.client.login(username='admin', password='p')
+        response = self.client.get(reverse('asset_history', kwargs={'pk': self.asset.pk}))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Asset created')
+
+    def test_prune_and_compact(self):
+        asset = Asset.objects.get(pk=self.asset.pk)
+        for status in ('out_for_repairs', 'checked_out', 'operational', 'depricated'):
+            asset.status = status
+            asset.save()
+        AssetHistory.objects.update(created_at=timezone.now() - timedelta(days=100))
+
+        call_command('prune_asset_history', '--older-than-days', '30', '--compact', stdout=StringIO())
+        updates = AssetHistory.objects.filter(action='updated')
+        self.assertEqual([e.changes for e in updates], [{'status': ['operational', 'depricated']}])
+
+        call_command('prune_asset_history', '--older-than-days', '30', stdout=StringIO())
+        self.assertFalse(AssetHistory.objects.exists())
+
+    def test_compact_in_asset_batches(self):
+        assets = [self.asset] + [Asset.objects.create(name=f'Spare {i}') for i in range(2)]
+        for asset in assets:
+            asset = Asset.objects.get(pk=asset.pk)
+            for status in ('out_for_repairs', 'checked_out'):
+                asset.status = status
+                asset.save()
+        AssetHistory.objects.update(created_at=timezone.now() - timedelta(days=100))
+
+        out = StringIO()
+        call_command(
+            'prune_asset_history', '--older-than-days', '30', '--compact', '--batch-size', '1', stdout=out
+        )
+        self.assertIn('Compacted 3 histories, removing 3 entries.', out.getvalue())
+        for asset in assets:
+            self.assertEqual(
+                [e.changes for e in AssetHistory.objects.filter(asset_id=asset.pk, action='updated')],
+                [{'status': ['operational', 'checked_out']}],
+            )
+
+
+from asset_managment import detail_cache
+
+class AssetDetailCacheTests(TestCase):
+    """
+    Tests for the read-through asset detail cache
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_superuser(username='admin', password='p')
+        self.client.login(username='admin', password='p')
+        self.asset = Asset.objects.create(name='Projector', assigned_to=self.user)
+        self.attribute = Attribute.objects.create(asset=self.asset, name='Lumens', value='3000')
+        detail_cache.reset_stats()
+
+    def detail(self):
+        return self.client.get(reverse('asset_detail', kwargs={'pk': self.asset.pk}))
+
+    def test_hit_renders_same_page(self):
+        first = self.detail()
+        second = self.detail()
+        self.assertEqual(first.content, second.content)
+        self.assertContains(second, 'admin')
+        self.assertEqual(detail_cache.stats(), {'hits': 1, 'misses': 1, 'invalidations': 0})
+
+    def test_saves_invalidate(self):
+        self.detail()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.attribute.value = '4000'
+            self.attribute.save()
+        self.assertContains(self.detail(), '4000')
+        asset = Asset.objects.get(pk=self.asset.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            asset.name = 'Beamer'
+            asset.save()
+        self.assertContains(self.detail(), 'Beamer')
+        self.assertEqual(detail_cache.stats()['misses'], 3)
+
+    def test_bulk_paths_invalidate(self):
+        self.detail()
+        with self.captureOnCommitCallbacks(execute=True):
+            apply_bulk_action(Asset.objects.all(), 'status', status='out_for_repairs')
+        self.assertContains(self.detail(), 'Out for Repairs')
+        with self.captureOnCommitCallbacks(execute=True):
+            apply_bulk_action(Asset.objects.all(), 'delete')
+        self.assertEqual(self.detail().status_code, 404)
+        self.assertEqual(detail_cache.stats()['invalidations'], 2)
+
+    def test_invalidation_waits_for_commit(self):
+        self.detail()
+        key = detail_cache.detail_key(self.asset.pk)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.asset.name = 'Beamer'
+            self.asset.save()
+        # Still cached until the commit; dropped earlier, a miss could re-read the old row
+        self.assertIsNotNone(detail_cache.get_cache().get(key))
+        for callback in callbacks:
+            callback()
+        self.assertIsNone(detail_cache.get_cache().get(key))
+
+    def test_access_still_checked_on_hit(self):
+        self.detail()
+        User.objects.create_user(username='member', password='p')
+        self.client.login(username='member', password='p')
+        self.assertEqual(self.detail().status_code, 403)
+
+    def test_stats_endpoint(self):
+        self.detail()
+        response = self.client.get(reverse('asset_cache_stats'))
+        self.assertEqual(response.json()['detail_cache']['misses'], 1)
+
+
+class AssetConditionalGetTests(TestCase):
+    """
+    Tests for ETag / Last-Modified on the asset list and detail pages
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_superuser(username='admin', password='p')
+        self.client.login(username='admin', password='p')
+        self.asset = Asset.objects.create(name='Router', category='Network')
+        self.attribute = Attribute.objects.create(asset=self.asset, name='Ports', value='8')
+
+    def revalidate(self, url, response, **params):
+        return self.client.get(url, params, HTTP_IF_NONE_MATCH=response['ETag'])
+
+    def test_detail_not_modified(self):
+        url = reverse('asset_detail', kwargs={'pk': self.asset.pk})
+        first = self.client.get(url)
+        self.assertIn('Last-Modified', first)
+        with self.assertNumQueries(2):
+            # session, user; the asset itself comes from the detail cache
+            second = self.revalidate(url, first)
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+        modified_since = self.client.get(url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(modified_since.status_code, 304)
+
+    def test_attribute_edit_bumps_asset(self):
+        url = reverse('asset_detail', kwargs={'pk': self.asset.pk})
+        first = self.client.get(url)
+        before = Asset.objects.get(pk=self.asset.pk).updated_at
+        with self.captureOnCommitCallbacks(execute=True):
+            self.attribute.value = '16'
+            self.attribute.save()
+        self.assertGreater(Asset.objects.get(pk=self.asset.pk).updated_at, before)
+        self.assertEqual(self.revalidate(url, first).status_code, 200)
+
+    def test_list_not_modified_until_filter_changes(self):
+        url = reverse('asset_list')
+        first = self.client.get(url, {'category': 'Network'})
+        self.assertEqual(self.revalidate(url, first, category='Network').status_code, 304)
+        self.assertEqual(self.revalidate(url, first, category='Other').status_code, 200)
+
+        Asset.objects.create(name='Switch', category='Network')
+        self.assertEqual(self.revalidate(url, first, category='Network').status_code, 200)
+
+    def test_list_delete_changes_etag(self):
+        url = reverse('asset_list')
+        Asset.objects.create(name='Old Router', category='Network')
+        first = self.client.get(url)
+        Asset.objects.filter(name='Old Router').delete()
+        self.assertEqual(self.revalidate(url, first).status_code, 200)
+
+    def test_list_delete_with_if_modified_since_only(self):
+        url = reverse('asset_list')
+        Asset.objects.create(name='Old Router', category='Network')
+        first = self.client.get(url)
+        self.assertNotIn('Last-Modified', first)
+        Asset.objects.filter(name='Old Router').delete()
+        since = 'Fri, 01 Jan 2100 00:00:00 GMT'
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=since).status_code, 200)
+
+
+class AssetApiTests(TestCase):
+    """
+    Tests for the read-only JSON API
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.member = User.objects.create_user(username='member', password='p')
+        self.admin = User.objects.create_superuser(username='admin', password='p')
+        Asset.objects.bulk_create([
+            Asset(name=f'Laptop {i}', category='Electronics', assigned_to=self.member)
+            for i in range(5)
+        ])
+        self.assets = list(Asset.objects.order_by('-created_at', '-id'))
+        Attribute.objects.bulk_create([
+            Attribute(asset=asset, name='RAM', value='16') for asset in self.assets
+        ])
+        self.other = Asset.objects.create(name='Desk', category='Furniture')
+        self.client.login(username='admin', password='p')
+
+    def api(self, **params):
+        return self.client.get(reverse('api_asset_list'), params)
+
+    def test_sparse_fields(self):
+        data = self.api(fields='name,assigned_to', category='Electronics').json()
+        self.assertEqual(set(data['results'][0]), {'id', 'name', 'assigned_to'})
+        self.assertEqual(data['results'][0]['assigned_to'], 'member')
+
+    def test_include_attributes_is_one_query(self):
+        self.api()  # warm the facet cache
+        with self.assertNumQueries(5):
+            # session, user, ETag aggregate, page rows, attributes
+            data = self.api(include='attributes', category='Electronics').json()
+        self.assertEqual(data['results'][0]['attributes'], [{'name': 'RAM', 'value': '16'}])
+
+    def test_batched_ids(self):
+        missing = uuid.uuid4()
+        ids = ','.join(str(pk) for pk in (self.assets[0].pk, self.other.pk, missing))
+        self.api()  # warm the facet cache
+        with CaptureQueriesContext(connection) as queries:
+            data = self.api(ids=ids, fields='name').json()
+        asset_reads = [q for q in queries.captured_queries if 'FROM "asset_managment_asset"' in q['sql']]
+        self.assertEqual(len(asset_reads), 2)  # ETag aggregate and the rows
+        self.assertEqual({r['name'] for r in data['results']}, {self.assets[0].name, 'Desk'})
+        self.assertEqual(data['not_found'], [str(missing)])
+
+    def test_cursor_pagination(self):
+        names = [a.name for a in self.assets]
+        first = self.api(limit=2, category='Electronics').json()
+        self.assertEqual([r['name'] for r in first['results']], names[:2])
+        second = self.client.get(reverse('api_asset_list') + first['next']).json()
+        self.assertEqual([r['name'] for r in second['results']], names[2:4])
+
+    def test_visibility_and_errors(self):
+        self.client.login(username='member', password='p')
+        self.assertEqual(len(self.api().json()['results']), 5)
+        detail = self.client.get(reverse('api_asset_detail', kwargs={'pk': self.other.pk}))
+        self.assertEqual(detail.status_code, 403)
+        self.assertEqual(self.api(fields='secret').status_code, 400)
+        self.assertEqual(self.api(after='garbage').status_code, 400)
+        self.client.logout()
+        self.assertEqual(self.api().status_code, 403)
+
+    def test_detail(self):
+        response = self.client.get(
+            reverse('api_asset_detail', kwargs={'pk': self.assets[0].pk}),
+            {'fields': 'name', 'include': 'attributes'},
+        )
+        self.assertEqual(response.json()['attributes'], [{'name': 'RAM', 'value': '16'}])
+
+
+import re
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient, Client
+from asset_managment.pagination import KeysetPaginator
+
+class AssetAsyncViewTests(TestCase):
+    """
+    Tests for the async list, detail and API read paths
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.member = User.objects.create_user(username='member', password='p')
+        self.admin = User.objects.create_superuser(username='admin', password='p')
+        self.asset = Asset.objects.create(name='Camera', category='Media', assigned_to=self.member)
+        Attribute.objects.create(asset=self.asset, name='Lens', value='50mm')
+        self.other = Asset.objects.create(name='Tripod', category='Media')
+        self.client = AsyncClient()
+
+    async def test_list_matches_sync_view(self):
+        await sync_to_async(self.client.force_login)(self.admin)
+        response = await self.client.get(reverse('asset_list_async'), {'category': 'Media'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([a.name for a in response.context['assets']], ['Tripod', 'Camera'])
+        self.assertEqual(response.context['category_counts'], [('Media', 2)])
+
+    async def test_member_visibility(self):
+        await sync_to_async(self.client.force_login)(self.member)
+        response = await self.client.get(reverse('asset_list_async'))
+        self.assertEqual([a.name for a in response.context['assets']], ['Camera'])
+        forbidden = await self.client.get(reverse('asset_detail_async', kwargs={'pk': self.other.pk}))
+        self.assertEqual(forbidden.status_code, 403)
+
+    async def test_detail_and_conditional_get(self):
+        await sync_to_async(self.client.force_login)(self.member)
+        url = reverse('asset_detail_async', kwargs={'pk': self.asset.pk})
+        response = await self.client.get(url)
+        self.assertContains(response, '50mm')
+        again = await self.client.get(url, headers={'if-none-match': response['ETag']})
+        self.assertEqual(again.status_code, 304)
+        missing = await self.client.get(reverse('asset_detail_async', kwargs={'pk': uuid.uuid4()}))
+        self.assertEqual(missing.status_code, 404)
+
+    async def test_api(self):
+        await sync_to_async(self.client.force_login)(self.admin)
+        response = await self.client.get(
+            reverse('api_asset_list_async'), {'fields': 'name', 'include': 'attributes', 'limit': 1}
+        )
+        data = response.json()
+        self.assertEqual(data['results'], [{'id': str(self.other.pk), 'name': 'Tripod', 'attributes': []}])
+        self.assertIsNotNone(data['next'])
+
+    async def test_anonymous(self):
+        response = await self.client.get(reverse('asset_list_async'))
+        self.assertEqual(response.status_code, 302)
+        response = await self.client.get(reverse('api_asset_list_async'))
+        self.assertEqual(response.status_code, 403)
+
+    async def both(self, params, **headers):
+        """The same query on the sync and async list views."""
+        sync_client = Client()
+        await sync_to_async(sync_client.force_login)(self.admin)
+        await sync_to_async(self.client.force_login)(self.admin)
+        sync = await sync_to_async(sync_client.get)(reverse('asset_list'), params, headers=headers)
+        response = await self.client.get(reverse('asset_list_async'), params, headers=headers)
+        return sync, response
+
+    async def test_list_conditional_get_matches_sync_view(self):
+        params = {'category': 'Media'}
+        sync, response = await self.both(params)
+        self.assertEqual(response['ETag'], sync['ETag'])
+        sync, response = await self.both(params, if_none_match=sync['ETag'])
+        self.assertEqual((sync.status_code, response.status_code), (304, 304))
+
+        await Asset.objects.acreate(name='Light', category='Media')
+        sync, response = await self.both(params, if_none_match=response['ETag'])
+        self.assertEqual((sync.status_code, response.status_code), (200, 200))
+
+    async def test_list_relevance_sort_matches_sync_view(self):
+        if not isinstance(get_search_backend(), SQLiteFTSBackend):
+            self.skipTest('FTS5 ranking is SQLite only')
+        await Attribute.objects.acreate(asset=self.other, name='Notes', value='Holds a camera')
+        newest = await self.both({'search': 'camera'})
+        self.assertEqual([[a.name for a in r.context['assets']] for r in newest], [['Tripod', 'Camera']] * 2)
+        ranked = await self.both({'search': 'camera', 'sort': 'relevance'})
+        self.assertEqual([[a.name for a in r.context['assets']] for r in ranked], [['Camera', 'Tripod']] * 2)
+        self.assertNotIn('next_url', ranked[1].context)
+
+    async def test_list_stream_matches_sync_view(self):
+        sync, response = await self.both({'stream': '1'})
+        self.assertTrue(response.streaming)
+        body = b''.join([chunk async for chunk in response.streaming_content])
+        sync_body = await sync_to_async(b''.join)(sync.streaming_content)
+        # Same page apart from the per-request CSRF token
+        token = re.compile(rb'name="csrfmiddlewaretoken" value="[^"]*"')
+        self.assertEqual(token.sub(b'', body), token.sub(b'', sync_body))
+        self.assertIn(b'Tripod', body)
+        self.assertEqual(response['ETag'], sync['ETag'])
+
+    async def test_async_page_matches_sync_page(self):
+        queryset = Asset.objects.order_by('-created_at', '-id')
+        paginator = KeysetPaginator(queryset, 1)
+        page = await paginator.apage()
+        sync_page = await sync_to_async(paginator.page)()
+        self.assertEqual(page.object_list, sync_page.object_list)
+        self.assertTrue(page.has_next())
+
+
+from datetime import date
+from decimal import Decimal
+from asset_managment.attribute_types import attribute_key, infer_value
+
+class TypedAttributeTests(TestCase):
+    """
+    Tests for typed attribute values and ?attr.* list filters
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_superuser(username='admin', password='p')
+        self.client.login(username='admin', password='p')
+        self.small = Asset.objects.create(name='Small Laptop')
+        self.big = Asset.objects.create(name='Big Laptop')
+        self.chair = Asset.objects.create(name='Chair')
+        for asset, ram, warranty, leased in (
+            (self.small, '8', '2025-06-30', 'no'),
+            (self.big, '32', '2027-01-15', 'yes'),
+        ):
+            Attribute.objects.create(asset=asset, name='RAM', value=ram)
+            Attribute.objects.create(asset=asset, name='Warranty Expires', value=warranty)
+            Attribute.objects.create(asset=asset, name='Leased', value=leased)
+        Attribute.objects.create(asset=self.chair, name='RAM', value='15.5')
+        Attribute.objects.create(asset=self.chair, name='Serial Number', value='00123')
+
+    def names(self, **params):
+        response = self.client.get(reverse('asset_list'), params)
+        return sorted(a.name for a in response.context['assets'])
+
+    def test_infer_value(self):
+        self.assertEqual(infer_value('16'), ('int', 16))
+        self.assertEqual(infer_value('15.50'), ('decimal', Decimal('15.50')))
+        self.assertEqual(infer_value('2026-02-28'), ('date', date(2026, 2, 28)))
+        self.assertEqual(infer_value('Yes'), ('bool', True))
+        self.assertEqual(infer_value('00123'), ('text', None))
+        self.assertEqual(infer_value('2026-02-30'), ('text', None))
+        self.assertEqual(attribute_key(' Serial Number '), 'serial_number')
+
+    def test_typed_columns_are_stored(self):
+        ram = Attribute.objects.get(asset=self.big, name='RAM')
+        self.assertEqual((ram.key, ram.value_type, ram.number_value), ('ram', 'int', 32))
+        ram.value = 'lots'
+        ram.save()
+        ram.refresh_from_db()
+        self.assertEqual((ram.value_type, ram.number_value), ('text', None))
+
+    def test_numeric_filters_mix_int_and_decimal(self):
+        self.assertEqual(self.names(**{'attr.ram__gte': '16'}), ['Big Laptop'])
+        self.assertEqual(self.names(**{'attr.ram__gt': '8'}), ['Big Laptop', 'Chair'])
+        self.assertEqual(self.names(**{'attr.ram': '8'}), ['Small Laptop'])
+
+    def test_date_bool_and_text_filters(self):
+        self.assertEqual(self.names(**{'attr.warranty_expires__lt': '2026-01-01'}), ['Small Laptop'])
+        self.assertEqual(self.names(**{'attr.leased': 'yes'}), ['Big Laptop'])
+        self.assertEqual(self.names(**{'attr.serial_number': '00123'}), ['Chair'])
+        self.assertEqual(
+            self.names(**{'attr.ram__gte': '8', 'attr.leased': 'no'}), ['Small Laptop']
+        )
+
+    def test_filter_runs_in_sql(self):
+        self.client.get(reverse('asset_list'))  # warm the facet cache
+        with CaptureQueriesContext(connection) as queries:
+            self.names(**{'attr.ram__gte': '16'})
+        page_query = queries.captured_queries[-1]['sql']
+        self.assertIn('EXISTS', page_query)
+        # No attribute rows are read on their own
+        self.assertFalse(any(
+            q['sql'].startswith('SELECT "asset_managment_attribute"') for q in queries.captured_queries
+        ))
+
+    def test_invalid_filters(self):
+        response = self.client.get(reverse('asset_list'), {'attr.ram__between': '1'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(reverse('api_asset_list'), {'attr.leased__gt': 'yes'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('attributes', response.json()['errors'])
+
+    def test_bulk_writers_fill_typed_columns(self):
+        copy = duplicate_asset(self.big)[0]
+        self.assertEqual(Attribute.objects.get(asset=copy, key='ram').number_value, 32)
+        import_assets(StringIO('name,attr:RAM\nServer,64\n'), 'csv')
+        self.assertEqual(self.names(**{'attr.ram__gte': '64'}), ['Server'])
+
+
+from asset_managment.attribute_templates import apply_templates
+from asset_managment.models import AttributeTemplate
+
+class AttributeTemplateTests(TestCase):
+    """
+    Tests for per-category attribute templates
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_superuser(username='admin', password='p')
+        self.client.login(username='admin', password='p')
+        AttributeTemplate.objects.create(
+            category='Laptop', name='Serial Number', required=True, position=1
+        )
+        AttributeTemplate.objects.create(
+            category='Laptop', name='RAM', value_type='int', default_value='16', position=2
+        )
+
+    def post_asset(self, attributes, url=None, **fields):
+        data = {
+            'name': 'New Laptop', 'category': 'Laptop', 'status': 'operational',
+            'attributes_set-TOTAL_FORMS': str(len(attributes)),
+            'attributes_set-INITIAL_FORMS': '0',
+        }
+        data.update(fields)
+        for n, (name, value) in enumerate(attributes):
+            data[f'attributes_set-{n}-name'] = name
+            data[f'attributes_set-{n}-value'] = value
+        return self.client.post(url or reverse('asset_create'), data)
+
+    def test_create_form_is_prefilled(self):
+        response = self.client.get(reverse('asset_create'), {'category': 'Laptop'})
+        formset = response.context['formset']
+        self.assertEqual(
+            [form.initial for form in formset.forms],
+            [{'name': 'Serial Number', 'value': ''}, {'name': 'RAM', 'value': '16'}],
+        )
+
+    def test_names_are_normalised_and_values_typed(self):
+        response = self.post_asset([('serial number', 'SN-1'), ('ram', '32')])
+        self.assertEqual(response.status_code, 302)
+        asset = Asset.objects.get(name='New Laptop')
+        self.assertEqual(
+            sorted(asset.attributes_set.values_list('name', 'number_value')),
+            [('RAM', 32), ('Serial Number', None)],
+        )
+
+    def test_required_and_type_errors(self):
+        response = self.post_asset([('RAM', 'lots')])
+        self.assertEqual(response.status_code, 200)
+        formset = response.context['formset']
+        self.assertIn('Serial Number', str(formset.non_form_errors()))
+        self.assertIn('integer', str(formset.forms[0].errors['value']))
+        self.assertFalse(Asset.objects.filter(name='New Laptop').exists())
+
+    def test_untouched_default_is_saved(self):
+        # The RAM row is submitted exactly as it was pre-filled
+        self.post_asset([('Serial Number', 'SN-2'), ('RAM', '16')])
+        asset = Asset.objects.get(name='New Laptop')
+        self.assertEqual(asset.attributes_set.get(key='ram').value, '16')
+
+    def test_other_categories_are_unaffected(self):
+        response = self.post_asset([('Colour', 'Oak')], category='Furniture')
+        self.assertEqual(response.status_code, 302)
+
+    def test_apply_to_existing_assets(self):
+        done = Asset.objects.create(name='Done', category='Laptop')
+        Attribute.objects.create(asset=done, name='ram', value='8')
+        Attribute.objects.create(asset=done, name='Serial Number', value='SN-3')
+        partial = Asset.objects.create(name='Partial', category='Laptop')
+        Attribute.objects.create(asset=partial, name='RAM', value='4')
+        bare = Asset.objects.create(name='Bare', category='Laptop')
+        desk = Asset.objects.create(name='Desk', category='Furniture')
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(apply_templates('Laptop'), 1)
+        inserts = [q for q in queries.captured_queries
+                   if q['sql'].startswith('INSERT INTO "asset_managment_attribute"')]
+        self.assertEqual(len(inserts), 1)
+
+        self.assertEqual(
+            sorted(bare.attributes_set.values_list('name', 'value', 'number_value')),
+            [('RAM', '16', 16)],
+        )
+        self.assertEqual(partial.attributes_set.get(key='ram').value, '4')
+        # Serial Number has no default, so nothing is filled in for it
+        self.assertEqual(partial.attributes_set.count(), 1)
+        self.assertEqual(done.attributes_set.count(), 2)
+        self.assertFalse(desk.attributes_set.exists())
+        self.assertEqual(
+            AssetHistory.objects.filter(asset_id=bare.pk, action='updated').get().changes,
+            {'attributes': [None, [['RAM', '16']]]},
+        )
+        # Applying again finds nothing to add
+        self.assertEqual(apply_templates('Laptop'), 0)
+        self.assertEqual(self.names_with(**{'attr.ram__gte': '16'}), ['Bare'])
+
+    def test_apply_skips_unusable_defaults_and_uses_template_type(self):
+        AttributeTemplate.objects.create(category='Laptop', name='Ports', value_type='int', required=True)
+        AttributeTemplate.objects.create(
+            category='Laptop', name='Weight', value_type='decimal', default_value='2'
+        )
+        bare = Asset.objects.create(name='Bare', category='Laptop')
+        self.assertEqual(apply_templates('Laptop'), 1)
+        self.assertEqual(
+            sorted(bare.attributes_set.values_list('key', 'value_type', 'number_value')),
+            [('ram', 'int', 16), ('weight', 'decimal', 2)],
+        )
+
+    def names_with(self, **params):
+        response = self.client.get(reverse('asset_list'), params)
+        return sorted(a.name for a in response.context['assets'])
+
+    def test_manage_templates_page(self):
+        Asset.objects.create(name='Bare', category='Laptop')
+        url = reverse('attribute_template_edit', kwargs={'category': 'Laptop'})
+        response = self.client.get(url)
+        self.assertEqual(len(response.context['formset'].forms), 3)
+        response = self.client.post(url, {'apply': '1'})
+        self.assertRedirects(response, url)
+        self.assertEqual(Attribute.objects.filter(asset__name='Bare').count(), 1)
+
+        data = {'form-TOTAL_FORMS': '1', 'form-INITIAL_FORMS': '0',
+                'form-0-name': 'Warranty', 'form-0-value_type': 'date',
+                'form-0-default_value': 'soon', 'form-0-position': '3'}
+        response = self.client.post(url, data)
+        self.assertIn('default_value', response.context['formset'].forms[0].errors)
+        data['form-0-default_value'] = '2030-01-01'
+        self.client.post(url, data)
+        self.assertEqual(AttributeTemplate.objects.get(name='Warranty').key, 'warranty')
+
+    def test_category_with_slash(self):
+        Asset.objects.create(name='Switch', category='IT/Networking')
+        response = self.client.get(reverse('attribute_template_list'))
+        self.assertEqual(response.status_code, 200)
+        url = reverse('attribute_template_edit', kwargs={'category': 'IT/Networking'})
+        self.assertContains(response, url)
+        response = self.client.get(url)
+        self.assertEqual(response.context['category'], 'IT/Networking')
+
+    def test_manage_templates_requires_manager(self):
+        User.objects.create_user(username='member', password='p')
+        self.client.login(username='member', password='p')
+        response = self.client.get(reverse('attribute_template_list'))
+        self.assertEqual(response.status_code, 403)
+
+
+from datetime import timedelta
+from asset_managment.overdue import sweep_overdue
+
+class AssetOverdueTests(TestCase):
+    """
+    Tests for the stored overdue flag, ?overdue=1 and the daily sweep
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_superuser(username='admin', password='p')
+        self.client.login(username='admin', password='p')
+        self.today = timezone.localdate()
+        self.past = Asset.objects.create(name='Past', depreciation=self.today - timedelta(days=3))
+        self.future = Asset.objects.create(name='Future', depreciation=self.today + timedelta(days=1))
+        self.repair = Asset.objects.create(
+            name='Repair', status='out_for_repairs', depreciation=self.today - timedelta(days=3)
+        )
+        self.undated = Asset.objects.create(name='Undated')
+
+    def names(self, **params):
+        response = self.client.get(reverse('asset_list'), params)
+        return sorted(a.name for a in response.context['assets'])
+
+    def test_is_overdue_property(self):
+        self.assertTrue(self.past.is_overdue)
+        self.assertFalse(self.future.is_overdue)
+        self.assertFalse(self.repair.is_overdue)
+        self.assertFalse(self.undated.is_overdue)
+
+    def test_flag_is_kept_on_save_and_bulk_writes(self):
+        self.assertEqual(self.names(overdue='1'), ['Past'])
+        self.repair.status = 'operational'
+        self.repair.save(update_fields=['status'])
+        self.assertEqual(self.names(overdue='1'), ['Past', 'Repair'])
+        apply_bulk_action(Asset.objects.all(), 'status', status='out_for_repairs')
+        self.assertEqual(self.names(overdue='1'), [])
+        apply_bulk_action(Asset.objects.all(), 'status', status='checked_out')
+        self.assertEqual(self.names(overdue='1'), ['Past', 'Repair'])
+        copy = duplicate_asset(self.past)[0]
+        self.assertTrue(Asset.objects.get(pk=copy.pk).overdue)
+
+    def test_with_overdue_annotation(self):
+        tomorrow = self.today + timedelta(days=2)
+        rows = dict(Asset.objects.with_overdue(tomorrow).values_list('name', 'is_overdue_now'))
+        self.assertEqual(rows, {'Past': True, 'Future': True, 'Repair': False, 'Undated': False})
+
+    def test_sweep_flips_flags_in_batches(self):
+        Asset.objects.filter(pk=self.past.pk).update(overdue=False)
+        Asset.objects.filter(pk=self.undated.pk).update(overdue=True)
+        more = [Asset(name=f'Old {n}', depreciation=self.today - timedelta(days=n + 1)) for n in range(5)]
+        Asset.objects.bulk_create(more)
+
+        digest = sweep_overdue(batch_size=2, dry_run=True)
+        self.assertEqual((digest.flagged, digest.cleared), (6, 1))
+        self.assertFalse(Asset.objects.get(pk=self.past.pk).overdue)
+
+        before = Asset.objects.get(pk=self.past.pk).updated_at
+        digest = sweep_overdue(batch_size=2)
+        self.assertEqual((digest.flagged, digest.cleared, digest.total), (6, 1, 6))
+        self.assertEqual(digest.by_category, {'General': 6})
+        self.assertIn('Old 0 (General)', str(digest))
+        self.assertGreater(Asset.objects.get(pk=self.past.pk).updated_at, before)
+        self.assertEqual(sweep_overdue().flagged, 0)
+
+    def test_sweep_picks_up_dates_passing(self):
+        later = self.today + timedelta(days=5)
+        digest = sweep_overdue(today=later)
+        self.assertEqual(digest.flagged, 1)
+        self.assertTrue(Asset.objects.get(pk=self.future.pk).overdue)
+
+    def test_sweep_command(self):
+        out = StringIO()
+        call_command('sweep_overdue_assets', '--dry-run', stdout=out)
+        self.assertIn('0 newly overdue', out.getvalue())
+
+
+from asset_managment import instrumentation
+from asset_managment.instrumentation import QueryBudgetExceeded
+
+class RequestMetricsTests(TestCase):
+    """
+    Tests for the per-view metrics middleware, /metrics/ and query budgets
+    """
+
+    def setUp(self):
+        cache.clear()
+        instrumentation.reset_view_stats()
+        self.client = Client()
+        self.user = User.objects.create_superuser(username='admin', password='p')
+        self.client.login(username='admin', password='p')
+        self.asset = Asset.objects.create(name='Laptop', category='Electronics')
+        Attribute.objects.create(asset=self.asset, name='RAM', value='16')
+
+    def test_queries_are_recorded_per_view(self):
+        self.client.get(reverse('asset_list'))  # warm the facet cache
+        instrumentation.reset_view_stats()
+        with self.assertNumQueries(4):
+            self.client.get(reverse('asset_list'))
+        stats = instrumentation.view_stats()['asset_list']
+        self.assertEqual((stats.requests, stats.queries), (1, 4))
+        self.assertGreater(stats.render_time, 0)
+        self.assertGreaterEqual(stats.total_time, stats.db_time + stats.render_time)
+
+    @override_settings(ASSET_SERVER_TIMING=True)
+    def test_server_timing_header(self):
+        response = self.client.get(reverse('asset_detail', kwargs={'pk': self.asset.pk}))
+        self.assertIn('desc="4 queries"', response['Server-Timing'])
+        self.assertIn('render;dur=', response['Server-Timing'])
+
+    def test_metrics_endpoint(self):
+        self.client.get(reverse('asset_detail', kwargs={'pk': self.asset.pk}))
+        text = self.client.get(reverse('asset_metrics')).content.decode()
+        self.assertIn('asset_view_requests_total{view="asset_detail"} 1', text)
+        self.assertIn('asset_view_duration_seconds_bucket{view="asset_detail",le="+Inf"} 1', text)
+        self.assertIn('asset_detail_cache_misses_total 1', text)
+
+    @override_settings(ASSET_METRICS_TOKEN='s3cret')
+    def test_metrics_access(self):
+        User.objects.create_user(username='member', password='p')
+        member = Client()
+        member.login(username='member', password='p')
+        self.assertEqual(member.get(reverse('asset_metrics')).status_code, 403)
+        anonymous = Client()
+        response = anonymous.get(reverse('asset_metrics'), HTTP_AUTHORIZATION='Bearer s3cret')
+        self.assertEqual(response.status_code, 200)
+        response = anonymous.get(reverse('asset_metrics'), HTTP_AUTHORIZATION='Bearer wrong')
+        self.assertEqual(response.status_code, 302)
+
+    @override_settings(ASSET_QUERY_BUDGETS={'asset_list': 2})
+    def test_budget_is_logged(self):
+        with self.assertLogs('asset_managment.instrumentation', 'WARNING') as logs:
+            self.client.get(reverse('asset_list'))
+        self.assertIn('over its budget of 2', logs.output[0])
+
+    @override_settings(ASSET_QUERY_BUDGETS={'asset_list': 2}, ASSET_QUERY_BUDGET_ACTION='raise')
+    def test_budget_can_raise(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get(reverse('asset_list'))
+
+    @override_settings(ASSET_QUERY_BUDGET_ACTION='raise')
+    def test_views_stay_within_budget(self):
+        Asset.objects.bulk_create([Asset(name=f'Asset {n}') for n in range(30)])
+        pk = {'pk': self.asset.pk}
+        for name, kwargs, params in (
+            ('asset_list', {}, {}),
+            ('asset_list', {}, {'search': 'laptop', 'overdue': '1'}),
+            ('asset_detail', pk, {}),
+            ('asset_update', pk, {}),
+            ('asset_history', pk, {}),
+            ('api_asset_list', {}, {'include': 'attributes'}),
+            ('api_asset_detail', pk, {}),
+        ):
+            with self.subTest(view=name, params=params):
+                self.assertEqual(self.client.get(reverse(name, kwargs=kwargs), params).status_code, 200)
+
+    async def test_async_views_are_counted(self):
+        client = AsyncClient()
+        await sync_to_async(client.force_login)(self.user)
+        await client.get(reverse('asset_list_async'))
+        stats = instrumentation.view_stats()['asset_list_async']
+        self.assertGreater(stats.queries, 0)
+        self.assertGreater(stats.render_time, 0)
+
+
+from asset_managment.benchmarks import run_suite, summarize
+from asset_managment.seeding import seed_assets
+
+class SeedAndBenchmarkTests(TestCase):
+    """
+    Tests for the synthetic data generator and the scaling benchmark
+    """
+
+    def setUp(self):
+        cache.clear()
+
+    def test_seed_assets(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(seed_assets(250, attrs_per_asset=7, users=4, batch_size=100, seed=1), 250)
+        # Batched inserts, not a query per row
+        self.assertLess(len(queries), 60)
+        self.assertEqual(Asset.objects.count(), 250)
+        self.assertEqual(Attribute.objects.count(), 250 * 7)
+        self.assertEqual(User.objects.filter(username__startswith='seed-user').count(), 4)
+        self.assertTrue(Attribute.objects.filter(key='ram', value_type='int').exists())
+        self.assertEqual(
+            Asset.objects.filter(overdue=True).count(),
+            Asset.objects.with_overdue().filter(is_overdue_now=True).count(),
+        )
+        self.assertEqual(sum(n for _, n in get_facets().category_counts), 250)
+
+    def test_summarize_percentiles(self):
+        summary = summarize([i / 1000 for i in range(1, 11)], errors=0, elapsed=1)
+        # Nearest rank: the 95th percentile of ten samples is the largest
+        self.assertEqual(summary['p95_ms'], 10.0)
+        self.assertEqual(summary['p50_ms'], 5.5)
+
+    def test_seed_command(self):
+        out = StringIO()
+        call_command('seed_assets', '--assets', '20', '--users', '2', '--seed', '3', stdout=out)
+        self.assertIn('Created 20 assets', out.getvalue())
+        self.assertEqual(Asset.objects.count(), 20)
+
+    def test_run_suite(self):
+        seen = []
+        results = run_suite([10, 30], attrs_per_asset=2, users=2, repeat=2, report=seen.append)
+        self.assertEqual(len(results), 2 * 9)
+        self.assertEqual(results, seen)
+        self.assertGreaterEqual(Asset.objects.count(), 30)
+        for result in results:
+            with self.subTest(size=result['size'], scenario=result['scenario']):
+                self.assertEqual(result['errors'], 0)
+                self.assertGreater(result['queries'], 0)
+                self.assertGreater(result['peak_memory_kb'], 0)
+
+
+import unittest
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from asset_managment.backends.sqlite3.base import DatabaseWrapper as TunedSQLiteWrapper
+
+@unittest.skipUnless(
+    isinstance(connections['default'], TunedSQLiteWrapper), 'Only for the tuned SQLite profile'
+)
+class TunedSQLiteBackendTests(TestCase):
+    """
+    Tests for the SQLite backend's pragmas and transaction mode
+    """
+
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_are_applied(self):
+        self.assertEqual(self.pragma('synchronous'), 1)  # NORMAL
+        self.assertEqual(self.pragma('busy_timeout'), 20000)
+        self.assertEqual(self.pragma('temp_store'), 2)  # MEMORY
+        self.assertEqual(self.pragma('foreign_keys'), 1)
+
+    def test_transactions_take_the_write_lock_up_front(self):
+        self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
+        wrapper = TunedSQLiteWrapper({
+            **connection.settings_dict,
+            'OPTIONS': {'transaction_mode': 'sometime'},
+        })
+        with self.assertRaises(ImproperlyConfigured):
+            wrapper.get_connection_params()
+
+
+from unittest import mock
+from asset_managment.routers import STICKY_COOKIE, ReplicaRouter
+
+
+@override_settings(ASSET_READ_REPLICAS=['replica'])
+class ReplicaRoutingTests(TestCase):
+    """
+    Tests for sending the read views to a replica and pinning writers to
+    the primary. The "replica" alias shares the test database's connection.
+    """
+
+    def setUp(self):
+        cache.clear()
+        connections['replica'] = connections['default']
+        self.addCleanup(connections.__delitem__, 'replica')
+        self.client = Client()
+        self.user = User.objects.create_superuser(username='admin', password='p')
+        self.client.login(username='admin', password='p')
+        self.asset = Asset.objects.create(name='Laptop', category='Electronics')
+
+    def reads(self, method, path, data=None):
+        """(response, {alias: [model names]}) for one request."""
+        seen = {}
+        read = ReplicaRouter.db_for_read
+
+        def spy(router, model, **hints):
+            alias = read(router, model, **hints)
+            seen.setdefault(alias, set()).add(model._meta.model_name)
+            return alias
+
+        with mock.patch.object(ReplicaRouter, 'db_for_read', spy):
+            response = getattr(self.client, method)(path, data)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        return response, seen
+
+    def test_read_views_use_the_replica(self):
+        for path in (
+            reverse('asset_list'),
+            reverse('api_asset_list'),
+            reverse('api_asset_detail', kwargs={'pk': self.asset.pk}),
+            reverse('asset_export'),
+            reverse('api_asset_list_async'),
+        ):
+            response, seen = self.reads('get', path)
+            self.assertEqual(response.status_code, 200, path)
+            self.assertIn('asset', seen['replica'], path)
+            # Users and sessions always come from the primary
+            self.assertNotIn('user', seen.get('replica', ()), path)
+            self.assertNotIn('session', seen.get('replica', ()), path)
+
+    def test_other_views_use_the_primary(self):
+        _, seen = self.reads('get', reverse('asset_history', kwargs={'pk': self.asset.pk}))
+        self.assertNotIn('replica', seen)
+        _, seen = self.reads('post', reverse('asset_bulk'), {
+            'action': 'status', 'status': 'out_for_repairs',
+            'scope': 'selected', 'asset_ids': [self.asset.pk],
+        })
+        self.assertNotIn('replica', seen)
+
+    def test_detail_cache_fills_from_the_primary(self):
+        _, seen = self.reads('get', reverse('asset_detail', kwargs={'pk': self.asset.pk}))
+        self.assertNotIn('asset', seen.get('replica', ()))
+
+    def test_writers_read_their_writes_from_the_primary(self):
+        response, _ = self.reads('post', reverse('asset_assign', kwargs={'pk': self.asset.pk}), {
+            'user_id': self.user.pk,
+        })
+        self.assertIn(STICKY_COOKIE, response.cookies)
+        _, seen = self.reads('get', reverse('asset_list'))
+        self.assertNotIn('replica', seen)
+
+        # Once the window has passed, back to the replica
+        self.client.cookies[STICKY_COOKIE] = '1'
+        _, seen = self.reads('get', reverse('asset_list'))
+        self.assertIn('asset', seen['replica'])
+
+    def test_reads_do_not_pin(self):
+        response, _ = self.reads('get', reverse('asset_list'))
+        self.assertNotIn(STICKY_COOKIE, response.cookies)
+
+    def test_replicas_are_not_migrated(self):
+        router = ReplicaRouter()
+        self.assertFalse(router.allow_migrate('replica', 'asset_managment'))
+        self.assertIsNone(router.allow_migrate('default', 'asset_managment'))
+        self.assertEqual(router.db_for_read(Asset), 'default')
+
+
+from django.conf import settings
+from django.core.cache.backends.filebased import FileBasedCache
+from asset_managment import jobs, tasks
+from asset_managment.facets import FACET_CACHE_KEY
+from asset_managment.models import AssetJob
+
+
+class BackgroundJobTests(TestCase):
+    """
+    Tests for the job queue, the worker and the views that hand work to it
+    """
+
+    def setUp(self):
+        cache.clear()
+        files = tempfile.TemporaryDirectory()
+        self.addCleanup(files.cleanup)
+        storage = override_settings(ASSET_JOB_FILES_DIR=files.name)
+        storage.enable()
+        self.addCleanup(storage.disable)
+        self.client = Client()
+        self.user = User.objects.create_superuser(username='admin', password='p')
+        self.client.login(username='admin', password='p')
+        self.asset = Asset.objects.create(name='Laptop', category='Electronics')
+
+    def flaky(self, failures, exc=RuntimeError):
+        calls = []
+
+        def handler(job):
+            calls.append(job.attempts)
+            if len(calls) <= failures:
+                raise exc('boom')
+            return {'ok': True}
+
+        return mock.patch.dict(tasks.HANDLERS, {jobs.JOB_REBUILD_FACETS: handler})
+
+    def test_claim_run_and_result(self):
+        job = jobs.enqueue(jobs.JOB_REBUILD_FACETS, user=self.user)
+        with self.assertRaises(jobs.JobNotFinished):
+            jobs.job_result(job.pk)
+
+        claimed = jobs.claim_job('w1')
+        self.assertEqual((claimed.pk, claimed.status, claimed.attempts), (job.pk, 'running', 1))
+        self.assertIsNone(jobs.claim_job('w2'))
+
+        jobs.run_job(claimed)
+        self.assertEqual(jobs.job_result(job.pk), {'categories': 1})
+        status = jobs.job_status(job.pk)
+        self.assertEqual((status['status'], status['progress']['percent']), ('succeeded', 100))
+
+    def test_failed_attempts_are_retried_later(self):
+        job = jobs.enqueue(jobs.JOB_REBUILD_FACETS)
+        with self.flaky(1), self.assertLogs(jobs.logger, 'WARNING'):
+            jobs.run_job(jobs.claim_job('w1'))
+            job.refresh_from_db()
+            self.assertEqual(job.status, 'pending')
+            self.assertIn('boom', job.error)
+            self.assertGreater(job.run_after, timezone.now())
+            self.assertIsNone(jobs.claim_job('w1'))  # not due yet
+
+            AssetJob.objects.filter(pk=job.pk).update(run_after=timezone.now())
+            jobs.run_job(jobs.claim_job('w1'))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.result), ('succeeded', 2, {'ok': True}))
+
+    def test_gives_up(self):
+        retried_out = jobs.enqueue(jobs.JOB_REBUILD_FACETS, max_attempts=1)
+        with self.flaky(5), self.assertLogs(jobs.logger, 'WARNING'):
+            jobs.run_job(jobs.claim_job('w1'))
+        with self.assertRaises(jobs.JobFailed):
+            jobs.job_result(retried_out.pk)
+
+        permanent = jobs.enqueue(jobs.JOB_REBUILD_FACETS)
+        with self.flaky(5, jobs.JobError), self.assertLogs(jobs.logger, 'WARNING'):
+            jobs.run_job(jobs.claim_job('w1'))
+        permanent.refresh_from_db()
+        self.assertEqual((permanent.status, permanent.attempts), ('failed', 1))
+
+    def test_lost_worker_is_replaced(self):
+        jobs.enqueue(jobs.JOB_REBUILD_FACETS)
+        lost = jobs.claim_job('w1')
+        AssetJob.objects.filter(pk=lost.pk).update(
+            heartbeat_at=timezone.now() - jobs.JOB_LEASE - timedelta(seconds=1)
+        )
+        again = jobs.claim_job('w2')
+        self.assertEqual((again.pk, again.attempts), (lost.pk, 2))
+
+        # The first worker's late finish no longer counts
+        jobs.run_job(lost)
+        again.refresh_from_db()
+        self.assertEqual((again.status, again.worker), ('running', 'w2'))
+
+    def test_large_import_runs_in_the_background(self):
+        upload = SimpleUploadedFile('assets.csv', b'name,category\nDrill,Tools\nSaw,Tools\n')
+        with override_settings(ASSET_IMPORT_INLINE_BYTES=10):
+            response = self.client.post(reverse('asset_import'), {'file': upload})
+        job = AssetJob.objects.get(kind=jobs.JOB_IMPORT)
+        self.assertRedirects(response, reverse('job_detail', kwargs={'pk': job.pk}))
+        self.assertFalse(Asset.objects.filter(category='Tools').exists())
+
+        self.assertEqual(jobs.run_worker(burst=True), 1)
+        self.assertEqual(Asset.objects.filter(category='Tools').count(), 2)
+        job.refresh_from_db()
+        self.assertEqual((job.result['created'], job.progress_done), (2, 2))
+        self.assertFalse(jobs.job_storage().exists(job.payload['file']))
+        self.assertContains(self.client.get(reverse('job_detail', kwargs={'pk': job.pk})), '2</strong> assets imported')
+
+    def test_background_export(self):
+        Asset.objects.create(name='Chair', category='Furniture')
+        response = self.client.post(reverse('asset_export') + '?category=Electronics&format=jsonl')
+        job = AssetJob.objects.get(kind=jobs.JOB_EXPORT)
+        self.assertRedirects(response, reverse('job_detail', kwargs={'pk': job.pk}))
+        download = reverse('job_download', kwargs={'pk': job.pk})
+        self.assertEqual(self.client.get(download).status_code, 404)
+
+        jobs.run_worker(burst=True)
+        response = self.client.get(download)
+        body = b''.join(response.streaming_content).decode()
+        self.assertIn('Laptop', body)
+        self.assertNotIn('Chair', body)
+        self.assertIn('assets.jsonl', response['Content-Disposition'])
+
+        User.objects.create_user(username='member', password='p')
+        member = Client()
+        member.login(username='member', password='p')
+        self.assertEqual(member.get(download).status_code, 404)
+
+    def test_large_bulk_action_is_queued(self):
+        with override_settings(ASSET_BULK_INLINE_LIMIT=0):
+            response = self.client.post(
+                reverse('asset_bulk') + '?category=Electronics',
+                {'action': 'status', 'status': 'out_for_repairs', 'scope': 'all'},
+                HTTP_ACCEPT='application/json',
+            )
+        self.assertEqual(response.status_code, 202)
+        status_url = response.json()['status_url']
+        self.assertEqual(self.client.get(status_url).json()['status'], 'pending')
+
+        jobs.run_worker(burst=True)
+        status = self.client.get(status_url).json()
+        self.assertEqual((status['status'], status['result']['affected']), ('succeeded', 1))
+        self.asset.refresh_from_db()
+        self.assertEqual(self.asset.status, 'out_for_repairs')
+        # Recorded as the user who queued it
+        entry = AssetHistory.objects.for_asset(self.asset.pk).first()
+        self.assertEqual(entry.user, self.user)
+
+    def test_managers_queue_maintenance_jobs(self):
+        response = self.client.post(reverse('job_list'), {'kind': jobs.JOB_SWEEP_OVERDUE})
+        job = AssetJob.objects.get(kind=jobs.JOB_SWEEP_OVERDUE)
+        self.assertRedirects(response, reverse('job_detail', kwargs={'pk': job.pk}))
+
+        User.objects.create_user(username='member', password='p')
+        member = Client()
+        member.login(username='member', password='p')
+        response = member.post(reverse('job_list'), {'kind': jobs.JOB_REBUILD_FACETS})
+        self.assertEqual(response.status_code, 403)
+        self.assertNotContains(member.get(reverse('job_list')), 'sweep_overdue')
+
+    def shared_cache(self):
+        """A file cache, which every process on the host sees."""
+        location = tempfile.TemporaryDirectory()
+        self.addCleanup(location.cleanup)
+        return override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': location.name,
+        }})
+
+    def test_worker_command(self):
+        call_command('rebuild_facets', '--background', stdout=StringIO())
+        call_command('sweep_overdue_assets', '--background', stdout=StringIO())
+        out = StringIO()
+        with self.shared_cache():
+            call_command('run_asset_worker', '--burst', stdout=out)
+        self.assertIn('Ran 2 jobs.', out.getvalue())
+        self.assertFalse(AssetJob.objects.exclude(status='succeeded').exists())
+
+    def test_worker_refuses_process_local_cache(self):
+        self.assertEqual(jobs.local_cache_aliases(), ['default'])
+        with self.assertRaisesMessage(CommandError, 'local memory'):
+            call_command('run_asset_worker', '--burst', stdout=StringIO())
+
+    def test_worker_invalidations_reach_other_processes(self):
+        with self.shared_cache():
+            self.assertEqual(jobs.local_cache_aliases(), [])
+            self.client.get(reverse('asset_detail', kwargs={'pk': self.asset.pk}))
+            get_facets()
+            settings_dict = settings.CACHES['default']
+            # What the web server would read, through its own cache instance
+            server = FileBasedCache(settings_dict['LOCATION'], {})
+            self.assertIsNotNone(server.get(detail_cache.detail_key(self.asset.pk)))
+
+            jobs.enqueue(jobs.JOB_BULK_ACTION, {
+                'action': 'delete', 'asset_ids': [str(self.asset.pk)], 'query': '',
+            }, user=self.user)
+            with self.captureOnCommitCallbacks(execute=True):
+                call_command('run_asset_worker', '--burst', stdout=StringIO())
+            self.assertIsNone(server.get(detail_cache.detail_key(self.asset.pk)))
+            self.assertIsNone(server.get(FACET_CACHE_KEY))
@@ -1,6 +1,6 @@
 from django.urls import path
 from django.contrib.auth.views import LogoutView
-from . import views
+from . import async_views, views
 
 urlpatterns = [
     # Authentication (Epic 4, Story 23)
@@ -15,4 +15,33 @@ urlpatterns = [
     path('asset/<uuid:pk>/delete/', views.AssetDeleteView.as_view(), name='asset_delete'),
     path('asset/<uuid:pk>/duplicate/', views.asset_duplicate_view, name='asset_duplicate'),
     path('asset/<uuid:pk>/assign/', views.assign_asset_view, name='asset_assign'),
+    path('asset/<uuid:pk>/history/', views.asset_history_view, name='asset_history'),
+
+    # Bulk operations
+    path('asset/import/', views.asset_import_view, name='asset_import'),
+    path('asset/export/', views.AssetExportView.as_view(), name='asset_export'),
+    path('asset/bulk/', views.AssetBulkActionView.as_view(), name='asset_bulk'),
+
+    # Background jobs
+    path('jobs/', views.job_list_view, name='job_list'),
+    path('jobs/<uuid:pk>/', views.job_detail_view, name='job_detail'),
+    path('jobs/<uuid:pk>/download/', views.job_download_view, name='job_download'),
+
+    # Attribute templates per category
+    path('templates/', views.attribute_template_list_view, name='attribute_template_list'),
+    path('templates/<path:category>/', views.attribute_template_edit_view, name='attribute_template_edit'),
+
+    # Read-only JSON API
+    path('api/assets/', views.AssetApiListView.as_view(), name='api_asset_list'),
+    path('api/assets/<uuid:pk>/', views.AssetApiDetailView.as_view(), name='api_asset_detail'),
+    path('api/jobs/<uuid:pk>/', views.api_job_detail_view, name='api_job_detail'),
+
+    # Async read paths for ASGI deployments
+    path('async/', async_views.asset_list_async, name='asset_list_async'),
+    path('async/asset/<uuid:pk>/', async_views.asset_detail_async, name='asset_detail_async'),
+    path('api/async/assets/', async_views.api_asset_list_async, name='api_asset_list_async'),
+
+    # Monitoring
+    path('asset/cache-stats/', views.asset_cache_stats_view, name='asset_cache_stats'),
+    path('metrics/', views.asset_metrics_view, name='asset_metrics'),
 ]
\ No newline at end of file
@@ -1,5 +1,7 @@
+import io
 from django.shortcuts import render, redirect, get_object_or_404
 from django.views.generic import (
+    View,
     ListView,
     DetailView,
     CreateView,
@@ -8,12 +10,52 @@ from django.views.generic import (
 )
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.contrib.auth.views import LoginView
-from django.urls import reverse_lazy
-from django.db.models import Q
-from .models import Asset, Attribute
-from .forms import AssetForm, AssetAttributeFormSet
-from django.contrib.auth.models import Group
+from django.contrib.auth.views import LoginView, redirect_to_login
+from django.urls import reverse, reverse_lazy
+from django.core.exceptions import BadRequest, PermissionDenied
+from django.contrib import messages
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.template.loader import render_to_string
+from django.core.paginator import Paginator
+from django.db.models import Count, Max
+from django.conf import settings
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from .models import Asset, AssetHistory, AssetJob, AttributeTemplate
+from .forms import (
+    AssetForm,
+    AssetApiQueryForm,
+    AssetAttributeFormSet,
+    AssetBulkActionForm,
+    AssetDuplicateForm,
+    AssetImportUploadForm,
+    AttributeTemplateFormSet,
+    templated_attribute_formset,
+)
+from .attribute_templates import apply_templates
+from .duplication import duplicate_asset
+from .bulk import apply_bulk_action
+from .importer import guess_format, import_assets
+from .jobs import (
+    JOB_BULK_ACTION,
+    JOB_EXPORT,
+    JOB_IMPORT,
+    JOB_REBUILD_FACETS,
+    JOB_SWEEP_OVERDUE,
+    enqueue,
+    job_storage,
+    status_data,
+)
+from . import api, exporter
+from .permissions import AssetAccessMixin, asset_access_required, can_manage
+from .facets import get_facets
+from .conditional import ConditionalGetMixin, make_etag
+from . import detail_cache, instrumentation
+from .detail_cache import load_asset_detail
+from .attribute_filters import InvalidAttributeFilter
+from .list_filters import filter_assets
+from .search import get_search_backend, parse_asset_id
+from .pagination import KeysetPaginator, InvalidCursor, after_cursor, cursor_for
 
 class CustomLoginView(LoginView):
     """
@@ -25,74 +67,337 @@ class CustomLoginView(LoginView):
     def get_success_url(self):
         return reverse_lazy('asset_list')
 
-class AssetListView(LoginRequiredMixin, ListView):
+STREAM_MARKER = "<!-- asset-rows -->"
+
+
+class AssetListView(LoginRequiredMixin, ConditionalGetMixin, ListView):
     """
     Epic 1, Stories 2-4: Asset list with search and filtering
+
+    Pages are keyset-paginated on (created_at, id) via ?after= / ?before=
+    cursors. ?stream=1 streams up to stream_limit rows as they are read.
+    ?sort=relevance with a text search shows one page of the best matches
+    instead, ranked by the search backend.
+    Unchanged results answer If-None-Match / If-Modified-Since with a 304.
     """
     model = Asset
+    replica_reads = True
     template_name = "asset_managment/asset_list.html"
+    rows_template_name = "asset_managment/asset_rows.html"
     context_object_name = "assets"
-    
+    paginate_by = 50
+    stream_limit = 10000
+    stream_chunk_size = 500
+
+    def get(self, request, *args, **kwargs):
+        # A pasted full asset id goes straight to the asset
+        lookup = parse_asset_id(request.GET.get('search', ''))
+        if lookup and lookup[0] == 'exact':
+            if Asset.objects.visible_to(request.user).filter(pk=lookup[1]).exists():
+                return redirect('asset_detail', pk=lookup[1])
+
+        if request.GET.get('stream'):
+            return self.conditional_get(self.stream_response)
+        return self.conditional_get(lambda: super(AssetListView, self).get(request, *args, **kwargs))
+
+    def get_validators(self):
+        """
+        One aggregate over the filtered rows. The count catches deletes,
+        which max(updated_at) alone would miss; the cached facet counts
+        cover the filter dropdowns. No Last-Modified: max(updated_at) stays
+        put when a row is deleted, so If-Modified-Since would answer 304.
+        """
+        state = self.get_queryset().order_by().aggregate(
+            latest=Max('updated_at'), count=Count('pk')
+        )
+        etag = make_etag(
+            self.request.user.pk,
+            self.request.GET.urlencode(),
+            state['latest'].isoformat() if state['latest'] else '',
+            state['count'],
+            sorted((c, sorted(s.items())) for c, s in get_facets().counts.items()),
+        )
+        return etag, None
+
     def get_queryset(self):
-        user = self.request.user
-        queryset = Asset.objects.all().order_by('-created_at')
-        if not user.is_superuser and not user.is_staff:
-            queryset.filter(assigned_to=user)
-        
-        # Search functionality (Epic 1, Story 4)
-        search_query = self.request.GET.get('search', '')
-        if search_query:
-            queryset = queryset.filter(
-                Q(name__icontains=search_query) |
-                Q(id__icontains=search_query) |
-                Q(category__icontains=search_query)
+        try:
+            return filter_assets(self.request.user, self.request.GET)
+        except InvalidAttributeFilter as exc:
+            raise BadRequest(str(exc))
+
+    def ranked_search(self):
+        search = self.request.GET.get('search', '')
+        if self.request.GET.get('sort') != 'relevance' or not search.strip():
+            return False
+        lookup = parse_asset_id(search)
+        return not (lookup and lookup[0] == 'exact')
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.ranked_search():
+            # Relevance has no keyset cursor, so there is only a first page
+            ids = get_search_backend().ranked_ids(self.request.GET['search'], page_size, queryset)
+            assets = queryset.in_bulk(ids)
+            return None, None, [assets[pk] for pk in ids if pk in assets], False
+        paginator = KeysetPaginator(queryset, page_size)
+        try:
+            page = paginator.page(
+                after=self.request.GET.get('after'),
+                before=self.request.GET.get('before'),
             )
-        
-        # Category filter
-        category = self.request.GET.get('category', '')
-        if category:
-            queryset = queryset.filter(category=category)
-        
-        # Status filter
-        status = self.request.GET.get('status', '')
-        if status:
-            queryset = queryset.filter(status=status)
-        
-        return queryset
-    
+        except InvalidCursor:
+            raise Http404("Invalid page cursor.")
+        return paginator, page, page.object_list, page.has_other_pages()
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        user = self.request.user
-        # Get unique categories for filter dropdown
-        context['categories'] = Asset.objects.values_list('category', flat=True).distinct()
-        
-        # Get the queryset (already filtered by security in get_queryset if you did that)
-        assets_temp = context['assets']
-        assets = []
-        for a in assets_temp:
-            if a.has_access(user):
-                assets.append(a)
-
+        # Categories and counts for the filter dropdowns, served from cache
+        facets = get_facets()
+        context['categories'] = facets.categories
+        context['category_counts'] = facets.category_counts
+        context['status_counts'] = facets.status_counts
 
-         
-        context['assets'] = assets
+        page = context.get('page_obj')
+        if page is not None:
+            context['next_url'] = self.cursor_url('after', page.next_cursor)
+            context['previous_url'] = self.cursor_url('before', page.previous_cursor)
         return context
 
-class AssetDetailView(LoginRequiredMixin, UserPassesTestMixin, DetailView):
+    def cursor_url(self, key, cursor):
+        if not cursor:
+            return None
+        params = self.request.GET.copy()
+        params.pop('after', None)
+        params.pop('before', None)
+        params[key] = cursor
+        return '?' + params.urlencode()
+
+    def stream_response(self):
+        queryset = self.get_queryset()
+        after = self.request.GET.get('after')
+        if after:
+            try:
+                queryset = after_cursor(queryset, after)
+            except InvalidCursor:
+                raise Http404("Invalid page cursor.")
+        queryset = queryset[: self.stream_limit + 1]
+
+        # Render the page chrome once, without touching the asset table
+        self.object_list = Asset.objects.none()
+        context = self.get_context_data(streaming=True, stream_limit=self.stream_limit)
+        page = render_to_string(self.template_name, context, request=self.request)
+        head, tail = page.split(STREAM_MARKER, 1)
+
+        return StreamingHttpResponse(self.stream_rows(head, queryset, tail))
+
+    def stream_rows(self, head, queryset, tail):
+        yield head
+        batch = []
+        last = None
+        for count, asset in enumerate(queryset.iterator(chunk_size=self.stream_chunk_size), 1):
+            if count > self.stream_limit:
+                params = self.request.GET.copy()
+                params['after'] = cursor_for(last)
+                batch_context = {'assets': batch, 'stream_next_url': '?' + params.urlencode()}
+                yield render_to_string(self.rows_template_name, batch_context)
+                batch = []
+                break
+            batch.append(asset)
+            last = asset
+            if len(batch) == self.stream_chunk_size:
+                yield render_to_string(self.rows_template_name, {'assets': batch})
+                batch = []
+        if batch:
+            yield render_to_string(self.rows_template_name, {'assets': batch})
+        yield tail
+
+class AssetExportView(AssetListView):
+    """
+    Stream the filtered asset list as CSV, JSONL or an Excel spreadsheet.
+    Takes the same search/category/status parameters as the list view.
+    A POST writes the file in a background job instead.
+    """
+    chunk_size = 2000
+
+    def post(self, request, *args, **kwargs):
+        fmt = request.GET.get('format', 'csv')
+        if fmt not in exporter.STREAMS:
+            raise Http404("Unknown export format.")
+        params = request.GET.copy()
+        params.pop('format', None)
+        job = enqueue(JOB_EXPORT, {'format': fmt, 'query': params.urlencode()}, user=request.user)
+        messages.info(request, "The export is being prepared in the background.")
+        return redirect('job_detail', pk=job.pk)
+
+    def get(self, request, *args, **kwargs):
+        fmt = request.GET.get('format', 'csv')
+        if fmt not in exporter.STREAMS:
+            raise Http404("Unknown export format.")
+        content_type, extension = exporter.FORMATS[fmt]
+
+        rows = exporter.STREAMS[fmt](self.get_queryset(), self.chunk_size)
+        response = StreamingHttpResponse(rows, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="assets.{extension}"'
+        return response
+
+
+class AssetBulkActionView(AssetListView):
+    """
+    Apply a status change, assignment or deletion to the selected assets, or
+    to every asset matching the list filters in the query string, as one
+    set-based UPDATE/DELETE. Answers JSON when the client asks for it.
+    Filter-wide actions over more than settings.ASSET_BULK_INLINE_LIMIT
+    assets are handed to a background job.
+    """
+    http_method_names = ['post']
+
+    def post(self, request, *args, **kwargs):
+        wants_json = 'application/json' in request.headers.get('Accept', '')
+        form = AssetBulkActionForm(request.POST)
+        if not form.is_valid():
+            if wants_json:
+                return JsonResponse({'errors': form.errors.get_json_data()}, status=400)
+            for errors in form.errors.values():
+                for error in errors:
+                    messages.error(request, error)
+            return self.back_to_list()
+
+        data = form.cleaned_data
+        queryset = self.get_queryset()
+        if data['scope'] == 'selected':
+            queryset = queryset.filter(pk__in=data['asset_ids'])
+        elif queryset.count() > getattr(settings, 'ASSET_BULK_INLINE_LIMIT', 5000):
+            return self.queue(data, wants_json)
+        affected = apply_bulk_action(
+            queryset,
+            data['action'],
+            status=data.get('status'),
+            assignee=data.get('assignee'),
+        )
+
+        if wants_json:
+            return JsonResponse({'action': data['action'], 'affected': affected})
+        messages.success(request, f"{affected} asset{'s' if affected != 1 else ''} updated.")
+        return self.back_to_list()
+
+    def queue(self, data, wants_json):
+        assignee = data.get('assignee')
+        job = enqueue(JOB_BULK_ACTION, {
+            'query': self.request.GET.urlencode(),
+            'action': data['action'],
+            'status': data.get('status'),
+            'assignee': assignee.pk if assignee else None,
+        }, user=self.request.user)
+        if wants_json:
+            return JsonResponse({
+                'action': data['action'],
+                'job': str(job.pk),
+                'status_url': reverse('api_job_detail', kwargs={'pk': job.pk}),
+            }, status=202)
+        messages.info(self.request, "The change is being applied in the background.")
+        return redirect('job_detail', pk=job.pk)
+
+    def back_to_list(self):
+        params = self.request.GET.urlencode()
+        return redirect(reverse('asset_list') + (f'?{params}' if params else ''))
+
+
+class AssetApiListView(AssetListView):
+    """
+    JSON list of assets with the same search and filters as the HTML list.
+    ?fields= picks the fields, ?include=attributes adds attributes, ?ids=
+    fetches specific assets in one query, and ?after= / ?before= / ?limit=
+    page through the rest.
+    """
+    raise_exception = True
+
+    def get(self, request, *args, **kwargs):
+        form = AssetApiQueryForm(request.GET)
+        if not form.is_valid():
+            return JsonResponse({'errors': form.errors.get_json_data()}, status=400)
+        try:
+            return self.conditional_get(lambda: self.api_response(form.cleaned_data))
+        except BadRequest as exc:
+            # From the attribute filters in get_queryset()
+            return JsonResponse({'errors': {'attributes': [str(exc)]}}, status=400)
+
+    def api_response(self, options):
+        fields, include = options['fields'], options['include']
+        queryset = self.get_queryset()
+
+        if options['ids']:
+            rows = list(api.value_rows(queryset.filter(pk__in=options['ids']), fields))
+            found = {row['id'] for row in rows}
+            return JsonResponse({
+                'results': api.serialize(rows, fields, include),
+                'not_found': [pk for pk in options['ids'] if pk not in found],
+            })
+
+        paginator = KeysetPaginator(api.value_rows(queryset, fields), options['limit'])
+        try:
+            page = paginator.page(
+                after=self.request.GET.get('after'),
+                before=self.request.GET.get('before'),
+            )
+        except InvalidCursor:
+            return JsonResponse({'errors': {'cursor': ['Invalid page cursor.']}}, status=400)
+        return JsonResponse({
+            'results': api.serialize(page.object_list, fields, include),
+            'next': self.cursor_url('after', page.next_cursor),
+            'previous': self.cursor_url('before', page.previous_cursor),
+        })
+
+
+class AssetApiDetailView(LoginRequiredMixin, View):
+    """
+    One asset as JSON, with the same ?fields= and ?include= as the list
+    """
+    raise_exception = True
+    replica_reads = True
+
+    def get(self, request, pk):
+        form = AssetApiQueryForm(request.GET)
+        if not form.is_valid():
+            return JsonResponse({'errors': form.errors.get_json_data()}, status=400)
+        fields, include = form.cleaned_data['fields'], form.cleaned_data['include']
+
+        rows = list(api.value_rows(Asset.objects.visible_to(request.user).filter(pk=pk), fields))
+        if not rows:
+            if Asset.objects.filter(pk=pk).exists():
+                raise PermissionDenied
+            raise Http404("No asset found.")
+        return JsonResponse(api.serialize(rows, fields, include)[0])
+
+
+class AssetDetailView(LoginRequiredMixin, AssetAccessMixin, ConditionalGetMixin, DetailView):
     """
     Epic 1, Stories 5, 8, 9: View asset details with attributes
     """
     model = Asset
+    replica_reads = True
     template_name = "asset_managment/asset_detail.html"
     context_object_name = "asset"
-    def test_func(self):
-        asset = self.get_object() 
-        return asset.has_access(self.request.user)
-    
-    def test_func(self):
-        asset = self.get_object() 
-        return asset.has_access(self.request.user)
-    
+    # Served from the read-through detail cache when possible
+    load_asset = staticmethod(load_asset_detail)
+
+    def get(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        return self.conditional_get(
+            lambda: self.render_to_response(self.get_context_data(object=self.object))
+        )
+
+    def get_validators(self):
+        asset = self.object
+        # The overdue badge changes with the date, not with updated_at
+        day = timezone.localdate() if asset.depreciation else ''
+        etag = make_etag(self.request.user.pk, asset.pk, asset.updated_at.isoformat(), day)
+        return etag, asset.updated_at
+
+    def get_queryset(self):
+        return (
+            Asset.objects.select_related('assigned_to')
+            .prefetch_related('attributes_set')
+        )
+
 
 class AssetCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
     """
@@ -104,12 +409,22 @@ class AssetCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
     template_name = "asset_managment/asset_form.html"
     success_url = reverse_lazy("asset_list")
 
+    def get_initial(self):
+        initial = super().get_initial()
+        if self.request.GET.get('category'):
+            initial['category'] = self.request.GET['category']
+        return initial
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        # Attribute templates come from the submitted or requested category
         if self.request.POST:
-            context['formset'] = AssetAttributeFormSet(self.request.POST, instance=self.object)
+            context['formset'] = templated_attribute_formset(
+                self.request.POST.get('category', ''), self.request.POST, instance=self.object
+            )
         else:
-            context['formset'] = AssetAttributeFormSet(instance=self.object)
+            category = self.get_initial().get('category', Asset._meta.get_field('category').default)
+            context['formset'] = templated_attribute_formset(category, instance=self.object)
         return context
 
     def form_valid(self, form):
@@ -125,20 +440,10 @@ class AssetCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
             return self.form_invalid(form)
     
     def test_func(self):
-        user = self.request.user
-
-        if user.is_superuser:
-            return True
-        try:
-            manager_group = Group.objects.get(name='manager')
-            if manager_group in user.groups.all():
-                return True
-        except Group.DoesNotExist:
-            pass 
-        return False
+        return can_manage(self.request.user)
 
 
-class AssetUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
+class AssetUpdateView(LoginRequiredMixin, AssetAccessMixin, UpdateView):
     """
     Epic 1, Story 5: Edit asset details
     Epic 1, Story 6: Duplicate functionality through editing
@@ -153,12 +458,11 @@ class AssetUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         if self.request.POST:
-            context['formset'] = AssetAttributeFormSet(
-                self.request.POST,
-                instance=self.object
+            context['formset'] = templated_attribute_formset(
+                self.request.POST.get('category', ''), self.request.POST, instance=self.object
             )
         else:
-            context['formset'] = AssetAttributeFormSet(instance=self.object)
+            context['formset'] = templated_attribute_formset(self.object.category, instance=self.object)
         return context
 
     def form_valid(self, form):
@@ -172,13 +476,9 @@ class AssetUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
             return redirect(self.get_success_url())
         else:
             return self.form_invalid(form)
-    
-    def test_func(self):
-        asset = self.get_object() 
-        return asset.has_access(self.request.user)
 
 
-class AssetDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
+class AssetDeleteView(LoginRequiredMixin, AssetAccessMixin, DeleteView):
     """
     Epic 1, Story 7: Delete outdated or retired assets
     """
@@ -186,18 +486,16 @@ class AssetDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
     template_name = "asset_managment/asset_confirm_delete.html"
     success_url = reverse_lazy("asset_list")
 
-    def test_func(self):
-        asset = self.get_object() 
-        return asset.has_access(self.request.user)
+    def get_queryset(self):
+        return Asset.objects.select_related('assigned_to')
 
 
 @login_required
-def assign_asset_view(request, pk):
+@asset_access_required(Asset.objects.all())
+def assign_asset_view(request, asset):
     """
     Epic 4, Story 22: Assign assets to individuals
     """
-    asset = get_object_or_404(Asset, pk=pk)
-
     if request.method == "POST":
         user_id = request.POST.get('user_id')
         if user_id:
@@ -206,25 +504,24 @@ def assign_asset_view(request, pk):
             asset.assigned_to = user
             asset.status = "checked_out"
             asset.save()
-            return redirect("asset_detail", pk=pk)
+            return redirect("asset_detail", pk=asset.pk)
 
     return render(request, "asset_managment/assign_asset_form.html", {"asset": asset})
 
 @login_required
-def asset_duplicate_view(request, pk):
+@asset_access_required(Asset.objects.all())
+def asset_duplicate_view(request, original_asset):
     """
     Epic 1, Story 6: Duplicate asset to simplify creating similar assets
     """
-    # Get the original asset
-    original_asset = get_object_or_404(Asset, pk=pk)
-    
     if request.method == 'GET':
         # Create a form pre-filled with the original asset's data
-        form = AssetForm(initial={
+        form = AssetDuplicateForm(initial={
             'name': f"{original_asset.name} (Copy)",
             'category': original_asset.category,
             'status': original_asset.status,
             'depreciation': original_asset.depreciation,
+            'copies': 1,
             # Don't copy assigned_to - new asset should be unassigned
         })
         
@@ -240,26 +537,32 @@ def asset_duplicate_view(request, pk):
         return render(request, 'asset_managment/asset_form.html', context)
     
     elif request.method == 'POST':
-        form = AssetForm(request.POST)
+        form = AssetDuplicateForm(request.POST)
         formset = AssetAttributeFormSet(request.POST)
         
         if form.is_valid() and formset.is_valid():
-            # Create the new asset
-            new_asset = form.save()
-            
-            # Copy attributes from original asset
-            for attr in original_asset.attributes_set.all():
-                Attribute.objects.create(
-                    asset=new_asset,
-                    name=attr.name,
-                    value=attr.value
-                )
-            
-            # Also save any new attributes from formset
-            formset.instance = new_asset
-            formset.save()
+            # Copy the original's attributes plus any new ones from the formset
+            extra_attributes = [
+                (f.cleaned_data['name'], f.cleaned_data['value'])
+                for f in formset.forms
+                if f.cleaned_data and not f.cleaned_data.get('DELETE')
+            ]
+            copies = form.cleaned_data['copies']
+            new_assets = duplicate_asset(
+                original_asset,
+                copies=copies,
+                name=form.cleaned_data['name'],
+                fields={
+                    field: form.cleaned_data[field]
+                    for field in ('category', 'status', 'depreciation', 'assigned_to')
+                },
+                extra_attributes=extra_attributes,
+            )
             
-            return redirect('asset_detail', pk=new_asset.pk)
+            if copies == 1:
+                return redirect('asset_detail', pk=new_assets[0].pk)
+            messages.success(request, f"Created {copies} copies of {original_asset.name}.")
+            return redirect('asset_list')
         else:
             context = {
                 'form': form,
@@ -267,4 +570,203 @@ def asset_duplicate_view(request, pk):
                 'is_duplicate': True,
                 'original_asset': original_asset,
             }
-            return render(request, 'asset_managment/asset_form.html', context)
\ No newline at end of file
+            return render(request, 'asset_managment/asset_form.html', context)
+
+
+@login_required
+@asset_access_required(Asset.objects.all())
+def asset_history_view(request, asset):
+    """
+    Change history of an asset and its attributes, newest first
+    """
+    history = AssetHistory.objects.for_asset(asset.pk).select_related('user')
+    page = Paginator(history, 50).get_page(request.GET.get('page'))
+    return render(request, 'asset_managment/asset_history.html', {'asset': asset, 'page_obj': page})
+
+
+@login_required
+def asset_import_view(request):
+    """
+    Bulk import assets from an uploaded CSV or JSONL file. Files larger
+    than settings.ASSET_IMPORT_INLINE_BYTES are imported by a background job.
+    """
+    if not can_manage(request.user):
+        raise PermissionDenied
+
+    result = None
+    if request.method == 'POST':
+        form = AssetImportUploadForm(request.POST, request.FILES)
+        if form.is_valid():
+            upload = form.cleaned_data['file']
+            fmt = form.cleaned_data['format'] or guess_format(upload.name)
+            if upload.size > getattr(settings, 'ASSET_IMPORT_INLINE_BYTES', 1024 * 1024):
+                name = job_storage().save(f'imports/{upload.name}', upload)
+                # Not retried: a second attempt would repeat the batches already written
+                job = enqueue(JOB_IMPORT, {'file': name, 'format': fmt}, user=request.user, max_attempts=1)
+                messages.info(request, "The file is being imported in the background.")
+                return redirect('job_detail', pk=job.pk)
+            stream = io.TextIOWrapper(upload.open('rb'), encoding='utf-8', newline='')
+            try:
+                result = import_assets(stream, fmt)
+            except UnicodeDecodeError:
+                form.add_error('file', 'The file must be UTF-8 encoded.')
+    else:
+        form = AssetImportUploadForm()
+
+    return render(request, 'asset_managment/asset_import.html', {'form': form, 'result': result})
+
+
+@login_required
+def asset_cache_stats_view(request):
+    """
+    Detail cache hit, miss and invalidation counters as JSON, for scraping
+    """
+    if not can_manage(request.user):
+        raise PermissionDenied
+    return JsonResponse({'detail_cache': detail_cache.stats()})
+
+
+@login_required
+def attribute_template_list_view(request):
+    """
+    Categories with attribute templates, and the categories in use without any
+    """
+    if not can_manage(request.user):
+        raise PermissionDenied
+    counts = dict(
+        AttributeTemplate.objects.order_by().values_list('category').annotate(n=Count('pk'))
+    )
+    categories = sorted(set(counts) | set(get_facets().categories))
+    return render(request, 'asset_managment/attribute_templates.html', {
+        'categories': [(category, counts.get(category, 0)) for category in categories],
+    })
+
+
+@login_required
+def attribute_template_edit_view(request, category):
+    """
+    Edit one category's attribute templates and apply them to its assets
+    """
+    if not can_manage(request.user):
+        raise PermissionDenied
+
+    queryset = AttributeTemplate.objects.for_category(category)
+    if request.method == 'POST' and 'apply' in request.POST:
+        changed = apply_templates(category)
+        messages.success(request, f"Added missing attributes to {changed} asset{'s' if changed != 1 else ''}.")
+        return redirect('attribute_template_edit', category=category)
+
+    if request.method == 'POST':
+        formset = AttributeTemplateFormSet(request.POST, queryset=queryset)
+        if formset.is_valid():
+            templates = formset.save(commit=False)
+            for template in templates:
+                template.category = category
+                template.save()
+            for template in formset.deleted_objects:
+                template.delete()
+            messages.success(request, f"Saved the attribute templates for {category}.")
+            return redirect('attribute_template_edit', category=category)
+    else:
+        formset = AttributeTemplateFormSet(queryset=queryset)
+
+    return render(request, 'asset_managment/attribute_template_form.html', {
+        'category': category,
+        'formset': formset,
+    })
+
+
+def _has_metrics_token(request):
+    token = getattr(settings, 'ASSET_METRICS_TOKEN', None)
+    if not token:
+        return False
+    supplied = request.headers.get('Authorization', '')
+    if supplied.startswith('Bearer '):
+        supplied = supplied[len('Bearer '):]
+    return constant_time_compare(supplied, token)
+
+
+def asset_metrics_view(request):
+    """
+    Per-view query, database time and latency metrics plus the detail cache
+    counters, in the Prometheus text format. Managers can read it from the
+    browser; scrapers send settings.ASSET_METRICS_TOKEN as a bearer token.
+    """
+    if not _has_metrics_token(request):
+        if not request.user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        if not can_manage(request.user):
+            raise PermissionDenied
+    cache_stats = detail_cache.stats()
+    text = instrumentation.metrics_text([
+        (f'asset_detail_cache_{name}_total', f'Detail cache {name}.', cache_stats[name])
+        for name in detail_cache.STATS
+    ])
+    return HttpResponse(text, content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+# Jobs a manager can start from the job list
+MANAGER_JOBS = {
+    JOB_SWEEP_OVERDUE: "Overdue sweep",
+    JOB_REBUILD_FACETS: "Facet rebuild",
+}
+
+
+@login_required
+def job_list_view(request):
+    """
+    The user's background jobs, newest first (every job for managers).
+    Managers can also queue the overdue sweep and a facet rebuild here.
+    """
+    manager = can_manage(request.user)
+    if request.method == 'POST':
+        kind = request.POST.get('kind')
+        if not manager or kind not in MANAGER_JOBS:
+            raise PermissionDenied
+        job = enqueue(kind, user=request.user)
+        messages.info(request, f"{MANAGER_JOBS[kind]} queued.")
+        return redirect('job_detail', pk=job.pk)
+
+    jobs = AssetJob.objects.for_user(request.user).select_related('created_by').order_by('-created_at')
+    page = Paginator(jobs, 50).get_page(request.GET.get('page'))
+    return render(request, 'asset_managment/job_list.html', {
+        'page_obj': page,
+        'manager_jobs': MANAGER_JOBS.items() if manager else (),
+    })
+
+
+@login_required
+def job_detail_view(request, pk):
+    """
+    Progress and outcome of one background job; refreshes itself until the
+    job finishes
+    """
+    job = get_object_or_404(AssetJob.objects.for_user(request.user), pk=pk)
+    return render(request, 'asset_managment/job_detail.html', {'job': job, 'status': status_data(job)})
+
+
+@login_required
+def job_download_view(request, pk):
+    """
+    The file written by a finished export job
+    """
+    job = get_object_or_404(AssetJob.objects.for_user(request.user), pk=pk, kind=JOB_EXPORT)
+    if job.status != AssetJob.STATUS_SUCCEEDED:
+        raise Http404("The export is not ready.")
+    result = job.result
+    return FileResponse(
+        job_storage().open(result['file'], 'rb'),
+        as_attachment=True,
+        filename=result['filename'],
+        content_type=result['content_type'],
+    )
+
+
+def api_job_detail_view(request, pk):
+    """
+    One background job's status, progress and result as JSON, for polling
+    """
+    if not request.user.is_authenticated:
+        raise PermissionDenied
+    job = get_object_or_404(AssetJob.objects.for_user(request.user), pk=pk)
+    return JsonResponse(status_data(job))
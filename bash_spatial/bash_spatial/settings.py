@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -41,11 +42,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "asset_managment.middleware.RequestMetricsMiddleware",
+    "asset_managment.middleware.ReplicaRoutingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "asset_managment.middleware.AuditUserMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -72,15 +76,151 @@ WSGI_APPLICATION = "bash_spatial.wsgi.application"
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
-
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+# Chosen by environment variables:
+#   ASSET_DB_ENGINE          "sqlite" (default) or "postgresql"
+#   ASSET_DB_NAME            database name, or the SQLite file path
+#   ASSET_DB_USER, ASSET_DB_PASSWORD, ASSET_DB_HOST, ASSET_DB_PORT  (PostgreSQL)
+#   ASSET_DB_CONN_MAX_AGE    seconds to keep a connection open between requests
+#   ASSET_DB_PGBOUNCER       "1" when connecting through PgBouncer in transaction
+#                            pooling mode (server-side cursors do not survive it)
+#   ASSET_DB_SQLITE_TUNED    "0" to use SQLite's defaults instead of the pragmas below
+#   ASSET_DB_REPLICAS        comma-separated read replicas: hosts ("host" or
+#                            "host:port") for PostgreSQL, file paths for SQLite
+#   ASSET_DB_REPLICA_STICKY_SECONDS  how long a client that wrote keeps reading
+#                            from the primary (see asset_managment.routers)
+
+
+def env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+def env_bool(name, default=False):
+    return os.environ.get(name, "1" if default else "0").lower() in ("1", "true", "yes", "on")
+
+
+ASSET_DB_ENGINE = os.environ.get("ASSET_DB_ENGINE", "sqlite")
+
+if ASSET_DB_ENGINE == "postgresql":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.environ.get("ASSET_DB_NAME", "asset_managment"),
+            "USER": os.environ.get("ASSET_DB_USER", ""),
+            "PASSWORD": os.environ.get("ASSET_DB_PASSWORD", ""),
+            "HOST": os.environ.get("ASSET_DB_HOST", ""),
+            "PORT": os.environ.get("ASSET_DB_PORT", ""),
+            # Persistent connections, checked before reuse
+            "CONN_MAX_AGE": env_int("ASSET_DB_CONN_MAX_AGE", 600),
+            "CONN_HEALTH_CHECKS": True,
+            "DISABLE_SERVER_SIDE_CURSORS": env_bool("ASSET_DB_PGBOUNCER"),
+            "OPTIONS": {"connect_timeout": 5},
+        }
+    }
+elif ASSET_DB_ENGINE == "sqlite":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.environ.get("ASSET_DB_NAME", BASE_DIR / "db.sqlite3"),
+            "CONN_MAX_AGE": env_int("ASSET_DB_CONN_MAX_AGE", 60),
+        }
+    }
+    if env_bool("ASSET_DB_SQLITE_TUNED", True):
+        DATABASES["default"]["ENGINE"] = "asset_managment.backends.sqlite3"
+        DATABASES["default"]["OPTIONS"] = {
+            "timeout": 20,
+            "transaction_mode": "IMMEDIATE",
+            "pragmas": {
+                "journal_mode": "WAL",
+                "synchronous": "NORMAL",
+                "busy_timeout": 20000,  # ms
+                "mmap_size": 256 * 1024 * 1024,
+                "cache_size": -64 * 1024,  # KiB
+                "temp_store": "MEMORY",
+            },
+        }
+else:
+    raise ValueError(f"Unsupported ASSET_DB_ENGINE {ASSET_DB_ENGINE!r}")
+
+ASSET_READ_REPLICAS = []
+for n, replica in enumerate(filter(None, os.environ.get("ASSET_DB_REPLICAS", "").split(",")), 1):
+    alias = f"replica_{n}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        # Tests read the replicas through the test primary
+        "TEST": {"MIRROR": "default"},
+    }
+    if ASSET_DB_ENGINE == "postgresql":
+        host, _, port = replica.strip().partition(":")
+        DATABASES[alias].update(HOST=host, PORT=port or DATABASES["default"]["PORT"])
+    else:
+        DATABASES[alias]["NAME"] = replica.strip()
+    ASSET_READ_REPLICAS.append(alias)
+
+ASSET_REPLICA_STICKY_SECONDS = env_int("ASSET_DB_REPLICA_STICKY_SECONDS", 10)
+
+DATABASE_ROUTERS = ["asset_managment.routers.ReplicaRouter"]
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/ref/settings/#caches
+# Local memory is per process; point ASSET_DETAIL_CACHE at a shared backend
+# (Redis, Memcached) to share cached asset detail pages between workers.
+# ASSET_CACHE_DIR switches to a file cache every process on the host shares,
+# which run_asset_worker needs so its invalidations reach the web server.
+
+if os.environ.get("ASSET_CACHE_DIR"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.environ["ASSET_CACHE_DIR"],
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
     }
+
+ASSET_DETAIL_CACHE = "default"
+
+
+# Request metrics (asset_managment.instrumentation)
+# Per-view query counts and timings are served at /metrics/. Requests to the
+# views below that run more queries than their budget are logged, or raise
+# with ASSET_QUERY_BUDGET_ACTION = "raise".
+
+ASSET_SERVER_TIMING = DEBUG
+
+ASSET_METRICS_TOKEN = None
+
+ASSET_QUERY_BUDGET_ACTION = "log"
+
+ASSET_QUERY_BUDGETS = {
+    "asset_list": 8,
+    "asset_detail": 6,
+    "asset_update": 8,
+    "asset_history": 8,
+    "api_asset_list": 8,
+    "api_asset_detail": 6,
+    "asset_list_async": 8,
+    "asset_detail_async": 6,
+    "api_asset_list_async": 8,
 }
 
 
+# Background jobs (asset_managment.jobs), run by `manage.py run_asset_worker`.
+# Imports of larger uploads and filter-wide bulk actions over more assets than
+# the limits below are queued instead of run in the request. Uploads waiting to
+# be imported and finished exports are kept in ASSET_JOB_FILES_DIR.
+
+ASSET_JOB_FILES_DIR = os.environ.get("ASSET_JOB_FILES_DIR", BASE_DIR / "job_files")
+
+ASSET_IMPORT_INLINE_BYTES = 1024 * 1024
+
+ASSET_BULK_INLINE_LIMIT = 5000
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 